@@ -0,0 +1,110 @@
+"""Сериализация моделей в словари для JSON.
+
+Каждое поле описано функцией от объекта и набором колонок, которые
+ей нужны. По ?fields= выбирается подмножество полей, и выборка
+читает только их колонки и только нужные JOIN: клиент, которому
+хватает id и текста, не тянет автора, группу и картинки.
+"""
+from django.urls import reverse
+
+from posts.counters import get_stats
+
+
+class FieldsError(ValueError):
+    pass
+
+
+class Field:
+    def __init__(self, getter, columns=(), related=None):
+        self.getter = getter
+        self.columns = columns
+        self.related = related
+
+
+def _file_url(file):
+    return file.url if file else None
+
+
+POST_FIELDS = {
+    'id': Field(lambda post: post.pk),
+    'text': Field(lambda post: post.text, ('text',)),
+    'pub_date': Field(lambda post: post.pub_date.isoformat(), ('pub_date',)),
+    'author': Field(
+        lambda post: post.author.username, ('author__username',), 'author'
+    ),
+    'group': Field(
+        lambda post: post.group.slug if post.group_id else None,
+        ('group__slug',), 'group'
+    ),
+    'image': Field(lambda post: _file_url(post.image), ('image',)),
+    'thumbnail': Field(lambda post: _file_url(post.thumbnail), ('thumbnail',)),
+    'comments_count': Field(
+        lambda post: post.comments_count, ('comments_count',)
+    ),
+    'url': Field(lambda post: reverse('posts:post_detail', args=[post.pk])),
+}
+POST_DEFAULT_FIELDS = (
+    'id', 'text', 'pub_date', 'author', 'group', 'thumbnail',
+    'comments_count',
+)
+
+COMMENT_FIELDS = {
+    'id': Field(lambda comment: comment.pk),
+    'post': Field(lambda comment: comment.post_id, ('post',)),
+    'author': Field(
+        lambda comment: comment.author.username,
+        ('author__username',), 'author'
+    ),
+    'text': Field(lambda comment: comment.text, ('text',)),
+    'created': Field(
+        lambda comment: comment.created.isoformat(), ('created',)
+    ),
+}
+COMMENT_DEFAULT_FIELDS = ('id', 'author', 'text', 'created')
+
+USER_FIELDS = {
+    'username': Field(lambda user: user.username),
+    'full_name': Field(lambda user: user.get_full_name()),
+    'posts_count': Field(lambda user: get_stats(user).posts_count),
+    'followers_count': Field(lambda user: get_stats(user).followers_count),
+    'following_count': Field(lambda user: get_stats(user).following_count),
+    'is_following': Field(
+        lambda user: getattr(user, 'is_following', False)
+    ),
+}
+USER_DEFAULT_FIELDS = tuple(USER_FIELDS)
+
+
+def parse_fields(value, available, default):
+    """Разобрать ?fields=a,b; неизвестное поле — FieldsError."""
+    if not value:
+        return tuple(default)
+    names = tuple(dict.fromkeys(
+        name.strip() for name in value.split(',') if name.strip()
+    ))
+    unknown = [name for name in names if name not in available]
+    if unknown or not names:
+        raise FieldsError(
+            'Неизвестные поля: ' + ', '.join(unknown) + '. '
+            'Доступны: ' + ', '.join(available)
+        )
+    return names
+
+
+def restrict(queryset, fields, available, keep=()):
+    """Оставить в выборке только колонки и JOIN выбранных полей.
+
+    keep — колонки, нужные помимо полей (например, ключ курсора).
+    """
+    related = {
+        available[name].related for name in fields
+        if available[name].related
+    }
+    columns = set(keep)
+    for name in fields:
+        columns.update(available[name].columns)
+    return queryset.select_related(*related).only(*columns)
+
+
+def serialize(obj, fields, available):
+    return {name: available[name].getter(obj) for name in fields}
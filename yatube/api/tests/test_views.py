@@ -0,0 +1,231 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+def url(name, *args):
+    return reverse(f'api:v1:{name}', args=args)
+
+
+class ApiReadTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {number}', author=cls.author, group=cls.group
+            )
+            for number in range(3)
+        ]
+        cls.post = cls.posts[-1]
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_feeds_return_posts(self):
+        """Все ленты отдают посты в порядке публикации."""
+        expected = [post.pk for post in reversed(self.posts)]
+        for name, args in (
+            ('posts', ()),
+            ('group_posts', (self.group.slug,)),
+            ('user_posts', (self.author.username,)),
+            ('follow_feed', ()),
+        ):
+            with self.subTest(name=name):
+                response = self.client.get(url(name, *args))
+                self.assertEqual(response.status_code, 200)
+                data = response.json()
+                self.assertEqual(
+                    [post['id'] for post in data['results']], expected
+                )
+                self.assertIsNone(data['next'])
+
+    def test_default_post_fields(self):
+        post = self.client.get(url('posts')).json()['results'][0]
+        self.assertEqual(post, {
+            'id': self.post.pk,
+            'text': self.post.text,
+            'pub_date': self.post.pub_date.isoformat(),
+            'author': 'author',
+            'group': 'test-slug',
+            'thumbnail': None,
+            'comments_count': 1,
+        })
+
+    def test_fields_selection(self):
+        """?fields= оставляет только выбранные поля."""
+        response = self.client.get(url('posts'), {'fields': 'id,text'})
+        self.assertEqual(
+            response.json()['results'][0],
+            {'id': self.post.pk, 'text': self.post.text},
+        )
+        response = self.client.get(
+            url('group_posts', self.group.slug), {'fields': 'id'}
+        )
+        self.assertEqual(
+            response.json()['results'][0], {'id': self.post.pk}
+        )
+        response = self.client.get(url('posts'), {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', response.json()['error'])
+
+    @override_settings(AMOUNT_POSTS=2)
+    def test_cursor_paging(self):
+        """Курсор ведёт на следующую страницу и обратно."""
+        first = self.client.get(url('posts')).json()
+        self.assertEqual(len(first['results']), 2)
+        self.assertIsNone(first['previous'])
+        second = self.client.get(url('posts'), {'cursor': first['next']})
+        second = second.json()
+        self.assertEqual(
+            [post['id'] for post in second['results']], [self.posts[0].pk]
+        )
+        back = self.client.get(url('posts'), {'cursor': second['previous']})
+        self.assertEqual(back.json()['results'], first['results'])
+
+    def test_post_detail_and_comments(self):
+        response = self.client.get(
+            url('post_detail', self.post.pk), {'fields': 'id,author'}
+        )
+        self.assertEqual(
+            response.json(), {'id': self.post.pk, 'author': 'author'}
+        )
+        comments = self.client.get(url('comments', self.post.pk)).json()
+        self.assertEqual(
+            [comment['text'] for comment in comments['results']],
+            ['Комментарий'],
+        )
+
+    def test_user_detail(self):
+        data = self.client.get(url('user_detail', 'author')).json()
+        self.assertEqual(data, {
+            'username': 'author',
+            'full_name': 'Лев Толстой',
+            'posts_count': 3,
+            'followers_count': 1,
+            'following_count': 0,
+            'is_following': True,
+        })
+
+    def test_errors_are_json(self):
+        response = self.client.get(url('post_detail', 0))
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('error', response.json())
+        self.client.logout()
+        response = self.client.get(url('follow_feed'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_conditional_get(self):
+        """Ленты API отвечают 304 по ETag, как и HTML-страницы."""
+        response = self.client.get(url('posts'))
+        response = self.client.get(
+            url('posts'), HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_num_queries(self):
+        """Число запросов не зависит от числа постов на странице."""
+        # Сессия и пользователь — 2 запроса,
+        # дальше запросы самого ответа.
+        pages = {
+            url('posts'): 3,
+            url('group_posts', self.group.slug): 4,
+            url('user_posts', self.author.username): 4,
+            url('follow_feed'): 4,
+            url('post_detail', self.post.pk): 3,
+            url('comments', self.post.pk): 4,
+            url('user_detail', self.author.username): 3,
+        }
+        for address, num_queries in pages.items():
+            with self.subTest(url=address):
+                with self.assertNumQueries(num_queries):
+                    self.client.get(address)
+
+
+class ApiWriteTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='user')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_create_post(self):
+        response = self.client.post(url('posts'), {
+            'text': 'Пост из API', 'group': self.group.pk,
+        })
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data['author'], 'user')
+        self.assertEqual(data['group'], 'test-slug')
+        self.assertTrue(
+            Post.objects.filter(pk=data['id'], author=self.user).exists()
+        )
+
+    def test_create_post_validation(self):
+        response = self.client.post(url('posts'), {'text': ''})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('text', response.json()['errors'])
+        self.assertFalse(Post.objects.exists())
+
+    def test_anonymous_cannot_write(self):
+        self.client.logout()
+        response = self.client.post(url('posts'), {'text': 'Пост'})
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Post.objects.exists())
+
+    def test_add_comment(self):
+        post = Post.objects.create(text='Пост', author=self.author)
+        response = self.client.post(
+            url('comments', post.pk), {'text': 'Комментарий'}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['author'], 'user')
+        self.assertEqual(post.comments.get().text, 'Комментарий')
+
+    def test_follow_and_unfollow(self):
+        address = url('follow', 'author')
+        response = self.client.post(address)
+        self.assertEqual(
+            response.json(), {'following': True, 'changed': True}
+        )
+        self.assertTrue(
+            Follow.objects.filter(user=self.user, author=self.author).exists()
+        )
+        response = self.client.delete(address)
+        self.assertEqual(
+            response.json(), {'following': False, 'changed': True}
+        )
+        self.assertFalse(Follow.objects.exists())
+        response = self.client.post(url('follow', 'user'))
+        self.assertEqual(response.status_code, 400)
+
+    def test_method_not_allowed(self):
+        response = self.client.get(url('follow', 'author'))
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,28 @@
+from django.urls import include, path
+
+from . import views
+
+app_name = 'api'
+
+v1_patterns = [
+    path('posts/', views.posts, name='posts'),
+    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.comments,
+        name='comments'
+    ),
+    path('groups/<slug:slug>/posts/', views.group_posts, name='group_posts'),
+    path('feed/', views.follow_feed, name='follow_feed'),
+    path('users/<str:username>/', views.user_detail, name='user_detail'),
+    path(
+        'users/<str:username>/posts/',
+        views.user_posts,
+        name='user_posts'
+    ),
+    path('users/<str:username>/follow/', views.follow, name='follow'),
+]
+
+urlpatterns = [
+    path('v1/', include((v1_patterns, 'v1'))),
+]
@@ -0,0 +1,219 @@
+"""JSON API v1 поверх тех же выборок, что и HTML-ленты.
+
+Списки листаются курсором (?cursor=), поля выбираются ?fields=.
+Авторизация — сессия сайта; запись требует CSRF-токен в заголовке
+X-CSRFToken, как и формы. Ошибки возвращаются JSON с полем error.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_http_methods
+
+from posts.decorators import feed_condition
+from posts.follows import follow_authors, unfollow_authors, with_following_flag
+from posts.forms import CommentForm, PostForm
+from posts.models import Comment, Group, Post, User
+from posts.timeline import timeline_posts
+from posts.utils import COMMENT_ORDERINGS, show_cursor_pages
+
+from .serializers import (
+    COMMENT_DEFAULT_FIELDS, COMMENT_FIELDS, POST_DEFAULT_FIELDS, POST_FIELDS,
+    USER_DEFAULT_FIELDS, USER_FIELDS, FieldsError, parse_fields, restrict,
+    serialize,
+)
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def api_view(*methods):
+    """Ограничить методы и превратить ошибки в JSON-ответы."""
+    def decorator(view):
+        @require_http_methods(methods)
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                return view(request, *args, **kwargs)
+            except Http404:
+                return JsonResponse({'error': 'Не найдено'}, status=404)
+            except FieldsError as error:
+                return JsonResponse({'error': str(error)}, status=400)
+            except ApiError as error:
+                return JsonResponse(
+                    {'error': error.message}, status=error.status
+                )
+        return wrapper
+    return decorator
+
+
+def require_user(request):
+    if not request.user.is_authenticated:
+        raise ApiError(401, 'Требуется авторизация')
+
+
+def form_errors(form):
+    return JsonResponse(
+        {'errors': form.errors.get_json_data()}, status=400
+    )
+
+
+def post_page(request, posts):
+    fields = parse_fields(
+        request.GET.get('fields'), POST_FIELDS, POST_DEFAULT_FIELDS
+    )
+    page_obj = show_cursor_pages(
+        restrict(posts, fields, POST_FIELDS, keep=('pub_date',)), request
+    )
+    return JsonResponse({
+        'results': [
+            serialize(post, fields, POST_FIELDS) for post in page_obj
+        ],
+        'next': page_obj.next_cursor,
+        'previous': page_obj.previous_cursor,
+    })
+
+
+@feed_condition
+def _index(request):
+    return post_page(request, Post.objects.all())
+
+
+def _create_post(request):
+    require_user(request)
+    form = PostForm(request.POST, files=request.FILES or None)
+    if not form.is_valid():
+        return form_errors(form)
+    post = form.save(commit=False)
+    post.author = request.user
+    post.save()
+    return JsonResponse(
+        serialize(post, POST_DEFAULT_FIELDS, POST_FIELDS), status=201
+    )
+
+
+@api_view('GET', 'HEAD', 'POST')
+def posts(request):
+    """Лента всех постов; POST создаёт пост."""
+    if request.method == 'POST':
+        return _create_post(request)
+    return _index(request)
+
+
+@api_view('GET', 'HEAD')
+@feed_condition
+def group_posts(request, slug):
+    group = get_object_or_404(Group.objects.only('pk'), slug=slug)
+    return post_page(request, Post.objects.filter(group=group))
+
+
+@api_view('GET', 'HEAD')
+@feed_condition
+def user_posts(request, username):
+    author = get_object_or_404(User.objects.only('pk'), username=username)
+    return post_page(request, Post.objects.filter(author=author))
+
+
+@api_view('GET', 'HEAD')
+def follow_feed(request):
+    require_user(request)
+    return post_page(request, timeline_posts(request.user))
+
+
+@api_view('GET', 'HEAD')
+@feed_condition
+def user_detail(request, username):
+    fields = parse_fields(
+        request.GET.get('fields'), USER_FIELDS, USER_DEFAULT_FIELDS
+    )
+    user = get_object_or_404(
+        with_following_flag(
+            User.objects.select_related('stats'), request.user
+        ),
+        username=username,
+    )
+    return JsonResponse(serialize(user, fields, USER_FIELDS))
+
+
+@api_view('POST', 'DELETE')
+def follow(request, username):
+    """POST подписывает на автора, DELETE отписывает."""
+    require_user(request)
+    author = get_object_or_404(User.objects.only('pk'), username=username)
+    if author == request.user:
+        raise ApiError(400, 'Нельзя подписаться на себя')
+    if request.method == 'POST':
+        changed = follow_authors(request.user, [author.pk])
+    else:
+        changed = unfollow_authors(request.user, [author.pk])
+    return JsonResponse({
+        'following': request.method == 'POST',
+        'changed': bool(changed),
+    })
+
+
+@api_view('GET', 'HEAD')
+@feed_condition
+def post_detail(request, post_id):
+    fields = parse_fields(
+        request.GET.get('fields'), POST_FIELDS, POST_DEFAULT_FIELDS
+    )
+    post = get_object_or_404(
+        restrict(Post.objects.all(), fields, POST_FIELDS), pk=post_id
+    )
+    return JsonResponse(serialize(post, fields, POST_FIELDS))
+
+
+@feed_condition
+def _comment_list(request, post_id):
+    fields = parse_fields(
+        request.GET.get('fields'), COMMENT_FIELDS, COMMENT_DEFAULT_FIELDS
+    )
+    order = request.GET.get('order')
+    if order not in COMMENT_ORDERINGS:
+        order = 'oldest'
+    post = get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    page_obj = show_cursor_pages(
+        restrict(Comment.objects.filter(post=post), fields, COMMENT_FIELDS,
+                 keep=('created',)),
+        request,
+        ordering=COMMENT_ORDERINGS[order],
+        per_page=settings.AMOUNT_COMMENTS,
+    )
+    return JsonResponse({
+        'results': [
+            serialize(comment, fields, COMMENT_FIELDS)
+            for comment in page_obj
+        ],
+        'next': page_obj.next_cursor,
+        'previous': page_obj.previous_cursor,
+    })
+
+
+def _add_comment(request, post_id):
+    require_user(request)
+    post = get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    form = CommentForm(request.POST)
+    if not form.is_valid():
+        return form_errors(form)
+    comment = form.save(commit=False)
+    comment.author = request.user
+    comment.post = post
+    comment.save()
+    return JsonResponse(
+        serialize(comment, COMMENT_DEFAULT_FIELDS, COMMENT_FIELDS),
+        status=201,
+    )
+
+
+@api_view('GET', 'HEAD', 'POST')
+def comments(request, post_id):
+    """Комментарии поста; POST добавляет комментарий."""
+    if request.method == 'POST':
+        return _add_comment(request, post_id)
+    return _comment_list(request, post_id)
@@ -1,5 +1,25 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core import checks
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from .checks import production_settings, refuse_debug_settings
+        from .db import apply_sqlite_pragmas, check_connections
+        checks.register(production_settings)
+        if settings.PRODUCTION:
+            refuse_debug_settings()
+        request_started.connect(
+            check_connections, dispatch_uid='core_check_connections'
+        )
+        connection_created.connect(
+            apply_sqlite_pragmas, dispatch_uid='core_sqlite_pragmas'
+        )
+        if settings.TEMPLATES_PRECOMPILE:
+            from .precompile import precompile_templates
+            precompile_templates()
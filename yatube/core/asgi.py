@@ -0,0 +1,213 @@
+"""ASGI-приложение поверх WSGI-обработчика Django.
+
+В Django 2.2 нет асинхронных представлений и ASGI-обработчика
+(они появились в 3.0/3.1), поэтому представления остаются
+синхронными, а мост делит работу так:
+
+* тело запроса принимается в цикле событий, до захвата потока;
+* обработка запроса (ORM, шаблоны) идёт в ограниченном пуле
+  из settings.ASGI_THREADS потоков;
+* обычный ответ целиком отдаётся из потока и отправляется
+  клиенту уже без него, поэтому медленный клиент не держит
+  поток, как держал бы воркер WSGI;
+* потоковый ответ (StreamingHttpResponse) от первой до последней
+  порции вычисляется в том же потоке, где выполнялось
+  представление, и там же закрывается: курсор QuerySet.iterator(),
+  соединение с базой и contextvars привязаны к потоку. Порции
+  передаются в цикл событий через очередь; поток опережает
+  клиента не больше чем на STREAM_WINDOW сообщений и ждёт его.
+"""
+import asyncio
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Сколько сообщений поток может отдать вперёд медленного клиента
+STREAM_WINDOW = 8
+
+_DONE = object()
+
+
+class Channel:
+    """Очередь сообщений ASGI от потока пула к циклу событий."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.messages = asyncio.Queue()
+        self.window = threading.Semaphore(STREAM_WINDOW)
+        self.stopped = threading.Event()
+
+    def put(self, message):
+        """Из потока: ждать места в окне; False, если клиент ушёл."""
+        self.window.acquire()
+        if self.stopped.is_set():
+            return False
+        self.loop.call_soon_threadsafe(self.messages.put_nowait, message)
+        return True
+
+    def finish(self):
+        self.loop.call_soon_threadsafe(self.messages.put_nowait, _DONE)
+
+    async def get(self):
+        return await self.messages.get()
+
+    def sent(self):
+        self.window.release()
+
+    def stop(self):
+        # Поток мог ждать места в окне: отпускаем его, он увидит
+        # stopped и закроет ответ.
+        self.stopped.set()
+        self.window.release()
+
+
+class WsgiToAsgi:
+    def __init__(self, wsgi_application, max_workers):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='yatube-asgi'
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.http(scope, receive, send)
+        else:
+            raise ValueError(f'Неподдерживаемый тип: {scope["type"]}')
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, receive):
+        body = io.BytesIO()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            body.write(message.get('body', b''))
+            if not message.get('more_body', False):
+                body.seek(0)
+                return body
+
+    async def http(self, scope, receive, send):
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        channel = Channel(asyncio.get_running_loop())
+        worker = channel.loop.run_in_executor(
+            self.executor, self.run_application,
+            build_environ(scope, body), channel,
+        )
+        try:
+            while True:
+                message = await channel.get()
+                if message is _DONE:
+                    break
+                await send(message)
+                channel.sent()
+        finally:
+            channel.stop()
+            # Ошибки представления поднимаются здесь же.
+            await worker
+
+    def run_application(self, environ, channel):
+        """Выполнить запрос целиком в одном потоке пула.
+
+        Обычный ответ вычитывается и закрывается до отправки (закрытие
+        шлёт request_finished и возвращает соединения с базой этого
+        потока); потоковый вычитывается порциями и закрывается в этом
+        же потоке, когда кончится или клиент отключится.
+        """
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+
+        iterable = None
+        try:
+            iterable = self.wsgi_application(environ, start_response)
+            streaming = getattr(iterable, 'streaming', False)
+            if not streaming:
+                try:
+                    chunks = list(iterable)
+                finally:
+                    iterable, buffered = None, iterable
+                    close(buffered)
+            if not channel.put({
+                'type': 'http.response.start',
+                'status': response['status'],
+                'headers': response['headers'],
+            }):
+                return
+            if not streaming:
+                channel.put({
+                    'type': 'http.response.body', 'body': b''.join(chunks),
+                })
+                return
+            for chunk in iterable:
+                if chunk and not channel.put({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': True,
+                }):
+                    return
+            channel.put({'type': 'http.response.body', 'body': b''})
+        finally:
+            try:
+                if iterable is not None:
+                    close(iterable)
+            finally:
+                channel.finish()
+
+
+def close(iterable):
+    if hasattr(iterable, 'close'):
+        iterable.close()
+
+
+def build_environ(scope, body):
+    """WSGI environ по ASGI scope (PEP 3333 и спецификация ASGI HTTP)."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        # WSGI передаёт путь как байты в latin-1.
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        if name in environ:
+            separator = '; ' if name == 'HTTP_COOKIE' else ','
+            value = environ[name] + separator + value
+        environ[name] = value
+    return environ
@@ -0,0 +1,244 @@
+"""Кеш-бэкенды, общие для всех процессов приложения.
+
+RedisCache — минимальный бэкенд поверх клиента с API redis-py
+(в Django 2.2 встроенного бэкенда для Redis нет). Класс клиента
+задаётся в OPTIONS['CLIENT_CLASS'], поэтому в тестах вместо
+настоящего Redis можно подставить локальную заглушку.
+
+TieredCache — двухуровневый кеш: небольшой LRU в памяти процесса
+перед общим кешем. Подходит для ключей с версией (например,
+фрагментов лент): устаревшие ключи в локальном уровне просто
+перестают запрашиваться. Его попадания и промахи попадают
+в метрики запроса (core.metrics).
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from . import metrics
+
+# INCRBY только существующего ключа — одной командой на сервере:
+# между отдельными EXISTS и INCRBY ключ мог бы истечь и появиться
+# заново со значением delta.
+INCR_EXISTING = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return false
+"""
+
+
+class RedisCache(BaseCache):
+    def __init__(self, server, params):
+        super().__init__(params)
+        self._server = server
+        options = params.get('OPTIONS', {})
+        self._client_class = options.get('CLIENT_CLASS', 'redis.Redis')
+        self._client = None
+        self._incr_existing = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            try:
+                client_class = import_string(self._client_class)
+            except ImportError as error:
+                raise ImproperlyConfigured(
+                    'Для RedisCache нужен пакет redis '
+                    f'или OPTIONS["CLIENT_CLASS"]: {error}'
+                ) from error
+            self._client = client_class.from_url(self._server)
+        return self._client
+
+    @staticmethod
+    def _encode(value):
+        # Целые числа храним как есть, чтобы работал атомарный INCRBY.
+        if type(value) is int:
+            return str(value).encode()
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(value):
+        try:
+            return int(value)
+        except ValueError:
+            return pickle.loads(value)
+
+    def _expiry(self, timeout):
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            return None
+        return max(int(timeout), 0)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        expiry = self._expiry(timeout)
+        if expiry == 0:
+            return False
+        return bool(self.client.set(
+            self._key(key, version), self._encode(value),
+            ex=expiry, nx=True,
+        ))
+
+    def get(self, key, default=None, version=None):
+        value = self.client.get(self._key(key, version))
+        if value is None:
+            return default
+        return self._decode(value)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        expiry = self._expiry(timeout)
+        if expiry == 0:
+            self.client.delete(key)
+            return
+        self.client.set(key, self._encode(value), ex=expiry)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        expiry = self._expiry(timeout)
+        if expiry is None:
+            return bool(self.client.persist(key))
+        return bool(self.client.expire(key, expiry))
+
+    def delete(self, key, version=None):
+        self.client.delete(self._key(key, version))
+
+    def has_key(self, key, version=None):
+        return bool(self.client.exists(self._key(key, version)))
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        if self._incr_existing is None:
+            self._incr_existing = self.client.register_script(INCR_EXISTING)
+        value = self._incr_existing(keys=[key], args=[delta])
+        if value is None:
+            raise ValueError("Key '%s' not found" % key)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = self.client.mget(
+            [self._key(key, version) for key in keys]
+        )
+        return {
+            key: self._decode(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self.client.delete(*keys)
+
+    def clear(self):
+        self.client.flushdb()
+
+
+class TieredCache(BaseCache):
+    def __init__(self, server, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = options.get('SHARED_ALIAS', 'default')
+        self._local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self._local_max_entries = options.get('LOCAL_MAX_ENTRIES', 500)
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def _local_get(self, key):
+        with self._lock:
+            item = self._local.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return item
+
+    def _local_set(self, key, value, timeout):
+        expires = time.monotonic() + self._local_timeout
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is not None:
+            expires = min(expires, time.monotonic() + timeout)
+        with self._lock:
+            self._local[key] = (value, expires)
+            self._local.move_to_end(key)
+            while len(self._local) > self._local_max_entries:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, key):
+        with self._lock:
+            self._local.pop(key, None)
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_key(key, version=version)
+        item = self._local_get(local_key)
+        if item is not None:
+            metrics.record_cache(hit=True)
+            return item[0]
+        missing = object()
+        value = self.shared.get(key, missing, version=version)
+        metrics.record_cache(hit=value is not missing)
+        if value is missing:
+            return default
+        self._local_set(local_key, value, self.default_timeout)
+        return value
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(
+            key, value, self._shared_timeout(timeout), version=version
+        )
+        if added:
+            self._local_set(self.make_key(key, version), value, timeout)
+        return added
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(
+            key, value, self._shared_timeout(timeout), version=version
+        )
+        self._local_set(self.make_key(key, version), value, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(
+            key, self._shared_timeout(timeout), version=version
+        )
+
+    def delete(self, key, version=None):
+        self._local_delete(self.make_key(key, version))
+        self.shared.delete(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._local_delete(self.make_key(key, version))
+        return self.shared.incr(key, delta, version=version)
+
+    def has_key(self, key, version=None):
+        if self._local_get(self.make_key(key, version)) is not None:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+        self.shared.clear()
+
+    def _shared_timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            return self.default_timeout
+        return timeout
@@ -0,0 +1,93 @@
+"""Проверка, что в prod нет настроек, годных только для разработки.
+
+production_settings зарегистрирована как системная проверка
+(manage.py check) и срабатывает только при settings.PRODUCTION.
+Команду check запускают не все серверы, поэтому CoreConfig.ready
+вызывает refuse_debug_settings: с ошибками приложение не стартует.
+"""
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+from django.utils.module_loading import import_string
+
+# Кеши, которые не разделяются между процессами
+LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def _uncached_engines():
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        if not any(
+            isinstance(loader, CachedLoader)
+            for loader in engine.engine.template_loaders
+        ):
+            yield engine.name
+
+
+def production_settings(app_configs=None, **kwargs):
+    if not settings.PRODUCTION:
+        return []
+    errors = []
+    if settings.DEBUG:
+        errors.append(checks.Error(
+            'DEBUG включён: каждый SQL-запрос копится в памяти.',
+            hint='Уберите YATUBE_DEBUG.',
+            id='core.E001',
+        ))
+    for alias, options in settings.CACHES.items():
+        if options['BACKEND'] in LOCAL_CACHES:
+            errors.append(checks.Error(
+                f'Кеш {alias!r} не общий для процессов: '
+                f'{options["BACKEND"]}.',
+                hint='Задайте YATUBE_CACHE_BACKEND: file, db или redis.',
+                id='core.E002',
+            ))
+    for name in _uncached_engines():
+        errors.append(checks.Error(
+            f'Шаблоны движка {name!r} компилируются на каждый запрос.',
+            hint='Используйте core.loaders.CachedLoader.',
+            id='core.E003',
+        ))
+    for alias, options in settings.DATABASES.items():
+        if not options.get('CONN_MAX_AGE'):
+            errors.append(checks.Error(
+                f'База {alias!r} открывает соединение на каждый запрос.',
+                hint='Задайте YATUBE_CONN_MAX_AGE больше нуля.',
+                id='core.E004',
+            ))
+    if 'debug_toolbar' in settings.INSTALLED_APPS:
+        errors.append(checks.Error(
+            'Подключена панель отладки.',
+            hint='Уберите YATUBE_DEBUG_TOOLBAR.',
+            id='core.E005',
+        ))
+    if not issubclass(
+        import_string(settings.STATICFILES_STORAGE), ManifestFilesMixin
+    ):
+        errors.append(checks.Warning(
+            'Имена статических файлов без хеша: браузер не может '
+            'кешировать их надолго.',
+            hint='Используйте ManifestStaticFilesStorage.',
+            id='core.W001',
+        ))
+    return errors
+
+
+def refuse_debug_settings():
+    errors = [
+        error for error in production_settings()
+        if error.level >= checks.ERROR
+    ]
+    if errors:
+        raise ImproperlyConfigured(
+            'Настройки не годятся для prod:\n'
+            + '\n'.join(str(error) for error in errors)
+        )
@@ -0,0 +1,42 @@
+"""Настройка и обслуживание соединений с базой.
+
+apply_sqlite_pragmas выполняет settings.SQLITE_PRAGMAS на каждом новом
+соединении SQLite: WAL позволяет читать во время записи, а
+busy_timeout заставляет писателей ждать блокировку, а не падать
+с «database is locked».
+
+При CONN_MAX_AGE соединение живёт между запросами, и сервер базы
+может закрыть его раньше. Django 2.2 проверяет соединение только
+после ошибки, поэтому в начале запроса check_connections раз
+в CONN_HEALTH_CHECK_INTERVAL секунд проверяет каждое открытое
+соединение и закрывает негодные: следующий запрос откроет новое.
+"""
+import time
+
+from django.conf import settings
+from django.db import connections
+
+
+def check_connections(**kwargs):
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        checked = getattr(connection, 'health_checked_at', None)
+        if checked is not None and (
+            now - checked < settings.CONN_HEALTH_CHECK_INTERVAL
+        ):
+            continue
+        if connection.is_usable():
+            connection.health_checked_at = now
+        else:
+            connection.close()
+            connection.health_checked_at = None
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,61 @@
+"""«Дыры» в закешированных страницах.
+
+Части страницы, зависящие от посетителя, помечаются тегом
+{% hole 'имя' %}. Пока страница записывается в кеш, вместо них
+выводится маркер <!--hole:имя?аргументы-->, а fill() перед отдачей
+заменяет маркеры свежим рендерингом для текущего запроса.
+
+Дыра регистрируется через register(): шаблон и, при необходимости,
+функция, которая по запросу и аргументам маркера собирает контекст.
+Аргументы проходят через маркер строками.
+"""
+import re
+from urllib.parse import parse_qsl, urlencode
+
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+HOLE_MARKER = re.compile(r'<!--hole:(?P<name>\w+)(?:\?(?P<args>[^>\s]*))?-->')
+
+_registry = {}
+
+
+def register(name, template_name, context=None):
+    _registry[name] = (template_name, context)
+
+
+def get(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise KeyError(f'Дыра {name!r} не зарегистрирована') from None
+
+
+def marker(name, kwargs):
+    get(name)
+    if not kwargs:
+        return mark_safe(f'<!--hole:{name}-->')
+    return mark_safe(f'<!--hole:{name}?{urlencode(kwargs)}-->')
+
+
+def extra_context(name, request, kwargs):
+    _, context = get(name)
+    if context is None:
+        return dict(kwargs)
+    return context(request, **kwargs)
+
+
+def fill(content, request):
+    """Заменить маркеры в HTML свежим рендерингом дыр."""
+    def render(match):
+        name = match.group('name')
+        kwargs = dict(parse_qsl(match.group('args') or ''))
+        template_name, _ = get(name)
+        return render_to_string(
+            template_name, extra_context(name, request, kwargs),
+            request=request,
+        )
+    return HOLE_MARKER.sub(render, content)
+
+
+register('header', 'includes/header.html')
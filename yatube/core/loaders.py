@@ -0,0 +1,51 @@
+"""Загрузчики шаблонов с замером рендеринга каждого шаблона.
+
+Загрузчики Django создают django.template.base.Template напрямую,
+поэтому ProfilingMixin повторяет Loader.get_template, но создаёт
+ProfiledTemplate. Его _render вызывается и для страницы, и для
+каждого {% include %} и {% extends %}, так что в метрики попадает
+время каждого фрагмента: полное и собственное, без вложенных.
+
+CachedLoader — django.template.loaders.cached.Loader, который кеширует
+уже профилируемые шаблоны. При DEBUG используются FilesystemLoader
+и AppDirectoriesLoader: шаблоны перечитываются с диска, как обычно.
+"""
+from django.template import Template, TemplateDoesNotExist
+from django.template.loaders import app_directories, base, cached, filesystem
+
+from . import metrics
+
+
+class ProfiledTemplate(Template):
+    def _render(self, context):
+        return metrics.profile_template(self.name, super()._render, context)
+
+
+class ProfilingMixin(base.Loader):
+    def get_template(self, template_name, skip=None):
+        tried = []
+        for origin in self.get_template_sources(template_name):
+            if skip is not None and origin in skip:
+                tried.append((origin, 'Skipped'))
+                continue
+            try:
+                contents = self.get_contents(origin)
+            except TemplateDoesNotExist:
+                tried.append((origin, 'Source does not exist'))
+                continue
+            return ProfiledTemplate(
+                contents, origin, origin.template_name, self.engine
+            )
+        raise TemplateDoesNotExist(template_name, tried=tried)
+
+
+class FilesystemLoader(ProfilingMixin, filesystem.Loader):
+    pass
+
+
+class AppDirectoriesLoader(ProfilingMixin, app_directories.Loader):
+    pass
+
+
+class CachedLoader(cached.Loader, ProfilingMixin):
+    pass
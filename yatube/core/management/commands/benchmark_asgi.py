@@ -0,0 +1,140 @@
+import asyncio
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+
+from core.asgi import WsgiToAsgi, build_environ
+from core.metrics import percentile
+
+
+def _scope(path):
+    parts = urlsplit(path)
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': parts.path,
+        'query_string': parts.query.encode(),
+        'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 0),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Пропускная способность при множестве медленных клиентов: '
+        'воркеры WSGI против моста yatube.asgi с тем же числом потоков.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/')
+        parser.add_argument('--clients', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--threads', type=int, default=settings.ASGI_THREADS,
+            help='Воркеры WSGI и потоки пула ASGI.',
+        )
+        parser.add_argument(
+            '--client-delay', type=float, default=0.05,
+            help='Сколько секунд медленный клиент читает ответ.',
+        )
+
+    def handle(self, *args, path, clients, requests, threads, client_delay,
+               **options):
+        wsgi = get_wsgi_application()
+        for mode, run in (('wsgi', self.run_wsgi), ('asgi', self.run_asgi)):
+            started = time.perf_counter()
+            latencies = run(wsgi, path, clients, requests, threads,
+                            client_delay)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{mode} requests={len(latencies)} '
+                f'rps={len(latencies) / elapsed:.0f} '
+                f'p50_ms={percentile(latencies, 0.5):.1f} '
+                f'p95_ms={percentile(latencies, 0.95):.1f}'
+            )
+
+    def run_wsgi(self, wsgi, path, clients, requests, threads, client_delay):
+        """Воркер WSGI занят, пока клиент не дочитает ответ.
+
+        clients потоков-клиентов ставят запросы в очередь пула
+        из threads воркеров, как в синхронном сервере.
+        """
+        latencies = []
+        lock = threading.Lock()
+        remaining = iter(range(requests))
+
+        def serve():
+            environ = build_environ(_scope(path), io.BytesIO())
+
+            def start_response(status, headers, exc_info=None):
+                pass
+
+            response = wsgi(environ, start_response)
+            try:
+                for _ in response:
+                    pass
+                time.sleep(client_delay)
+            finally:
+                response.close()
+
+        def client(workers):
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                started = time.perf_counter()
+                workers.submit(serve).result()
+                with lock:
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+        with ThreadPoolExecutor(max_workers=threads) as workers:
+            with ThreadPoolExecutor(max_workers=clients) as pool:
+                futures = [
+                    pool.submit(client, workers) for _ in range(clients)
+                ]
+                for future in futures:
+                    future.result()
+        return latencies
+
+    def run_asgi(self, wsgi, path, clients, requests, threads, client_delay):
+        """Поток пула освобождается до того, как клиент прочтёт ответ."""
+        application = WsgiToAsgi(wsgi, threads)
+        latencies = []
+        remaining = iter(range(requests))
+
+        async def request():
+            started = time.perf_counter()
+            received = [{'type': 'http.request', 'body': b''}]
+
+            async def receive():
+                return received.pop()
+
+            async def send(message):
+                if message['type'] == 'http.response.body':
+                    if not message.get('more_body', False):
+                        await asyncio.sleep(client_delay)
+
+            await application(_scope(path), receive, send)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        async def client():
+            while next(remaining, None) is not None:
+                await request()
+
+        async def main():
+            await asyncio.gather(*(client() for _ in range(clients)))
+
+        try:
+            asyncio.run(main())
+        finally:
+            application.executor.shutdown(wait=True)
+        return latencies
@@ -0,0 +1,132 @@
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connections
+
+from core.metrics import percentile
+from posts.models import Comment, Post, User
+
+# Настройки SQLite по умолчанию: журнал отката и полная синхронизация.
+BASELINE_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+}
+
+
+def _worker(role, path, pragmas, duration, seed, results):
+    """Читатель открывает ленту, писатель добавляет комментарии."""
+    settings.SQLITE_PRAGMAS = pragmas
+    connection = connections['default']
+    connection.settings_dict['NAME'] = path
+    rng = random.Random(seed)
+    post_ids = list(Post.objects.values_list('pk', flat=True)[:500])
+    user_ids = list(User.objects.values_list('pk', flat=True)[:500])
+    done, locked, latencies = 0, 0, []
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            if role == 'reader':
+                list(Post.objects.for_feed()[:settings.AMOUNT_POSTS])
+            else:
+                Comment.objects.create(
+                    post_id=rng.choice(post_ids),
+                    author_id=rng.choice(user_ids),
+                    text='Комментарий для замера',
+                )
+        except OperationalError as error:
+            if 'locked' not in str(error):
+                raise
+            locked += 1
+            close_old_connections()
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+        done += 1
+    connection.close()
+    results.put((role, done, locked, latencies))
+
+
+class Command(BaseCommand):
+    help = (
+        'Параллельные чтение и запись в копию базы SQLite несколькими '
+        'процессами: сравнение настроек по умолчанию и SQLITE_PRAGMAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--duration', type=float, default=5,
+            help='Длительность каждого прогона в секундах.',
+        )
+
+    def handle(self, *args, readers, writers, duration, **options):
+        source = connections['default']
+        if source.vendor != 'sqlite':
+            raise CommandError('Замер имеет смысл только для SQLite.')
+        if not Post.objects.exists():
+            raise CommandError(
+                'База пуста: сначала выполните generate_load_data.'
+            )
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'benchmark.sqlite3')
+            for mode, pragmas in (
+                ('baseline', BASELINE_PRAGMAS),
+                ('tuned', settings.SQLITE_PRAGMAS),
+            ):
+                source.ensure_connection()
+                target = sqlite3.connect(path)
+                try:
+                    source.connection.backup(target)
+                finally:
+                    target.close()
+                self.report(mode, self.run(
+                    path, pragmas, readers, writers, duration
+                ), duration)
+        finally:
+            shutil.rmtree(directory)
+
+    def run(self, path, pragmas, readers, writers, duration):
+        # Дочерние процессы не должны унаследовать открытые соединения.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        roles = ['reader'] * readers + ['writer'] * writers
+        processes = [
+            context.Process(
+                target=_worker,
+                args=(role, path, pragmas, duration, seed, results),
+            )
+            for seed, role in enumerate(roles)
+        ]
+        for process in processes:
+            process.start()
+        collected = [
+            results.get(timeout=duration + 60) for _ in processes
+        ]
+        for process in processes:
+            process.join()
+        return collected
+
+    def report(self, mode, collected, duration):
+        for role in ('reader', 'writer'):
+            rows = [row for row in collected if row[0] == role]
+            if not rows:
+                continue
+            done = sum(row[1] for row in rows)
+            locked = sum(row[2] for row in rows)
+            latencies = [value for row in rows for value in row[3]]
+            p95 = percentile(latencies, 0.95) if latencies else 0
+            self.stdout.write(
+                f'{mode:8} {role}s={len(rows)} '
+                f'ops/s={done / duration:.0f} p95_ms={p95:.1f} '
+                f'locked={locked}'
+            )
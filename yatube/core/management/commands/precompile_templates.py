@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.precompile import precompile_templates
+
+
+class Command(BaseCommand):
+    help = 'Компилирует все шаблоны и сообщает об ошибках синтаксиса.'
+
+    def handle(self, *args, **options):
+        compiled, failed = precompile_templates()
+        for name, error in failed:
+            self.stderr.write(f'{name}: {error}')
+        self.stdout.write(f'Скомпилировано шаблонов: {compiled}')
+        if failed:
+            raise CommandError(f'Шаблонов с ошибками: {len(failed)}')
@@ -0,0 +1,34 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.routers import PRIMARY
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик '
+        '(YATUBE_DB_REPLICAS) — замена репликации для разработки.'
+    )
+
+    def handle(self, *args, **options):
+        primary = connections[PRIMARY]
+        if primary.vendor != 'sqlite':
+            raise CommandError(
+                'Команда нужна только для SQLite: настоящие реплики '
+                'получают данные через репликацию сервера базы.'
+            )
+        if not settings.DATABASE_REPLICAS:
+            self.stdout.write('Реплики не настроены.')
+            return
+        primary.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            connections[alias].close()
+            target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(f'{alias}: обновлена')
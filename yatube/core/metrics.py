@@ -0,0 +1,245 @@
+"""Метрики запросов: время, SQL, кеш и шаблоны.
+
+Замеры текущего запроса лежат в contextvar, поэтому код, который
+ничего не знает о запросе (кеш-бэкенды, движок шаблонов), может
+вызывать record_* без передачи состояния. Вне запроса эти функции
+ничего не делают.
+
+Гистограммы копятся в памяти процесса: при нескольких воркерах
+каждый отдаёт свои значения, а Prometheus суммирует их по instance.
+"""
+import contextvars
+import threading
+import time
+
+from django.conf import settings
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0.0
+        # Имя шаблона -> [рендеров, полное время, собственное время].
+        self.templates = {}
+        self._template_children = []
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def start():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def finish(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+def record_query(duration):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.db_queries += 1
+        metrics.db_time += duration
+
+
+def record_cache(hit):
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+def record_template(duration):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.template_time += duration
+
+
+def profile_template(name, render, context):
+    """Выполнить render(context) и учесть время шаблона name.
+
+    Собственное время — полное за вычетом вложенных шаблонов
+    ({% include %}, родитель в {% extends %}).
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return render(context)
+    children = metrics._template_children
+    children.append(0.0)
+    started = time.perf_counter()
+    try:
+        return render(context)
+    finally:
+        elapsed = time.perf_counter() - started
+        nested = children.pop()
+        if children:
+            children[-1] += elapsed
+        entry = metrics.templates.setdefault(name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] += elapsed - nested
+
+
+def top_templates(metrics, limit=3):
+    """Шаблоны с наибольшим собственным временем."""
+    return sorted(
+        metrics.templates.items(), key=lambda item: item[1][2], reverse=True
+    )[:limit]
+
+
+def percentile(values, share):
+    """Перцентиль с линейной интерполяцией между соседними рангами."""
+    values = sorted(values)
+    if not values:
+        return None
+    position = (len(values) - 1) * share
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (
+        position - lower
+    )
+
+
+class QueryTimer:
+    """Обёртка для connection.execute_wrapper(): считает запросы."""
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            record_query(time.perf_counter() - started)
+
+
+class Registry:
+    """Гистограммы длительности и счётчики по имени URL."""
+
+    COUNTERS = (
+        ('db_queries', 'yatube_db_queries_total',
+         'Число SQL-запросов.'),
+        ('db_time', 'yatube_db_duration_seconds_total',
+         'Суммарное время SQL-запросов.'),
+        ('cache_hits', 'yatube_cache_hits_total',
+         'Попадания в кеш.'),
+        ('cache_misses', 'yatube_cache_misses_total',
+         'Промахи кеша.'),
+        ('template_time', 'yatube_template_duration_seconds_total',
+         'Суммарное время рендеринга шаблонов.'),
+    )
+
+    TEMPLATE_COUNTERS = (
+        ('yatube_template_renders_total',
+         'Число рендеров шаблона, включая {% include %}.'),
+        ('yatube_template_render_seconds_total',
+         'Время рендеринга шаблона вместе с вложенными.'),
+        ('yatube_template_self_seconds_total',
+         'Время рендеринга шаблона без вложенных.'),
+    )
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._views = {}
+        self._templates = {}
+
+    def observe(self, view, metrics, duration):
+        with self._lock:
+            data = self._views.get(view)
+            if data is None:
+                data = self._views[view] = {
+                    'buckets': [0] * len(self.buckets),
+                    'count': 0,
+                    'sum': 0.0,
+                    **{name: 0 for name, _, _ in self.COUNTERS},
+                }
+            for index, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    data['buckets'][index] += 1
+            data['count'] += 1
+            data['sum'] += duration
+            for name, _, _ in self.COUNTERS:
+                data[name] += getattr(metrics, name)
+            for name, values in metrics.templates.items():
+                totals = self._templates.setdefault((view, name), [0, 0, 0])
+                for index, value in enumerate(values):
+                    totals[index] += value
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+            self._templates.clear()
+
+    def render(self):
+        """Текстовый формат экспозиции Prometheus 0.0.4."""
+        with self._lock:
+            views = {
+                view: {
+                    key: list(value) if key == 'buckets' else value
+                    for key, value in data.items()
+                }
+                for view, data in sorted(self._views.items())
+            }
+            templates = sorted(
+                (key, list(values)) for key, values in self._templates.items()
+            )
+        name = 'yatube_request_duration_seconds'
+        lines = [
+            f'# HELP {name} Время обработки запроса.',
+            f'# TYPE {name} histogram',
+        ]
+        for view, data in views.items():
+            label = _escape(view)
+            for bound, count in zip(self.buckets, data['buckets']):
+                lines.append(
+                    f'{name}_bucket{{view="{label}",le="{bound:g}"}} {count}'
+                )
+            lines.append(
+                f'{name}_bucket{{view="{label}",le="+Inf"}} {data["count"]}'
+            )
+            lines.append(f'{name}_sum{{view="{label}"}} {data["sum"]:.6f}')
+            lines.append(f'{name}_count{{view="{label}"}} {data["count"]}')
+        for key, counter, help_text in self.COUNTERS:
+            lines.append(f'# HELP {counter} {help_text}')
+            lines.append(f'# TYPE {counter} counter')
+            for view, data in views.items():
+                value = _number(data[key])
+                lines.append(f'{counter}{{view="{_escape(view)}"}} {value}')
+        for index, (counter, help_text) in enumerate(self.TEMPLATE_COUNTERS):
+            lines.append(f'# HELP {counter} {help_text}')
+            lines.append(f'# TYPE {counter} counter')
+            for (view, template), values in templates:
+                lines.append(
+                    f'{counter}{{view="{_escape(view)}",'
+                    f'template="{_escape(template)}"}} '
+                    f'{_number(values[index])}'
+                )
+        return '\n'.join(lines) + '\n'
+
+
+def _number(value):
+    if isinstance(value, float):
+        return f'{value:.6f}'
+    return str(value)
+
+
+def _escape(value):
+    return (
+        value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    )
+
+
+registry = Registry(settings.METRICS_BUCKETS)
@@ -0,0 +1,149 @@
+import contextlib
+import logging
+import random
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+from .querylog import QueryInspector
+from .routers import pin_primary
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+logger = logging.getLogger('yatube.requests')
+
+
+class PerformanceMiddleware:
+    """Замеры каждого запроса: заголовок Server-Timing, строка лога
+    и гистограммы по имени URL для /metrics/.
+
+    Ставится первым в MIDDLEWARE, чтобы учитывать и остальные
+    промежуточные слои.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics, token = metrics.start()
+        try:
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.QueryTimer())
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.finish(token)
+        duration = request_metrics.elapsed
+        view = self.view_name(request)
+        metrics.registry.observe(view, request_metrics, duration)
+        response['Server-Timing'] = self.server_timing(
+            request_metrics, duration
+        )
+        logger.info(
+            'method=%s path=%s view=%s status=%s total_ms=%.1f '
+            'db_queries=%d db_ms=%.1f cache_hits=%d cache_misses=%d '
+            'template_ms=%.1f top_templates=%s',
+            request.method, request.path, view, response.status_code,
+            duration * 1000, request_metrics.db_queries,
+            request_metrics.db_time * 1000, request_metrics.cache_hits,
+            request_metrics.cache_misses,
+            request_metrics.template_time * 1000,
+            ','.join(
+                f'{name}:{count}x{self_time * 1000:.1f}ms'
+                for name, (count, _, self_time)
+                in metrics.top_templates(request_metrics)
+            ) or '-',
+            extra={
+                'view': view,
+                'status': response.status_code,
+                'duration': duration,
+                'db_queries': request_metrics.db_queries,
+                'templates': request_metrics.templates,
+            },
+        )
+        return response
+
+    @staticmethod
+    def view_name(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unresolved'
+        return match.view_name
+
+    @staticmethod
+    def server_timing(request_metrics, duration):
+        return ', '.join((
+            f'total;dur={duration * 1000:.1f}',
+            f'db;dur={request_metrics.db_time * 1000:.1f};'
+            f'desc="{request_metrics.db_queries} queries"',
+            f'tpl;dur={request_metrics.template_time * 1000:.1f}',
+            f'cache;desc="hit={request_metrics.cache_hits} '
+            f'miss={request_metrics.cache_misses}"',
+        ))
+
+
+class QueryLogMiddleware:
+    """Журнал медленных запросов и N+1 для выборки запросов.
+
+    Запросы вне выборки проходят без обёртки, поэтому при малой
+    доле QUERY_LOG_SAMPLE_RATE накладные расходы почти нулевые.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.QUERY_LOG_SAMPLE_RATE:
+            return self.get_response(request)
+        inspector = QueryInspector(
+            request,
+            settings.SLOW_QUERY_THRESHOLD_MS,
+            settings.N_PLUS_ONE_THRESHOLD,
+        )
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(inspector))
+            return self.get_response(request)
+
+
+class ReplicaPinMiddleware:
+    """Чтение своих записей при работе с репликами.
+
+    Запросы, меняющие данные, читают из основной базы и ставят куку
+    REPLICA_PIN_COOKIE; пока она жива, чтение тоже идёт в основную
+    базу, и, например, редирект после создания поста уже видит пост,
+    даже если реплика отстаёт. Тело потокового ответа читается уже
+    после выхода из представления, поэтому его перебор тоже идёт
+    внутри pin_primary.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def pinned_stream(content):
+        with pin_primary():
+            yield from content
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        writes = request.method not in SAFE_METHODS
+        if not writes and settings.REPLICA_PIN_COOKIE not in request.COOKIES:
+            return self.get_response(request)
+        with pin_primary():
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = self.pinned_stream(
+                response.streaming_content
+            )
+        if writes:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,47 @@
+"""Компиляция всех шаблонов при старте процесса.
+
+С кеширующим загрузчиком шаблон компилируется при первом запросе,
+который его использует, и этот запрос платит за чтение с диска
+и разбор. precompile_templates проходит по всем каталогам шаблонов
+и загружает каждый файл заранее; ошибки синтаксиса попадают в лог
+при старте, а не в ответ пользователю.
+"""
+import logging
+import os
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.utils import get_app_template_dirs
+
+logger = logging.getLogger('yatube.templates')
+
+
+def template_names(backend):
+    directories = [*backend.engine.dirs, *get_app_template_dirs('templates')]
+    names = set()
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for file in files:
+                if file.startswith('.'):
+                    continue
+                path = os.path.relpath(os.path.join(root, file), directory)
+                names.add(path.replace(os.sep, '/'))
+    return sorted(names)
+
+
+def precompile_templates():
+    """Загрузить все шаблоны; вернуть число и список (имя, ошибка)."""
+    compiled, failed = 0, []
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in template_names(backend):
+            try:
+                backend.engine.get_template(name)
+            except (TemplateSyntaxError, TemplateDoesNotExist,
+                    UnicodeDecodeError) as error:
+                logger.warning('template=%s error=%s', name, error)
+                failed.append((name, error))
+            else:
+                compiled += 1
+    return compiled, failed
@@ -0,0 +1,65 @@
+"""Журнал медленных SQL-запросов и поиск N+1.
+
+QueryInspector подключается через connection.execute_wrapper() к части
+запросов (settings.QUERY_LOG_SAMPLE_RATE). Запросы дольше
+settings.SLOW_QUERY_THRESHOLD_MS пишутся в лог с нормализованным SQL
+и представлением, а запрос одной «формы», повторённый в рамках одного
+HTTP-запроса settings.N_PLUS_ONE_THRESHOLD раз, помечается как
+вероятный N+1.
+"""
+import functools
+import logging
+import re
+import time
+from collections import Counter
+
+logger = logging.getLogger('yatube.sql')
+
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)', re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACES = re.compile(r'\s+')
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize(sql):
+    """Форма запроса: литералы и списки IN (...) заменены на «?»."""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    return _SPACES.sub(' ', sql).replace('%s', '?').strip()
+
+
+class QueryInspector:
+    def __init__(self, request, threshold_ms, repeat_threshold):
+        self.request = request
+        self.threshold = threshold_ms / 1000
+        self.repeat_threshold = repeat_threshold
+        self.shapes = Counter()
+
+    @property
+    def view(self):
+        match = getattr(self.request, 'resolver_match', None)
+        return match.view_name if match else self.request.path
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.inspect(sql, time.perf_counter() - started)
+
+    def inspect(self, sql, duration):
+        shape = normalize(sql)
+        self.shapes[shape] += 1
+        if duration >= self.threshold:
+            logger.warning(
+                'slow query view=%s ms=%.1f sql=%s',
+                self.view, duration * 1000, shape,
+            )
+        # Пишем один раз на форму — при достижении порога.
+        if self.shapes[shape] == self.repeat_threshold:
+            logger.warning(
+                'possible N+1 view=%s repeats=%d sql=%s',
+                self.view, self.repeat_threshold, shape,
+            )
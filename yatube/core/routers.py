@@ -0,0 +1,61 @@
+"""Маршрутизация запросов к базе: запись — в default, чтение — в реплики.
+
+Реплики перечислены в settings.DATABASE_REPLICAS. Чтобы пользователь
+сразу видел свои изменения, запросы внутри pin_primary() читают
+из основной базы: так работают POST-запросы и несколько секунд после
+них (core.middleware.ReplicaPinMiddleware), а также фоновые задачи,
+которые читают только что записанные строки.
+
+Таблицы кеша (DatabaseCache) и сессий всегда читаются из основной
+базы: в кеше лежат поколения лент, и отстающая реплика вернула бы
+устаревшее поколение сразу после записи.
+"""
+import contextlib
+import contextvars
+import random
+
+from django.conf import settings
+
+PRIMARY = 'default'
+# app_label моделей, которые читаются только из основной базы;
+# django_cache — служебная модель DatabaseCache
+PRIMARY_ONLY_APPS = ('django_cache', 'sessions')
+
+_pinned = contextvars.ContextVar('pinned_to_primary', default=False)
+
+
+@contextlib.contextmanager
+def pin_primary():
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def is_pinned():
+    return _pinned.get()
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (
+            not replicas or _pinned.get()
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+        ):
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными от основной базы.
+        return db == PRIMARY
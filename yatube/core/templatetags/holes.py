@@ -0,0 +1,22 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from core import holes
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, name, **kwargs):
+    """Часть страницы, которая рендерится для каждого посетителя.
+
+    При записи страницы в кеш (request.page_cache_holes) выводит
+    маркер, иначе рендерит шаблон дыры в текущем контексте.
+    """
+    request = context.get('request')
+    if getattr(request, 'page_cache_holes', False):
+        return holes.marker(name, kwargs)
+    template_name, _ = holes.get(name)
+    nested = context.template.engine.get_template(template_name)
+    with context.push(**holes.extra_context(name, request, kwargs)):
+        return mark_safe(nested.render(context))
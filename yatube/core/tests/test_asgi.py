@@ -0,0 +1,229 @@
+import asyncio
+import io
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.signals import request_finished
+from django.core.wsgi import get_wsgi_application
+from django.db.models import prefetch_related_objects
+from django.test import (
+    SimpleTestCase, TransactionTestCase, override_settings,
+)
+
+from core.asgi import STREAM_WINDOW, WsgiToAsgi
+from posts.models import Post
+
+User = get_user_model()
+
+
+def scope(path='/', query_string=b'', headers=()):
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'POST',
+        'scheme': 'http',
+        'path': path,
+        'query_string': query_string,
+        'headers': list(headers),
+        'server': ('localhost', 8000),
+        'client': ('127.0.0.1', 5000),
+    }
+
+
+def call(application, scope, body_parts=(b'',)):
+    """Выполнить ASGI-запрос; вернуть отправленные сообщения."""
+    received = [
+        {
+            'type': 'http.request',
+            'body': part,
+            'more_body': number < len(body_parts) - 1,
+        }
+        for number, part in enumerate(body_parts)
+    ]
+    sent = []
+
+    async def receive():
+        return received.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    application.executor.shutdown(wait=True)
+    return sent
+
+
+class WsgiToAsgiTest(SimpleTestCase):
+    def test_environ_and_body(self):
+        """Путь, строка запроса, заголовки и тело доходят до WSGI."""
+        seen = {}
+
+        def wsgi(environ, start_response):
+            seen.update(environ)
+            seen['body'] = environ['wsgi.input'].read()
+            # Значения заголовков WSGI — байты в latin-1.
+            value = 'да'.encode().decode('latin-1')
+            start_response('201 Created', [('X-Test', value)])
+            return [b'ok']
+
+        sent = call(WsgiToAsgi(wsgi, 1), scope(
+            path='/профиль/',
+            query_string=b'page=2',
+            headers=[
+                (b'content-type', b'text/plain'),
+                (b'cookie', b'a=1'),
+                (b'cookie', b'b=2'),
+            ],
+        ), body_parts=(b'he', b'llo'))
+        self.assertEqual(seen['body'], b'hello')
+        self.assertEqual(
+            seen['PATH_INFO'].encode('latin-1').decode(), '/профиль/'
+        )
+        self.assertEqual(seen['QUERY_STRING'], 'page=2')
+        self.assertEqual(seen['CONTENT_TYPE'], 'text/plain')
+        self.assertEqual(seen['HTTP_COOKIE'], 'a=1; b=2')
+        self.assertEqual(seen['SERVER_PORT'], '8000')
+        self.assertEqual(sent[0]['status'], 201)
+        self.assertEqual(sent[0]['headers'], [(b'x-test', 'да'.encode())])
+        self.assertEqual(
+            sent[1], {'type': 'http.response.body', 'body': b'ok'}
+        )
+
+    def test_streaming_response_sent_by_chunks(self):
+        """Потоковый ответ уходит порциями и закрывается."""
+        closed = []
+
+        class Streaming:
+            streaming = True
+
+            def __iter__(self):
+                return iter([b'one', b'', b'two'])
+
+            def close(self):
+                closed.append(True)
+
+        def wsgi(environ, start_response):
+            start_response('200 OK', [])
+            return Streaming()
+
+        sent = call(WsgiToAsgi(wsgi, 1), scope())
+        self.assertEqual(
+            [message.get('body') for message in sent[1:]],
+            [b'one', b'two', b''],
+        )
+        self.assertTrue(sent[1]['more_body'])
+        self.assertFalse(sent[-1].get('more_body', False))
+        self.assertEqual(closed, [True])
+
+    def test_disconnect_stops_stream(self):
+        """Если клиент ушёл, поток перестаёт читать ответ и закрывает его."""
+        produced = []
+        closed = []
+
+        class Streaming:
+            streaming = True
+
+            def __iter__(self):
+                for number in range(STREAM_WINDOW * 4):
+                    produced.append(number)
+                    yield b'chunk'
+
+            def close(self):
+                closed.append(threading.get_ident())
+
+        def wsgi(environ, start_response):
+            start_response('200 OK', [])
+            return Streaming()
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            if message.get('more_body'):
+                raise ConnectionResetError
+
+        application = WsgiToAsgi(wsgi, 1)
+        with self.assertRaises(ConnectionResetError):
+            asyncio.run(application(scope(), receive, send))
+        application.executor.shutdown(wait=True)
+        self.assertEqual(len(closed), 1)
+        self.assertLessEqual(len(produced), STREAM_WINDOW + 2)
+
+    def test_lifespan(self):
+        messages = [
+            {'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'},
+        ]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        application = WsgiToAsgi(None, 1)
+        asyncio.run(application({'type': 'lifespan'}, receive, send))
+        self.assertEqual(
+            sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+        )
+
+
+class DjangoOverAsgiTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create_user(username='author')
+        Post.objects.create(text='Пост через ASGI', author=author)
+
+    def test_index_page(self):
+        """Главная страница отдаётся через мост."""
+        application = WsgiToAsgi(get_wsgi_application(), 2)
+        request = scope(headers=[(b'host', b'localhost')])
+        request['method'] = 'GET'
+        sent = call(application, request)
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn('Пост через ASGI', sent[1]['body'].decode())
+
+    @override_settings(
+        STREAMING_FEED_VIEWS=('index',), STREAMING_FEED_CHUNK=2
+    )
+    def test_streamed_feed_on_one_thread(self):
+        """Потоковая лента читается и закрывается в одном потоке."""
+        author = User.objects.get(username='author')
+        for number in range(9):
+            Post.objects.create(text=f'Пост {number}', author=author)
+        threads = []
+
+        def prefetch(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return prefetch_related_objects(*args, **kwargs)
+
+        def finished(**kwargs):
+            threads.append(threading.get_ident())
+
+        request_finished.connect(finished)
+        self.addCleanup(request_finished.disconnect, finished)
+        request = scope(headers=[(b'host', b'localhost')])
+        request['method'] = 'GET'
+        with mock.patch('posts.streaming.prefetch_related_objects', prefetch):
+            sent = call(WsgiToAsgi(get_wsgi_application(), 4), request)
+        self.assertEqual(sent[0]['status'], 200)
+        content = b''.join(message.get('body', b'') for message in sent[1:])
+        for number in range(9):
+            self.assertIn(f'Пост {number}'.encode(), content)
+        self.assertEqual(len(sent), 1 + 12 + 1)
+        # Пачки по 2 поста и закрытие ответа
+        self.assertEqual(len(threads), 5 + 1)
+        self.assertEqual(len(set(threads)), 1)
+
+    def test_benchmark(self):
+        out = io.StringIO()
+        call_command(
+            'benchmark_asgi', clients=2, requests=4, threads=2,
+            client_delay=0, stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith('wsgi requests=4'))
+        self.assertTrue(lines[1].startswith('asgi requests=4'))
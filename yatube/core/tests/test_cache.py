@@ -0,0 +1,169 @@
+import time
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from core.cache import INCR_EXISTING, RedisCache
+
+
+class FakeRedis:
+    """Заглушка клиента redis-py, хранящая данные в словаре."""
+
+    def __init__(self):
+        self.data = {}
+
+    @classmethod
+    def from_url(cls, url):
+        return cls()
+
+    def _alive(self, key):
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires = item
+        if expires is not None and expires < time.monotonic():
+            del self.data[key]
+            return None
+        return item
+
+    def get(self, key):
+        item = self._alive(key)
+        return None if item is None else item[0]
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and self._alive(key) is not None:
+            return None
+        expires = None if ex is None else time.monotonic() + ex
+        self.data[key] = (value, expires)
+        return True
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def exists(self, key):
+        return int(self._alive(key) is not None)
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def incrby(self, key, delta):
+        value, expires = self._alive(key)
+        value = int(value) + delta
+        self.data[key] = (str(value).encode(), expires)
+        return value
+
+    def register_script(self, script):
+        """Заглушка понимает только скрипт INCR_EXISTING."""
+        if script != INCR_EXISTING:
+            raise NotImplementedError(script)
+
+        def incr_existing(keys, args):
+            if self._alive(keys[0]) is None:
+                return None
+            return self.incrby(keys[0], int(args[0]))
+        return incr_existing
+
+    def expire(self, key, seconds):
+        item = self._alive(key)
+        if item is None:
+            return False
+        self.data[key] = (item[0], time.monotonic() + seconds)
+        return True
+
+    def persist(self, key):
+        item = self._alive(key)
+        if item is None:
+            return False
+        self.data[key] = (item[0], None)
+        return True
+
+    def flushdb(self):
+        self.data.clear()
+
+
+def redis_cache():
+    return RedisCache('redis://fake', {
+        'OPTIONS': {'CLIENT_CLASS': 'core.tests.test_cache.FakeRedis'},
+    })
+
+
+class RedisCacheTest(SimpleTestCase):
+    def test_set_get_delete(self):
+        """Значения любых типов сохраняются и удаляются."""
+        cache = redis_cache()
+        cache.set('key', {'posts': [1, 2]})
+        self.assertEqual(cache.get('key'), {'posts': [1, 2]})
+        cache.delete('key')
+        self.assertIsNone(cache.get('key'))
+
+    def test_add_does_not_overwrite(self):
+        cache = redis_cache()
+        self.assertTrue(cache.add('key', 1))
+        self.assertFalse(cache.add('key', 2))
+        self.assertEqual(cache.get('key'), 1)
+
+    def test_incr(self):
+        """incr атомарно увеличивает целые и падает на пустом ключе."""
+        cache = redis_cache()
+        with self.assertRaises(ValueError):
+            cache.incr('generation')
+        cache.set('generation', 10)
+        self.assertEqual(cache.incr('generation'), 11)
+        self.assertEqual(cache.get('generation'), 11)
+
+    def test_incr_is_one_command(self):
+        """Проверка ключа и INCRBY идут одним скриптом, без EXISTS."""
+        cache = redis_cache()
+        cache.set('generation', 1)
+        with mock.patch.object(
+            cache.client, 'exists', side_effect=AssertionError
+        ), mock.patch.object(
+            cache.client, 'incrby', wraps=cache.client.incrby
+        ) as incrby:
+            self.assertEqual(cache.incr('generation', 5), 6)
+        incrby.assert_called_once()
+
+    def test_get_many_and_clear(self):
+        cache = redis_cache()
+        cache.set_many({'a': 'x', 'b': 'y'})
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), {'a': 'x', 'b': 'y'})
+        cache.clear()
+        self.assertEqual(cache.get_many(['a', 'b']), {})
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'core.cache.RedisCache',
+        'LOCATION': 'redis://fake',
+        'OPTIONS': {'CLIENT_CLASS': 'core.tests.test_cache.FakeRedis'},
+    },
+    'feed': {
+        'BACKEND': 'core.cache.TieredCache',
+        'OPTIONS': {'SHARED_ALIAS': 'default', 'LOCAL_MAX_ENTRIES': 2},
+    },
+})
+class TieredCacheTest(SimpleTestCase):
+    def test_reads_through_shared_tier(self):
+        """Значение из общего кеша попадает в локальный уровень."""
+        caches['default'].set('page', 'html')
+        self.assertEqual(caches['feed'].get('page'), 'html')
+        caches['default'].delete('page')
+        self.assertEqual(caches['feed'].get('page'), 'html')
+
+    def test_writes_go_to_shared_tier(self):
+        """Запись видна другим процессам через общий кеш."""
+        caches['feed'].set('page', 'html')
+        self.assertEqual(caches['default'].get('page'), 'html')
+        caches['feed'].delete('page')
+        self.assertIsNone(caches['default'].get('page'))
+        self.assertIsNone(caches['feed'].get('page'))
+
+    def test_local_tier_is_bounded(self):
+        """Локальный уровень вытесняет самые старые ключи."""
+        feed = caches['feed']
+        for key in ('a', 'b', 'c'):
+            feed.set(key, key)
+        caches['default'].clear()
+        self.assertIsNone(feed.get('a'))
+        self.assertEqual(feed.get('c'), 'c')
@@ -0,0 +1,112 @@
+import copy
+import os
+from unittest import mock
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import production_settings, refuse_debug_settings
+from yatube.settings.env import env_bool, env_int, env_list, env_required
+
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': '/tmp/yatube-cache',
+    },
+}
+MANIFEST = 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+
+
+def databases(conn_max_age):
+    databases = copy.deepcopy(settings.DATABASES)
+    databases['default']['CONN_MAX_AGE'] = conn_max_age
+    return databases
+
+
+def cached_templates():
+    templates = copy.deepcopy(settings.TEMPLATES)
+    templates[0]['OPTIONS']['loaders'] = [
+        ('core.loaders.CachedLoader', [
+            'django.template.loaders.filesystem.Loader',
+        ]),
+    ]
+    return templates
+
+
+class ProductionSettingsTest(SimpleTestCase):
+    def production(self, **overrides):
+        values = {
+            'PRODUCTION': True,
+            'DEBUG': False,
+            'CACHES': SHARED_CACHES,
+            'TEMPLATES': cached_templates(),
+            'DATABASES': databases(60),
+            'STATICFILES_STORAGE': MANIFEST,
+            **overrides,
+        }
+        return override_settings(**values)
+
+    def ids(self):
+        return [error.id for error in production_settings()]
+
+    def test_development_not_checked(self):
+        """Вне prod настройки разработки допустимы."""
+        self.assertFalse(settings.PRODUCTION)
+        self.assertEqual(production_settings(), [])
+
+    def test_production_settings_pass(self):
+        with self.production():
+            self.assertEqual(production_settings(), [])
+            refuse_debug_settings()
+
+    def test_debug_grade_settings_refused(self):
+        """Каждая настройка для разработки даёт свою ошибку."""
+        cases = {
+            'core.E001': {'DEBUG': True},
+            'core.E002': {'CACHES': {'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            }}},
+            'core.E003': {'TEMPLATES': settings.TEMPLATES},
+            'core.E004': {'DATABASES': databases(0)},
+            'core.E005': {
+                'INSTALLED_APPS': settings.INSTALLED_APPS + ['debug_toolbar'],
+            },
+        }
+        for error_id, overrides in cases.items():
+            with self.subTest(error_id=error_id), self.production(
+                **overrides
+            ):
+                self.assertEqual(self.ids(), [error_id])
+                with self.assertRaisesMessage(
+                    ImproperlyConfigured, error_id
+                ):
+                    refuse_debug_settings()
+
+    def test_static_storage_warning_does_not_refuse(self):
+        storage = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        with self.production(STATICFILES_STORAGE=storage):
+            self.assertEqual(self.ids(), ['core.W001'])
+            refuse_debug_settings()
+
+
+class EnvTest(SimpleTestCase):
+    def test_values(self):
+        variables = {
+            'YATUBE_TEST_BOOL': 'Yes',
+            'YATUBE_TEST_INT': '7',
+            'YATUBE_TEST_LIST': ' a, ,b ',
+        }
+        with mock.patch.dict(os.environ, variables):
+            self.assertTrue(env_bool('YATUBE_TEST_BOOL'))
+            self.assertTrue(env_bool('YATUBE_TEST_MISSING', True))
+            self.assertEqual(env_int('YATUBE_TEST_INT', 1), 7)
+            self.assertEqual(env_list('YATUBE_TEST_LIST'), ['a', 'b'])
+            self.assertEqual(env_list('YATUBE_TEST_MISSING'), [])
+
+    def test_required(self):
+        with mock.patch.dict(os.environ, {'YATUBE_TEST_KEY': ''}):
+            with self.assertRaisesMessage(
+                ImproperlyConfigured, 'YATUBE_TEST_KEY'
+            ):
+                env_required('YATUBE_TEST_KEY')
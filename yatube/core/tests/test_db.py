@@ -0,0 +1,53 @@
+import io
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class SqlitePragmasTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'db.sqlite3')
+        settings_dict = {**connections['default'].settings_dict, 'NAME': path}
+        self.connection = type(connections['default'])(settings_dict)
+        self.addCleanup(self.connection.close)
+
+    def pragma(self, name):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        """Новое соединение получает WAL, таймаут и прочие настройки."""
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        # synchronous=NORMAL — 1, temp_store=MEMORY — 2.
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('temp_store'), 2)
+        self.assertEqual(self.pragma('cache_size'), -64 * 1024)
+
+
+class BenchmarkSqliteTest(TransactionTestCase):
+    def test_benchmark_reports_both_modes(self):
+        """Замер прогоняет обе настройки и не портит основную базу."""
+        author = User.objects.create_user(username='author')
+        Post.objects.create(text='Тестовый пост', author=author)
+        out = io.StringIO()
+        call_command(
+            'benchmark_sqlite', readers=1, writers=1, duration=0.2,
+            stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].startswith('baseline readers=1'))
+        self.assertTrue(lines[3].startswith('tuned    writers=1'))
+        self.assertFalse(author.comments.exists())
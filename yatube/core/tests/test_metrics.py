@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.metrics import registry
+from posts.models import Post
+
+User = get_user_model()
+
+
+class PerformanceMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        Post.objects.create(text='Тестовый пост', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+
+    @staticmethod
+    def timings(response):
+        return {
+            item.split(';')[0]: item
+            for item in response['Server-Timing'].split(', ')
+        }
+
+    def test_server_timing_header(self):
+        """Ответ несёт Server-Timing с общим временем, SQL и шаблонами."""
+        response = self.client.get('/')
+        timings = self.timings(response)
+        self.assertEqual(set(timings), {'total', 'db', 'tpl', 'cache'})
+        self.assertRegex(timings['db'], r'desc="[1-9]\d* queries"')
+        self.assertNotIn('tpl;dur=0.0', timings['tpl'])
+
+    def test_feed_cache_hits_counted(self):
+        """Повторный запрос ленты берёт страницу из кеша."""
+        first = self.timings(self.client.get('/'))['cache']
+        second = self.timings(self.client.get('/'))['cache']
+        # Промахи страницы целиком и фрагмента ленты.
+        self.assertIn('hit=0 miss=2', first)
+        self.assertIn('hit=1 miss=0', second)
+
+    def test_log_line(self):
+        """На каждый запрос пишется строка key=value."""
+        with self.assertLogs('yatube.requests', 'INFO') as logs:
+            self.client.get('/')
+        self.assertEqual(len(logs.records), 1)
+        message = logs.records[0].getMessage()
+        self.assertIn('view=posts:index status=200', message)
+        self.assertIn('db_queries=', message)
+
+    def test_metrics_staff_only(self):
+        """Метрики видит только персонал."""
+        response = self.client.get('/metrics/')
+        self.assertEqual(response.status_code, 302)
+        self.client.force_login(self.author)
+        response = self.client.get('/metrics/')
+        self.assertEqual(response.status_code, 302)
+
+    def test_metrics_prometheus_format(self):
+        """Гистограммы и счётчики собираются по имени URL."""
+        self.client.get('/')
+        self.client.get('/')
+        self.client.force_login(self.staff)
+        response = self.client.get('/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('# TYPE yatube_request_duration_seconds histogram', body)
+        self.assertIn(
+            'yatube_request_duration_seconds_bucket'
+            '{view="posts:index",le="+Inf"} 2',
+            body,
+        )
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 2',
+            body,
+        )
+        self.assertIn('yatube_cache_hits_total{view="posts:index"} 1', body)
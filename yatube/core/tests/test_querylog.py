@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+
+from core import querylog
+from core.querylog import QueryInspector, normalize
+from posts.models import Post
+
+User = get_user_model()
+
+
+class NormalizeTest(TestCase):
+    def test_literals_and_in_lists(self):
+        """Литералы и списки IN сводятся к одной форме."""
+        self.assertEqual(
+            normalize(
+                'SELECT  * FROM t WHERE id IN (%s, %s, %s)\n'
+                "AND name = 'x' LIMIT 21"
+            ),
+            'SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?',
+        )
+        self.assertEqual(
+            normalize('SELECT * FROM t WHERE id IN (%s)'),
+            normalize('SELECT * FROM t WHERE id IN (%s, %s)'),
+        )
+
+
+class QueryInspectorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(6):
+            author = User.objects.create_user(username=f'author{number}')
+            Post.objects.create(text=f'Пост {number}', author=author)
+
+    def inspector(self, threshold_ms=1000):
+        request = RequestFactory().get('/')
+        return QueryInspector(request, threshold_ms, repeat_threshold=5)
+
+    def test_repeated_queries_flagged_once(self):
+        """Запросы одной формы в цикле помечаются как N+1 один раз."""
+        with self.assertLogs('yatube.sql', 'WARNING') as logs:
+            with connection.execute_wrapper(self.inspector()):
+                for post in Post.objects.order_by('pk'):
+                    post.author.username
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('possible N+1', logs.output[0])
+        self.assertIn('auth_user', logs.output[0])
+
+    def test_slow_query_logged(self):
+        """Запрос дольше порога пишется с формой SQL."""
+        with self.assertLogs('yatube.sql', 'WARNING') as logs:
+            with connection.execute_wrapper(self.inspector(threshold_ms=0)):
+                Post.objects.filter(pk=1).exists()
+        self.assertIn('slow query view=/', logs.output[0])
+        self.assertIn('"id" = ?', logs.output[0])
+
+    @override_settings(QUERY_LOG_SAMPLE_RATE=1, SLOW_QUERY_THRESHOLD_MS=0)
+    def test_middleware_reports_view(self):
+        """Middleware подписывает запросы именем представления."""
+        cache.clear()
+        with self.assertLogs('yatube.sql', 'WARNING') as logs:
+            self.client.get('/')
+        self.assertTrue(all(
+            'view=posts:index' in line for line in logs.output
+        ))
+
+    @override_settings(QUERY_LOG_SAMPLE_RATE=0, SLOW_QUERY_THRESHOLD_MS=0)
+    def test_unsampled_requests_not_inspected(self):
+        """Запросы вне выборки не попадают в журнал."""
+        cache.clear()
+        with mock.patch.object(querylog.logger, 'warning') as warning:
+            self.client.get('/')
+        warning.assert_not_called()
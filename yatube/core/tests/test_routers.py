@@ -0,0 +1,218 @@
+import io
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.core.management import call_command
+from django.db import connections, router
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import (
+    RequestFactory, SimpleTestCase, TransactionTestCase, override_settings,
+)
+from django.urls import reverse
+
+from core.db import check_connections
+from core.middleware import ReplicaPinMiddleware
+from core.routers import PrimaryReplicaRouter, is_pinned, pin_primary
+from posts.models import Post
+
+User = get_user_model()
+
+REPLICAS = ['replica1', 'replica2']
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_go_to_replicas(self):
+        """Чтение распределяется по репликам."""
+        aliases = {self.router.db_for_read(Post) for _ in range(50)}
+        self.assertEqual(aliases, set(REPLICAS))
+
+    def test_writes_go_to_primary(self):
+        """Запись всегда идёт в основную базу."""
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_pinned_reads_go_to_primary(self):
+        """Внутри pin_primary чтение идёт в основную базу."""
+        with pin_primary():
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+        self.assertIn(self.router.db_for_read(Post), REPLICAS)
+
+    def test_cache_and_sessions_read_from_primary(self):
+        """Кеш в базе и сессии не читаются из отстающей реплики."""
+        cache_model = DatabaseCache('yatube_cache', {}).cache_model_class
+        for model in (cache_model, Session):
+            with self.subTest(model=model._meta.app_label):
+                self.assertEqual(self.router.db_for_read(model), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        """Без реплик всё читается из основной базы."""
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'posts'))
+
+    def test_relations_between_copies_allowed(self):
+        first, second = User(), User()
+        first._state.db, second._state.db = 'default', 'replica2'
+        self.assertTrue(self.router.allow_relation(first, second))
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class ReplicaPinMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.seen = []
+
+        def view(request):
+            self.seen.append((is_pinned(), router.db_for_read(Post)))
+            return HttpResponse()
+        self.middleware = ReplicaPinMiddleware(view)
+
+    def test_post_pins_and_sets_cookie(self):
+        """POST читает из основной базы и закрепляет следующие чтения."""
+        response = self.middleware(self.factory.post('/create/'))
+        self.assertEqual(self.seen, [(True, 'default')])
+        self.assertEqual(response.cookies['pin_primary']['max-age'], 5)
+
+    def test_cookie_pins_reads(self):
+        """С кукой GET читает из основной базы."""
+        request = self.factory.get('/')
+        request.COOKIES['pin_primary'] = '1'
+        self.middleware(request)
+        self.assertEqual(self.seen, [(True, 'default')])
+
+    def test_cookie_pins_streaming_body(self):
+        """Тело потокового ответа перебирается в закреплённом режиме."""
+        def stream(request):
+            def rows():
+                self.seen.append(router.db_for_read(Post))
+                yield b'row'
+            return StreamingHttpResponse(rows())
+
+        request = self.factory.get('/')
+        request.COOKIES['pin_primary'] = '1'
+        response = ReplicaPinMiddleware(stream)(request)
+        self.assertFalse(is_pinned())
+        self.assertEqual(b''.join(response.streaming_content), b'row')
+        self.assertEqual(self.seen, ['default'])
+        self.assertFalse(is_pinned())
+
+    def test_plain_get_reads_replica(self):
+        response = self.middleware(self.factory.get('/'))
+        self.assertFalse(self.seen[0][0])
+        self.assertIn(self.seen[0][1], REPLICAS)
+        self.assertNotIn('pin_primary', response.cookies)
+
+
+class FakeConnection:
+    def __init__(self, usable):
+        self.connection = object()
+        self.in_atomic_block = False
+        self.usable = usable
+        self.checks = 0
+        self.closed = False
+
+    def is_usable(self):
+        self.checks += 1
+        return self.usable
+
+    def close(self):
+        self.closed = True
+        self.connection = None
+
+
+class FakeConnections:
+    def __init__(self, *items):
+        self.items = items
+
+    def all(self):
+        return self.items
+
+
+@override_settings(CONN_HEALTH_CHECK_INTERVAL=30)
+class HealthCheckTest(SimpleTestCase):
+    def check(self, *items):
+        from core import db
+        original = db.connections
+        db.connections = FakeConnections(*items)
+        try:
+            check_connections()
+        finally:
+            db.connections = original
+
+    def test_broken_connection_closed(self):
+        """Негодное соединение закрывается до обработки запроса."""
+        broken, alive = FakeConnection(False), FakeConnection(True)
+        self.check(broken, alive)
+        self.assertTrue(broken.closed)
+        self.assertFalse(alive.closed)
+
+    def test_checks_throttled(self):
+        """Живое соединение проверяется не чаще раза в интервал."""
+        alive = FakeConnection(True)
+        self.check(alive)
+        self.check(alive)
+        self.assertEqual(alive.checks, 1)
+
+
+REPLICA = 'replica_test'
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class SqliteReplicaTest(TransactionTestCase):
+    """Реплика — отдельный файл SQLite, обновляемый sync_replicas."""
+
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        handle, cls.replica_path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        connections.databases[REPLICA] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': cls.replica_path,
+        }
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections.databases[REPLICA]
+        os.remove(cls.replica_path)
+
+    def setUp(self):
+        cache.clear()
+        # Подготовка данных вне запросов: читаем из основной базы.
+        with pin_primary():
+            self.author = User.objects.create_user(username='author')
+            Post.objects.create(text='Старый пост', author=self.author)
+            self.client.force_login(self.author)
+        call_command('sync_replicas', stdout=io.StringIO())
+        with pin_primary():
+            Post.objects.create(text='Свежий пост', author=self.author)
+
+    def test_reads_from_stale_replica(self):
+        """Обычное чтение идёт в реплику, которая ещё не знает о записи."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Старый пост')
+        self.assertNotContains(response, 'Свежий пост')
+
+    def test_read_your_writes_after_post(self):
+        """После POST чтение закреплено за основной базой."""
+        response = self.client.post(
+            reverse('posts:post_create'), {'text': 'Мой пост'}, follow=True
+        )
+        self.assertContains(response, 'Мой пост')
+        self.assertIn('pin_primary', self.client.cookies)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Свежий пост')
@@ -0,0 +1,85 @@
+import copy
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template import engines
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.loaders import ProfiledTemplate
+from core.metrics import registry
+from core.precompile import precompile_templates
+from posts.models import Post
+
+User = get_user_model()
+
+
+def cached_templates():
+    templates = copy.deepcopy(settings.TEMPLATES)
+    templates[0]['OPTIONS']['loaders'] = [
+        ('core.loaders.CachedLoader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+    return templates
+
+
+class TemplateProfilingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='author')
+        for number in range(3):
+            Post.objects.create(text=f'Пост {number}', author=author)
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+
+    def test_includes_profiled(self):
+        """Каждый {% include %} карточки учитывается отдельно."""
+        with self.assertLogs('yatube.requests', 'INFO') as logs:
+            self.client.get('/')
+        templates = logs.records[0].templates
+        count, total, self_time = templates['posts/includes/post_card.html']
+        self.assertEqual(count, 3)
+        self.assertGreater(total, 0)
+        page = templates['posts/index.html']
+        # Страница включает карточки, её собственное время меньше полного.
+        self.assertLess(page[2], page[1])
+        self.assertGreaterEqual(page[1], total)
+
+    def test_registry_and_log(self):
+        """Время шаблонов попадает в /metrics/ и строку лога."""
+        with self.assertLogs('yatube.requests', 'INFO') as logs:
+            self.client.get('/')
+        self.assertRegex(
+            logs.records[0].getMessage(), r'top_templates=\S+:\d+x[\d.]+ms'
+        )
+        text = registry.render()
+        self.assertIn(
+            'yatube_template_renders_total{view="posts:index",'
+            'template="posts/includes/post_card.html"} 3',
+            text,
+        )
+        self.assertIn('yatube_template_self_seconds_total{', text)
+
+
+class CachedLoaderTest(SimpleTestCase):
+    def test_templates_are_profiled(self):
+        template = engines.all()[0].get_template('posts/index.html')
+        self.assertIsInstance(template.template, ProfiledTemplate)
+
+    def test_precompile_fills_cache(self):
+        """Все шаблоны компилируются заранее и лежат в кеше загрузчика."""
+        with override_settings(TEMPLATES=cached_templates()):
+            compiled, failed = precompile_templates()
+            loader = engines.all()[0].engine.template_loaders[0]
+            self.assertEqual(failed, [])
+            self.assertGreater(compiled, 0)
+            cached = loader.get_template('posts/includes/post_card.html')
+            self.assertIsInstance(cached, ProfiledTemplate)
+            self.assertIn(
+                'posts/includes/post_card.html',
+                loader.get_template_cache,
+            )
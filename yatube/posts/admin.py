@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import Post, Group
+from .search import filter_posts
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -16,6 +17,14 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по FTS-индексу вместо LIKE '%term%', без лимита выдачи."""
+        if not search_term:
+            return queryset, False
+        return filter_posts(
+            queryset, search_term, with_comments=False
+        ), False
+
 
 admin.site.register(Post, PostAdmin)
 
@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from . import holes, signals  # noqa: F401
+        from .checks import rendition_formats
+        checks.register(rendition_formats)
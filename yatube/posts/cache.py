@@ -0,0 +1,54 @@
+"""Версионирование кеша лент.
+
+Ключи фрагментов лент включают номер поколения. Любая запись
+(пост, комментарий, группа, подписка) увеличивает поколение, и старые
+фрагменты просто перестают запрашиваться, поэтому кеш можно держать
+долго, а новые посты видны сразу.
+
+Рядом с поколением хранится время последней смены: это Last-Modified
+лент, он меняется от тех же записей, что и ETag, включая правку
+и удаление.
+"""
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+
+FEED_GENERATION_KEY = 'posts:feed_generation'
+FEED_MODIFIED_KEY = 'posts:feed_modified'
+
+
+def _initial_generation():
+    # Если ключ вытеснен из кеша, новое поколение должно быть больше
+    # всех прежних, иначе могли бы вернуться устаревшие фрагменты.
+    return int(time.time() * 1000)
+
+
+def feed_generation():
+    generation = cache.get(FEED_GENERATION_KEY)
+    if generation is None:
+        cache.add(FEED_GENERATION_KEY, _initial_generation(), None)
+        generation = cache.get(FEED_GENERATION_KEY)
+    return generation
+
+
+def feed_modified():
+    """Время последней смены поколения (UTC).
+
+    Если ключ вытеснен, время неизвестно, и берётся текущее: клиент
+    с If-Modified-Since получит страницу заново, а не устаревшую.
+    """
+    modified = cache.get(FEED_MODIFIED_KEY)
+    if modified is None:
+        cache.add(FEED_MODIFIED_KEY, time.time(), None)
+        modified = cache.get(FEED_MODIFIED_KEY)
+    return datetime.fromtimestamp(modified, timezone.utc)
+
+
+def bump_feed_generation():
+    cache.set(FEED_MODIFIED_KEY, time.time(), None)
+    try:
+        return cache.incr(FEED_GENERATION_KEY)
+    except ValueError:
+        cache.add(FEED_GENERATION_KEY, _initial_generation(), None)
+        return cache.get(FEED_GENERATION_KEY)
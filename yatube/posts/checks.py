@@ -0,0 +1,20 @@
+"""Системные проверки приложения posts."""
+from django.conf import settings
+from django.core import checks
+
+from .thumbnails import can_save
+
+
+def rendition_formats(app_configs=None, **kwargs):
+    """Форматы копий картинок, которые не умеет сохранять Pillow."""
+    return [
+        checks.Warning(
+            f'Pillow не умеет сохранять {image_format}: копии картинок '
+            f'в этом формате не строятся.',
+            hint='Установите Pillow с поддержкой формата или уберите его '
+                 'из IMAGE_RENDITION_FORMATS.',
+            id='posts.W001',
+        )
+        for image_format in settings.IMAGE_RENDITION_FORMATS
+        if not can_save(image_format)
+    ]
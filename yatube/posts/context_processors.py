@@ -0,0 +1,15 @@
+from django.conf import settings
+
+from .cache import feed_generation
+
+
+def feed_cache(request):
+    """Параметры кеширования фрагментов лент.
+
+    feed_generation передаётся функцией: шаблон вызовет её,
+    только если страница действительно использует кеш.
+    """
+    return {
+        'feed_generation': feed_generation,
+        'feed_cache_timeout': settings.FEED_CACHE_TIMEOUT,
+    }
@@ -0,0 +1,120 @@
+"""Денормализованные счётчики постов, комментариев и подписок.
+
+Счётчики меняются одним UPDATE с F()-выражением, поэтому
+параллельные запросы не теряют инкременты. Расхождения
+(например, после bulk_create или ручных правок в базе)
+исправляет команда ``manage.py reconcile_counters``.
+"""
+from django.conf import settings
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from . import timeline
+from .cache import bump_feed_generation
+from .models import Comment, Follow, Post, User, UserStats
+
+
+def _count_subquery(queryset, field):
+    counts = (
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def user_counts(queryset=None):
+    """Пользователи с посчитанными заново счётчиками."""
+    if queryset is None:
+        queryset = User.objects.all()
+    return queryset.annotate(
+        actual_posts=_count_subquery(Post.objects, 'author'),
+        actual_followers=_count_subquery(Follow.objects, 'author'),
+        actual_following=_count_subquery(Follow.objects, 'user'),
+    )
+
+
+def get_stats(user):
+    """Счётчики пользователя; создаются при первом обращении."""
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        return reconcile_user(user.pk)
+
+
+def reconcile_user(user_id):
+    counted = user_counts(User.objects.filter(pk=user_id)).get()
+    stats, _ = UserStats.objects.update_or_create(
+        user_id=user_id,
+        defaults={
+            'posts_count': counted.actual_posts,
+            'followers_count': counted.actual_followers,
+            'following_count': counted.actual_following,
+        },
+    )
+    return stats
+
+
+def change_user(user_id, **deltas):
+    """Изменить счётчики пользователя.
+
+    Если записи счётчиков нет (например, пользователь удаляется
+    каскадом), ничего не создаём: get_stats посчитает её при чтении.
+    """
+    UserStats.objects.filter(user_id=user_id).update(**{
+        field: F(field) + delta for field, delta in deltas.items()
+    })
+
+
+def change_post(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+def reconcile_all():
+    """Пересчитать все счётчики; вернуть число исправленных записей."""
+    UserStats.objects.bulk_create(
+        (UserStats(user_id=pk) for pk in User.objects.filter(
+            stats__isnull=True
+        ).values_list('pk', flat=True).iterator()),
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+    fixed = UserStats.objects.exclude(
+        posts_count=_count_subquery(Post.objects, 'author'),
+    ).update(posts_count=_count_subquery(Post.objects, 'author'))
+    fixed += UserStats.objects.exclude(
+        followers_count=_count_subquery(Follow.objects, 'author'),
+    ).update(followers_count=_count_subquery(Follow.objects, 'author'))
+    fixed += UserStats.objects.exclude(
+        following_count=_count_subquery(Follow.objects, 'user'),
+    ).update(following_count=_count_subquery(Follow.objects, 'user'))
+    fixed += UserStats.objects.filter(
+        fan_in=False,
+        followers_count__gt=settings.TIMELINE_FANOUT_MAX_FOLLOWERS,
+    ).update(fan_in=True)
+    for author_id in UserStats.objects.filter(
+        fan_in=True,
+        followers_count__lte=settings.TIMELINE_FANOUT_RESUME_FOLLOWERS,
+    ).values_list('user_id', flat=True):
+        timeline.resume_fan_out(author_id)
+        fixed += 1
+    fixed += Post.objects.exclude(
+        comments_count=_count_subquery(Comment.objects, 'post'),
+    ).update(comments_count=_count_subquery(Comment.objects, 'post'))
+    return fixed
+
+
+def after_bulk_load():
+    """Досчитать то, что обходит bulk_create: счётчики, ленты и кеш.
+
+    Вызывается командами массовой загрузки после их транзакции;
+    возвращает число исправленных записей счётчиков.
+    """
+    fixed = reconcile_all()
+    timeline.rebuild_timelines()
+    bump_feed_generation()
+    return fixed
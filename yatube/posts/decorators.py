@@ -0,0 +1,138 @@
+"""Условные GET-запросы и кеш целых страниц для гостей.
+
+ETag строится из поколения кеша лент (posts.cache), адреса страницы
+и пользователя: любая запись меняет поколение, поэтому ETag не
+отстаёт от данных. Last-Modified — время той же смены поколения,
+он нужен клиентам без If-None-Match. На совпадение представление
+не вызывается и отдаётся 304 без рендеринга. Last-Modified точен
+до секунды, поэтому в секунду записи он не отдаётся вовсе: запись
+в ту же секунду его бы не изменила.
+
+Страницы для гостей целиком кладутся в кеш с ключом по поколению,
+а части, зависящие от посетителя, дорисовываются по маркерам
+(core.holes).
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers,
+)
+from django.utils.http import parse_http_date_safe
+from django.views.decorators.http import condition
+
+from core import holes
+
+from .cache import feed_generation, feed_modified
+
+PAGE_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control',
+                'Vary')
+
+
+def feed_etag(request, *args, **kwargs):
+    user = request.user.pk if request.user.is_authenticated else 'anon'
+    key = f'{feed_generation()}:{user}:{request.get_full_path()}'
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def feed_last_modified(request, *args, **kwargs):
+    modified = feed_modified()
+    if int(modified.timestamp()) >= int(time.time()):
+        return None
+    return modified
+
+
+def feed_condition(view):
+    """condition() с ETag ленты и заголовками Cache-Control.
+
+    Страницы гостей помечаются public, и обратный прокси может
+    держать их FEED_PROXY_MAX_AGE секунд; браузер всё равно
+    перепроверяет их по ETag. Страницы пользователей — private.
+    """
+    conditional_view = condition(
+        etag_func=feed_etag, last_modified_func=feed_last_modified
+    )(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        if response.status_code not in (200, 304):
+            return response
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True, max_age=0)
+        else:
+            patch_cache_control(
+                response, public=True, max_age=0,
+                s_maxage=settings.FEED_PROXY_MAX_AGE,
+            )
+        patch_vary_headers(response, ('Cookie',))
+        return response
+    return wrapper
+
+
+def _page_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'posts:page:{feed_generation()}:{path}'
+
+
+def _fill_holes(response, request):
+    if response.streaming:
+        response.streaming_content = (
+            holes.fill(chunk.decode(response.charset), request)
+            .encode(response.charset)
+            for chunk in response.streaming_content
+        )
+    elif response.content:
+        response.content = holes.fill(
+            response.content.decode(response.charset), request
+        )
+    return response
+
+
+def anonymous_page_cache(view):
+    """Кеш целой страницы для GET-запросов без сессионной куки.
+
+    Такой посетитель — заведомо гость, поэтому при попадании
+    не нужны ни сессия, ни пользователь, ни ORM: страница берётся
+    из кеша лент, а дыры (шапка, форма комментария) рендерятся
+    заново. Ключ содержит поколение, так что любая запись
+    сбрасывает все страницы. Потоковые ответы не кешируются.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or settings.SESSION_COOKIE_NAME in request.COOKIES):
+            return view(request, *args, **kwargs)
+        page_cache = caches['feed']
+        key = _page_key(request)
+        entry = page_cache.get(key)
+        if entry is not None:
+            response = HttpResponse(entry['content'])
+            for header, value in entry['headers'].items():
+                response[header] = value
+            response = get_conditional_response(
+                request,
+                etag=response.get('ETag'),
+                last_modified=parse_http_date_safe(
+                    response.get('Last-Modified')
+                ),
+                response=response,
+            )
+            return _fill_holes(response, request)
+        request.page_cache_holes = True
+        response = view(request, *args, **kwargs)
+        if (response.status_code == 200 and not response.streaming
+                and not response.cookies):
+            page_cache.set(key, {
+                'content': response.content,
+                'headers': {
+                    header: response[header]
+                    for header in PAGE_HEADERS if response.has_header(header)
+                },
+            })
+        return _fill_holes(response, request)
+    return wrapper
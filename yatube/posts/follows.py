@@ -0,0 +1,136 @@
+"""Пакетные подписки и отписки.
+
+Подписка на несколько авторов — один bulk_create(ignore_conflicts=True),
+отписка — QuerySet.delete(). bulk_create сигналов не шлёт, а обработчики
+post_delete на время отписки пропускают свою работу (handled_in_bulk),
+поэтому счётчики, ленты и поколение кэша лент обновляются здесь же
+по одному запросу на всю пачку, а не по нескольку на каждого автора.
+"""
+import threading
+
+from django.db import router, transaction
+from django.db.models import Exists, F, OuterRef
+
+from . import counters, timeline
+from .cache import bump_feed_generation
+from .models import Follow, TimelineEntry, User, UserStats
+
+_local = threading.local()
+
+
+def handled_in_bulk():
+    """Идёт пакетная отписка: сигналы Follow не повторяют её работу."""
+    return getattr(_local, 'bulk', False)
+
+
+def _change_followers(author_ids, delta):
+    UserStats.objects.filter(user_id__in=author_ids).update(
+        followers_count=F('followers_count') + delta
+    )
+
+
+def with_following_flag(users, user):
+    """Добавить к выборке пользователей флаг is_following.
+
+    Флаг считается подзапросом EXISTS в том же SELECT, поэтому
+    состояние кнопки «Подписаться» не стоит отдельного запроса.
+    """
+    if not user.is_authenticated:
+        return users
+    return users.annotate(is_following=Exists(
+        Follow.objects.filter(user=user, author=OuterRef('pk'))
+    ))
+
+
+def _lock_user(alias, user):
+    """Заблокировать строку пользователя до конца транзакции.
+
+    Так подписки и отписки одного пользователя выполняются по очереди,
+    и выборка внутри транзакции видит итог предыдущей. SQLite
+    FOR UPDATE игнорирует, но там пишет только одна транзакция:
+    вторая, прочитавшая те же подписки, получит «database is locked»
+    на первой записи и откатится, а не учтёт подписку дважды.
+    """
+    list(
+        User.objects.using(alias).select_for_update()
+        .filter(pk=user.pk).values_list('pk', flat=True)
+    )
+
+
+def follow_authors(user, author_ids):
+    """Подписать пользователя на авторов; вернуть id новых подписок.
+
+    author_ids может быть подзапросом (values_list) — тогда отбор
+    авторов выполняется одним запросом. Себя и уже отслеживаемых
+    авторов отбираем под блокировкой пользователя, поэтому
+    параллельные подписки не учитываются в счётчиках дважды;
+    ignore_conflicts страхует от подписки в обход этих функций.
+    """
+    # Читаем из основной базы: реплика может отставать.
+    alias = router.db_for_write(Follow)
+    with transaction.atomic(using=alias):
+        _lock_user(alias, user)
+        new_ids = list(
+            User.objects.using(alias).filter(pk__in=author_ids)
+            .exclude(pk=user.pk)
+            .exclude(following__user=user)
+            .values_list('pk', flat=True)
+        )
+        if not new_ids:
+            return []
+        Follow.objects.bulk_create(
+            [Follow(user=user, author_id=pk) for pk in new_ids],
+            ignore_conflicts=True,
+        )
+        counters.change_user(user.pk, following_count=len(new_ids))
+        _change_followers(new_ids, 1)
+        timeline.update_fan_in(new_ids)
+        popular = set(
+            UserStats.objects.using(alias).filter(
+                user_id__in=new_ids, fan_in=True
+            ).values_list('user_id', flat=True)
+        )
+        fanout_ids = [pk for pk in new_ids if pk not in popular]
+        if fanout_ids:
+            timeline.backfill_authors(user.pk, fanout_ids)
+    bump_feed_generation()
+    return new_ids
+
+
+def unfollow_authors(user, author_ids):
+    """Отписать пользователя от авторов; вернуть id снятых подписок.
+
+    Удаление идёт через QuerySet.delete(): на Follow подписаны
+    обработчики post_delete, поэтому Django выбирает строки и шлёт
+    сигнал на каждую. Обработчики при этом ничего не делают, а их
+    работа — счётчики и ленты — сделана здесь пакетно. Счётчик
+    подписок уменьшается на число удалённых строк; если строк удалено
+    меньше, чем выбрано (удаление в обход этих функций), счётчики
+    пересчитываются.
+    """
+    alias = router.db_for_write(Follow)
+    with transaction.atomic(using=alias):
+        _lock_user(alias, user)
+        follows = Follow.objects.using(alias).filter(
+            user=user, author_id__in=author_ids
+        )
+        removed_ids = list(follows.values_list('author_id', flat=True))
+        if not removed_ids:
+            return []
+        _local.bulk = True
+        try:
+            deleted, _ = follows.filter(author_id__in=removed_ids).delete()
+        finally:
+            _local.bulk = False
+        if deleted == len(removed_ids):
+            counters.change_user(user.pk, following_count=-deleted)
+            _change_followers(removed_ids, -1)
+        else:
+            for user_id in (user.pk, *removed_ids):
+                counters.reconcile_user(user_id)
+        TimelineEntry.objects.filter(
+            user=user, post__author_id__in=removed_ids
+        ).delete()
+        timeline.update_fan_in(removed_ids)
+    bump_feed_generation()
+    return removed_ids
@@ -0,0 +1,12 @@
+from core import holes
+
+from .forms import CommentForm
+
+
+def comment_form_context(request, post_id):
+    return {'post_id': post_id, 'form': CommentForm()}
+
+
+holes.register(
+    'comment_form', 'posts/includes/comment_form.html', comment_form_context
+)
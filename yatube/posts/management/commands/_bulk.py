@@ -0,0 +1,54 @@
+"""Общие шаги массовой загрузки для import_posts и generate_load_data.
+
+auto_now_add перезаписывает даты при вставке, поэтому даты из
+источника возвращаются после bulk_create отдельным bulk_update по
+первичным ключам. На SQLite bulk_create ключей не возвращает —
+их выдаёт next_ids, а reset_sequences сдвигает последовательности.
+"""
+import itertools
+
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Max
+
+
+def next_ids(model):
+    """Счётчик id после наибольшего занятого."""
+    last = model.objects.aggregate(last=Max('pk'))['last'] or 0
+    return itertools.count(last + 1)
+
+
+def bulk_create_dated(model, objects, **kwargs):
+    """bulk_create, сохраняющий заданные в объектах даты auto_now_add."""
+    fields = [
+        field.attname for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    dates = [
+        {name: getattr(obj, name) for name in fields} for obj in objects
+    ]
+    model.objects.bulk_create(objects, **kwargs)
+    dated = []
+    for obj, values in zip(objects, dates):
+        values = {
+            name: value for name, value in values.items()
+            if value is not None
+        }
+        if values:
+            for name, value in values.items():
+                setattr(obj, name, value)
+            dated.append(obj)
+    if dated:
+        # Строки, пропущенные ignore_conflicts, UPDATE по pk не найдёт.
+        model.objects.bulk_update(dated, fields)
+
+
+def reset_sequences(*models):
+    """Сдвинуть последовательности id за вставленные явно.
+
+    Иначе на PostgreSQL и других базах с последовательностями
+    следующий create получит уже занятый id.
+    """
+    for sql in connection.ops.sequence_reset_sql(no_style(), models):
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
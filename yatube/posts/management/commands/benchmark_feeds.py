@@ -0,0 +1,234 @@
+import json
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+
+import django
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.metrics import percentile
+from posts.models import Comment, Follow, Group, Post, User
+
+VIEWS = ('index', 'group_list', 'profile', 'post_detail', 'follow_index')
+
+
+def summary(values, digits=3):
+    if not values:
+        return {}
+    return {
+        'p50': round(percentile(values, 0.50), digits),
+        'p95': round(percentile(values, 0.95), digits),
+        'p99': round(percentile(values, 0.99), digits),
+        'mean': round(statistics.mean(values), digits),
+        'max': round(max(values), digits),
+    }
+
+
+class Targets:
+    """Адреса для замеров: популярные и «хвостовые» страницы вперемешку."""
+
+    def __init__(self, rng, sample):
+        self.rng = rng
+        self.groups = list(
+            Group.objects.values_list('slug', flat=True)[:sample]
+        )
+        self.authors = list(
+            User.objects.order_by('-stats__posts_count')
+            .values_list('username', flat=True)[:sample]
+        )
+        self.posts = list(
+            Post.objects.order_by('-comments_count')
+            .values_list('pk', flat=True)[:sample]
+        )
+        self.readers = list(
+            User.objects.annotate(following_count=Count('follower'))
+            .filter(following_count__gt=0)
+            .order_by('-following_count')[:sample]
+        )
+
+    def url(self, view):
+        page = self.rng.randint(1, 3)
+        if view == 'index':
+            return f'{reverse("posts:index")}?page={page}', None
+        if view == 'group_list':
+            slug = self.rng.choice(self.groups)
+            return (
+                f'{reverse("posts:group_list", args=[slug])}?page={page}',
+                None,
+            )
+        if view == 'profile':
+            username = self.rng.choice(self.authors)
+            return reverse('posts:profile', args=[username]), None
+        if view == 'post_detail':
+            post_id = self.rng.choice(self.posts)
+            return reverse('posts:post_detail', args=[post_id]), None
+        return reverse('posts:follow_index'), self.rng.choice(self.readers)
+
+    def available(self, view):
+        return {
+            'group_list': self.groups,
+            'profile': self.authors,
+            'post_detail': self.posts,
+            'follow_index': self.readers,
+        }.get(view, True)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет ленты через тестовый клиент: задержки (p50/p95/p99), '
+        'число SQL-запросов и пик памяти. Результат пишется в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Запросов на каждое представление.',
+        )
+        parser.add_argument(
+            '--memory-requests', type=int, default=5,
+            help='Запросов на представление под tracemalloc.',
+        )
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--views', nargs='+', choices=VIEWS, default=list(VIEWS),
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кеш перед каждым запросом.',
+        )
+        parser.add_argument('--sample', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', default='-',
+            help='Файл для результатов (по умолчанию stdout).',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON прошлого прогона для сравнения p95 и запросов.',
+        )
+
+    def handle(self, *args, **options):
+        if not Post.objects.exists():
+            raise CommandError(
+                'База пуста: сначала выполните generate_load_data.'
+            )
+        self.cold = options['cold']
+        targets = Targets(random.Random(options['seed']), options['sample'])
+        results = {}
+        for view in options['views']:
+            if not targets.available(view):
+                self.stderr.write(f'{view}: нет данных, пропускаем.')
+                continue
+            results[view] = self.measure(view, targets, options)
+        report = {
+            'meta': self.meta(options),
+            'views': results,
+        }
+        self.write(report, options['output'])
+        if options['baseline']:
+            self.compare(report, options['baseline'])
+
+    def prepare(self, client, targets, view):
+        """Вход и сброс кеша — вне замеряемого интервала."""
+        url, user = targets.url(view)
+        if user is not None:
+            client.force_login(user)
+        if self.cold:
+            caches['default'].clear()
+            caches['feed'].clear()
+        return url
+
+    def measure(self, view, targets, options):
+        client = Client()
+        for _ in range(options['warmup']):
+            client.get(self.prepare(client, targets, view))
+        latencies, queries, query_times, statuses = [], [], [], {}
+        for _ in range(options['requests']):
+            url = self.prepare(client, targets, view)
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url)
+                latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] = (
+                statuses.get(response.status_code, 0) + 1
+            )
+            queries.append(len(captured))
+            query_times.append(sum(
+                float(query['time']) for query in captured.captured_queries
+            ) * 1000)
+        # Память меряем отдельным проходом: tracemalloc сильно
+        # замедляет выполнение и исказил бы задержки.
+        # Трассировка перезапускается на каждый запрос: пик считается
+        # с нуля (reset_peak есть только с Python 3.9).
+        peaks = []
+        for _ in range(options['memory_requests']):
+            url = self.prepare(client, targets, view)
+            tracemalloc.start()
+            try:
+                client.get(url)
+                peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            finally:
+                tracemalloc.stop()
+        return {
+            'requests': len(latencies),
+            'status': {str(code): count for code, count in statuses.items()},
+            'latency_ms': summary(latencies),
+            'queries': summary(queries, digits=1),
+            'query_time_ms': summary(query_times),
+            'peak_memory_kb': summary(peaks, digits=1),
+        }
+
+    def meta(self, options):
+        return {
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'cold_cache': self.cold,
+            'requests': options['requests'],
+            'dataset': {
+                'users': User.objects.count(),
+                'groups': Group.objects.count(),
+                'posts': Post.objects.count(),
+                'comments': Comment.objects.count(),
+                'follows': Follow.objects.count(),
+            },
+        }
+
+    def write(self, report, output):
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if output == '-':
+            self.stdout.write(text)
+            return
+        with open(output, 'w') as stream:
+            stream.write(text + '\n')
+        self.stderr.write(f'Результаты записаны в {output}')
+
+    def compare(self, report, path):
+        try:
+            with open(path) as stream:
+                baseline = json.load(stream)['views']
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f'Не удалось прочитать {path}: {error}')
+        for view, current in report['views'].items():
+            previous = baseline.get(view)
+            if not previous:
+                continue
+            before = previous['latency_ms']['p95']
+            after = current['latency_ms']['p95']
+            change = (after - before) / before * 100 if before else 0
+            self.stderr.write(
+                f'{view}: p95 {before:.1f} → {after:.1f} мс '
+                f'({change:+.0f}%), запросов '
+                f'{previous["queries"]["max"]:g} → '
+                f'{current["queries"]["max"]:g}'
+            )
@@ -0,0 +1,84 @@
+import datetime
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts.models import Comment, Follow, Group, Post, User
+
+# Порядок важен: при импорте записи ссылаются на уже загруженные.
+EXPORTS = (
+    ('user', User.objects.order_by('pk'), {
+        'username': 'username',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'email': 'email',
+    }),
+    ('group', Group.objects.order_by('pk'), {
+        'slug': 'slug',
+        'title': 'title',
+        'description': 'description',
+    }),
+    ('post', Post.objects.order_by('pk'), {
+        'id': 'pk',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'created': 'created',
+        'author': 'author__username',
+        'group': 'group__slug',
+        'image': 'image',
+    }),
+    ('comment', Comment.objects.order_by('pk'), {
+        'post': 'post_id',
+        'author': 'author__username',
+        'text': 'text',
+        'created': 'created',
+    }),
+    ('follow', Follow.objects.order_by('pk'), {
+        'user': 'user__username',
+        'author': 'author__username',
+        'created': 'created',
+    }),
+)
+
+
+def _encode(value):
+    # isoformat() без усечения микросекунд, как у DjangoJSONEncoder
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} не сериализуется в JSON')
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает группы, посты, комментарии и подписки в JSON Lines '
+        'потоком, не загружая таблицы в память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output', nargs='?', default='-',
+            help='Файл для выгрузки (по умолчанию stdout).',
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, output, chunk_size, **options):
+        stream = (
+            sys.stdout if output == '-'
+            else open(output, 'w', encoding='utf-8')
+        )
+        total = 0
+        try:
+            for model, queryset, fields in EXPORTS:
+                rows = queryset.values_list(*fields.values())
+                for row in rows.iterator(chunk_size=chunk_size):
+                    record = dict(zip(fields, row), model=model)
+                    stream.write(json.dumps(
+                        record, default=_encode, ensure_ascii=False
+                    ))
+                    stream.write('\n')
+                    total += 1
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        self.stderr.write(f'Выгружено записей: {total}')
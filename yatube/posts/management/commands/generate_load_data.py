@@ -0,0 +1,215 @@
+import datetime
+import itertools
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from posts.counters import after_bulk_load
+from posts.models import Comment, Follow, Group, Post, User
+
+from ._bulk import bulk_create_dated, next_ids, reset_sequences
+
+WORDS = (
+    'лев толстой война мир москва вечер утро книга письмо дорога '
+    'дом сад река поле город друг время жизнь слово день ночь '
+    'весна осень зима лето море небо солнце ветер дождь снег'
+).split()
+
+
+def zipf_weights(count, exponent):
+    """Накопленные веса закона Ципфа: у ранга r вес 1 / r**exponent."""
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+class Generator:
+    """Синтетические данные с «тяжёлыми хвостами».
+
+    Активность авторов и число подписчиков распределены по Ципфу:
+    немногие популярные авторы пишут большую часть постов и собирают
+    большую часть подписок, как в настоящих социальных сетях.
+    """
+
+    def __init__(self, rng, batch_size, exponent, days):
+        self.rng = rng
+        self.batch_size = batch_size
+        self.exponent = exponent
+        self.now = timezone.now()
+        self.days = days
+
+    def text(self, words):
+        return ' '.join(self.rng.choices(WORDS, k=words)).capitalize()
+
+    def moment(self):
+        return self.now - datetime.timedelta(
+            seconds=self.rng.uniform(0, self.days * 86400)
+        )
+
+    def batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield min(self.batch_size, total - start)
+
+    def users(self, prefix, count):
+        password = make_password(None)
+        for start in range(0, count, self.batch_size):
+            stop = min(start + self.batch_size, count)
+            User.objects.bulk_create(
+                [
+                    User(username=f'{prefix}{number}', password=password)
+                    for number in range(start, stop)
+                ],
+                ignore_conflicts=True,
+            )
+        # Ранг популярности совпадает с номером пользователя.
+        ids = dict(
+            User.objects.filter(username__startswith=prefix)
+            .values_list('username', 'pk')
+        )
+        return [ids[f'{prefix}{number}'] for number in range(count)]
+
+    def groups(self, prefix, count):
+        Group.objects.bulk_create(
+            [
+                Group(
+                    slug=f'{prefix}-{number}',
+                    title=f'Группа {number}',
+                    description=self.text(12),
+                )
+                for number in range(count)
+            ],
+            ignore_conflicts=True,
+        )
+        return list(
+            Group.objects.filter(slug__startswith=f'{prefix}-')
+            .values_list('pk', flat=True)
+        )
+
+    def posts(self, authors, groups, count):
+        weights = zipf_weights(len(authors), self.exponent)
+        ids = next_ids(Post)
+        for size in self.batches(count):
+            posts = []
+            for author in self.rng.choices(authors, cum_weights=weights,
+                                           k=size):
+                moment = self.moment()
+                posts.append(Post(
+                    pk=next(ids),
+                    text=self.text(self.rng.randint(5, 60)),
+                    author_id=author,
+                    group_id=(
+                        self.rng.choice(groups)
+                        if groups and self.rng.random() < 0.7 else None
+                    ),
+                    pub_date=moment,
+                    created=moment,
+                ))
+            bulk_create_dated(Post, posts)
+
+    def follows(self, users, per_user):
+        """Число подписок у читателя — по Парето, авторы — по Ципфу."""
+        weights = zipf_weights(len(users), self.exponent)
+        ids = next_ids(Follow)
+        follows = []
+        for user in users:
+            wanted = min(
+                len(users) - 1,
+                int(per_user * self.rng.paretovariate(1.5) / 3),
+            )
+            authors = set(self.rng.choices(users, cum_weights=weights,
+                                           k=wanted))
+            authors.discard(user)
+            follows.extend(
+                Follow(
+                    pk=next(ids), user_id=user, author_id=author,
+                    created=self.moment(),
+                )
+                for author in authors
+            )
+            if len(follows) >= self.batch_size:
+                bulk_create_dated(Follow, follows, ignore_conflicts=True)
+                follows = []
+        bulk_create_dated(Follow, follows, ignore_conflicts=True)
+
+    def comments(self, users, count):
+        posts = list(Post.objects.values_list('pk', 'pub_date'))
+        if not posts:
+            return
+        # Обсуждаемость постов тоже неравномерна.
+        self.rng.shuffle(posts)
+        weights = zipf_weights(len(posts), self.exponent)
+        ids = next_ids(Comment)
+        for size in self.batches(count):
+            bulk_create_dated(Comment, [
+                Comment(
+                    pk=next(ids),
+                    post_id=post,
+                    author_id=self.rng.choice(users),
+                    text=self.text(self.rng.randint(3, 30)),
+                    created=min(
+                        self.now,
+                        pub_date + datetime.timedelta(
+                            minutes=self.rng.expovariate(1 / 600)
+                        ),
+                    ),
+                )
+                for post, pub_date in self.rng.choices(
+                    posts, cum_weights=weights, k=size
+                )
+            ])
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, группами, '
+        'постами, подписками и комментариями для нагрузочных замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument(
+            '--follows-per-user', type=int, default=20,
+            help='Среднее число подписок у пользователя.',
+        )
+        parser.add_argument(
+            '--exponent', type=float, default=1.1,
+            help='Показатель закона Ципфа для популярности авторов.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней распределить даты публикаций.',
+        )
+        parser.add_argument('--prefix', default='load')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options['users'] < 2:
+            raise CommandError('Нужно хотя бы два пользователя.')
+        generator = Generator(
+            random.Random(options['seed']),
+            options['batch_size'],
+            options['exponent'],
+            options['days'],
+        )
+        prefix = options['prefix']
+        with transaction.atomic():
+            users = generator.users(prefix, options['users'])
+            groups = generator.groups(prefix, options['groups'])
+            generator.posts(users, groups, options['posts'])
+            generator.follows(users, options['follows_per_user'])
+            generator.comments(users, options['comments'])
+            reset_sequences(Post, Comment, Follow)
+        fixed = after_bulk_load()
+        self.stderr.write(f'Исправлено записей: {fixed}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Пользователей: {len(users)}, групп: {len(groups)}, '
+            f'постов: {options["posts"]}, '
+            f'комментариев: {options["comments"]}'
+        ))
@@ -0,0 +1,186 @@
+import json
+import sys
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils.dateparse import parse_datetime
+
+from posts.counters import after_bulk_load
+from posts.models import Comment, Follow, Group, Post, User
+
+from ._bulk import bulk_create_dated, next_ids, reset_sequences
+
+
+class Importer:
+    """Загружает записи пачками; внешние ключи сопоставляются по пачке.
+
+    Пользователи и группы ищутся по username и slug, id постов
+    сдвигаются на post_offset, поэтому в памяти держится только
+    текущая пачка. Вместе с записью хранится номер строки, чтобы
+    ошибка в пачке указывала на саму запись.
+    """
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.post_offset = Post.objects.aggregate(
+            offset=Max('pk')
+        )['offset'] or 0
+        self.comment_ids = next_ids(Comment)
+        self.follow_ids = next_ids(Follow)
+        self.buffer = []
+        self.model = None
+        self.counts = {}
+
+    def add(self, number, record):
+        model = record.pop('model', None)
+        if model not in self.handlers:
+            raise CommandError(
+                f'Строка {number}: неизвестный тип записи: {model}'
+            )
+        if model != self.model or len(self.buffer) >= self.batch_size:
+            self.flush()
+            self.model = model
+        self.buffer.append((number, record))
+
+    def flush(self):
+        if self.buffer:
+            self.handlers[self.model](self, self.buffer)
+            self.counts[self.model] = (
+                self.counts.get(self.model, 0) + len(self.buffer)
+            )
+        self.buffer = []
+
+    @staticmethod
+    def _build(entries, factory):
+        objects = []
+        for number, record in entries:
+            try:
+                objects.append(factory(record))
+            except (ValueError, KeyError, TypeError) as error:
+                raise CommandError(f'Строка {number}: {error!r}') from error
+        return objects
+
+    @staticmethod
+    def _user_ids(usernames):
+        return dict(
+            User.objects.filter(username__in=set(usernames))
+            .values_list('username', 'pk')
+        )
+
+    def import_users(self, entries):
+        User.objects.bulk_create(
+            self._build(entries, lambda record: User(
+                username=record['username'],
+                first_name=record.get('first_name', ''),
+                last_name=record.get('last_name', ''),
+                email=record.get('email', ''),
+                password=make_password(None),
+            )),
+            ignore_conflicts=True,
+        )
+
+    def import_groups(self, entries):
+        Group.objects.bulk_create(
+            self._build(entries, lambda record: Group(
+                slug=record['slug'],
+                title=record['title'],
+                description=record.get('description', ''),
+            )),
+            ignore_conflicts=True,
+        )
+
+    def import_posts(self, entries):
+        users = self._user_ids(record.get('author') for _, record in entries)
+        groups = dict(
+            Group.objects.filter(
+                slug__in={record.get('group') for _, record in entries}
+            ).values_list('slug', 'pk')
+        )
+        bulk_create_dated(Post, self._build(entries, lambda record: Post(
+            pk=record['id'] + self.post_offset,
+            text=record['text'],
+            pub_date=parse_datetime(record['pub_date']),
+            created=parse_datetime(record['created']),
+            author_id=users[record['author']],
+            group_id=groups[record['group']] if record['group'] else None,
+            image=record.get('image') or '',
+        )))
+
+    def import_comments(self, entries):
+        users = self._user_ids(record.get('author') for _, record in entries)
+        bulk_create_dated(Comment, self._build(
+            entries, lambda record: Comment(
+                pk=next(self.comment_ids),
+                post_id=record['post'] + self.post_offset,
+                author_id=users[record['author']],
+                text=record['text'],
+                created=parse_datetime(record['created']),
+            )
+        ))
+
+    def import_follows(self, entries):
+        users = self._user_ids(
+            record.get(field) for _, record in entries
+            for field in ('user', 'author')
+        )
+        bulk_create_dated(
+            Follow,
+            self._build(entries, lambda record: Follow(
+                pk=next(self.follow_ids),
+                user_id=users[record['user']],
+                author_id=users[record['author']],
+                created=parse_datetime(record['created']),
+            )),
+            ignore_conflicts=True,
+        )
+
+    handlers = {
+        'user': import_users,
+        'group': import_groups,
+        'post': import_posts,
+        'comment': import_comments,
+        'follow': import_follows,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает выгрузку export_posts (JSON Lines) пачками через '
+        'bulk_create, сопоставляя пользователей, группы и посты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'source', nargs='?', default='-',
+            help='Файл выгрузки (по умолчанию stdin).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, source, batch_size, **options):
+        stream = (
+            sys.stdin if source == '-' else open(source, encoding='utf-8')
+        )
+        importer = Importer(batch_size)
+        try:
+            with transaction.atomic():
+                for number, line in enumerate(stream, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError as error:
+                        raise CommandError(
+                            f'Строка {number}: {error!r}'
+                        ) from error
+                    importer.add(number, record)
+                importer.flush()
+                reset_sequences(Post, Comment, Follow)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        fixed = after_bulk_load()
+        self.stderr.write(f'Исправлено записей: {fixed}')
+        for model, count in importer.counts.items():
+            self.stdout.write(f'{model}: {count}')
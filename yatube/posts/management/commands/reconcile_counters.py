@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import reconcile_all
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов, комментариев и подписок.'
+
+    def handle(self, *args, **options):
+        fixed = reconcile_all()
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено записей: {fixed}')
+        )
@@ -0,0 +1,82 @@
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts.models import Post
+from posts.thumbnails import generate_thumbnail, needs_thumbnail
+
+# Столько постов читается и отдаётся пулу за раз: очередь задач
+# не растёт вместе с таблицей.
+CHUNK_SIZE = 500
+
+
+def _generate(post_id, force):
+    if force:
+        Post.objects.filter(pk=post_id).update(thumbnail='')
+    generate_thumbnail(post_id)
+
+
+def _generate_in_worker(post_id, force):
+    try:
+        _generate(post_id, force)
+    finally:
+        connections.close_all()
+
+
+def _pending_chunks(force):
+    """id постов, которым нужна миниатюра, пачками по CHUNK_SIZE.
+
+    Отбор тот же, что и при сохранении поста: миниатюры нет, она
+    от прежней картинки или осталась без картинки. Пачки читаются
+    по ключу отдельными запросами, поэтому курсор не держится
+    открытым, пока потоки пишут в базу.
+    """
+    posts = (
+        Post.objects.exclude(image='', thumbnail='')
+        .only('pk', 'image', 'thumbnail').order_by('pk')
+    )
+    last_id = 0
+    while True:
+        chunk = list(posts.filter(pk__gt=last_id)[:CHUNK_SIZE])
+        if not chunk:
+            return
+        last_id = chunk[-1].pk
+        post_ids = [
+            post.pk for post in chunk if force or needs_thumbnail(post)
+        ]
+        if post_ids:
+            yield post_ids
+
+
+class Command(BaseCommand):
+    help = 'Параллельно строит миниатюры для уже загруженных картинок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Число потоков.',
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Перестроить и уже готовые миниатюры.',
+        )
+
+    def handle(self, *args, workers, force, **options):
+        done = 0
+        if workers <= 1:
+            for post_ids in _pending_chunks(force):
+                for post_id in post_ids:
+                    _generate(post_id, force)
+                    done += 1
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for post_ids in _pending_chunks(force):
+                    for _ in executor.map(
+                        _generate_in_worker, post_ids,
+                        itertools.repeat(force),
+                    ):
+                        done += 1
+        self.stdout.write(self.style.SUCCESS(f'Обработано постов: {done}'))
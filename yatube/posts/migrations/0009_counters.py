@@ -0,0 +1,66 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    Follow = apps.get_model('posts', 'Follow')
+    UserStats = apps.get_model('posts', 'UserStats')
+    db_alias = schema_editor.connection.alias
+
+    def count(queryset, field):
+        counts = (
+            queryset.filter(**{field: models.OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=models.Count('pk'))
+            .values('total')
+        )
+        return Coalesce(
+            models.Subquery(counts, output_field=models.IntegerField()), 0
+        )
+
+    UserStats.objects.using(db_alias).bulk_create(
+        (UserStats(user_id=pk) for pk in User.objects.using(db_alias).values_list(
+            'pk', flat=True
+        )),
+        batch_size=500,
+    )
+    UserStats.objects.using(db_alias).update(
+        posts_count=count(Post.objects, 'author'),
+        followers_count=count(Follow.objects, 'author'),
+        following_count=count(Follow.objects, 'user'),
+    )
+    Post.objects.using(db_alias).update(comments_count=count(Comment.objects, 'post'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0008_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('followers_count', models.PositiveIntegerField(default=0)),
+                ('following_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,99 @@
+from django.db import migrations
+
+# Посты и комментарии лежат в одной FTS5-таблице: rowid поста — 2 * id,
+# комментария — 2 * id + 1, поэтому триггеры удаляют строки по rowid.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE posts_search USING fts5(
+        text, post_id UNINDEXED, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER posts_search_post_insert AFTER INSERT ON posts_post
+    BEGIN
+        INSERT INTO posts_search (rowid, text, post_id)
+        VALUES (new.id * 2, new.text, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_search_post_update AFTER UPDATE OF text
+    ON posts_post
+    BEGIN
+        DELETE FROM posts_search WHERE rowid = old.id * 2;
+        INSERT INTO posts_search (rowid, text, post_id)
+        VALUES (new.id * 2, new.text, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_search_post_delete AFTER DELETE ON posts_post
+    BEGIN
+        DELETE FROM posts_search WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER posts_search_comment_insert AFTER INSERT ON posts_comment
+    BEGIN
+        INSERT INTO posts_search (rowid, text, post_id)
+        VALUES (new.id * 2 + 1, new.text, new.post_id);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_search_comment_update AFTER UPDATE OF text
+    ON posts_comment
+    BEGIN
+        DELETE FROM posts_search WHERE rowid = old.id * 2 + 1;
+        INSERT INTO posts_search (rowid, text, post_id)
+        VALUES (new.id * 2 + 1, new.text, new.post_id);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_search_comment_delete AFTER DELETE ON posts_comment
+    BEGIN
+        DELETE FROM posts_search WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+    """
+    INSERT INTO posts_search (rowid, text, post_id)
+    SELECT id * 2, text, id FROM posts_post
+    """,
+    """
+    INSERT INTO posts_search (rowid, text, post_id)
+    SELECT id * 2 + 1, text, post_id FROM posts_comment
+    """,
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS posts_search_post_insert',
+    'DROP TRIGGER IF EXISTS posts_search_post_update',
+    'DROP TRIGGER IF EXISTS posts_search_post_delete',
+    'DROP TRIGGER IF EXISTS posts_search_comment_insert',
+    'DROP TRIGGER IF EXISTS posts_search_comment_update',
+    'DROP TRIGGER IF EXISTS posts_search_comment_delete',
+    'DROP TABLE IF EXISTS posts_search',
+]
+
+
+def run_sqlite(schema_editor, statements):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search(apps, schema_editor):
+    run_sqlite(schema_editor, CREATE_SQL)
+
+
+def drop_search(apps, schema_editor):
+    run_sqlite(schema_editor, DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_rendition'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search, drop_search),
+    ]
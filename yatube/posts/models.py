@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth import get_user_model
 from django.conf import settings
 
@@ -7,6 +7,26 @@ from core.models import CreatedModel
 User = get_user_model()
 
 
+class CountedModel(CreatedModel):
+    """Запись, от которой зависят счётчики UserStats и Post.
+
+    Счётчики меняются в обработчиках post_save и post_delete
+    (posts.signals). post_delete Django шлёт внутри транзакции
+    удаления, а post_save — уже после записи, поэтому save()
+    вместе с обработчиками выполняется в одной транзакции.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=50, unique=True)
@@ -16,7 +36,22 @@ class Group(models.Model):
         return self.title
 
 
-class Post(CreatedModel):
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты для лент: автор и группа одним JOIN, без лишних колонок."""
+        return self.select_related('author', 'group').only(
+            'text',
+            'pub_date',
+            'image',
+            'thumbnail',
+            'comments_count',
+            'author__username',
+            'group__slug',
+            'group__title',
+        ).prefetch_related('renditions')
+
+
+class Post(CountedModel):
     text = models.TextField()
     pub_date = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(
@@ -36,15 +71,35 @@ class Post(CreatedModel):
         upload_to='posts/',
         blank=True
     )
+    thumbnail = models.ImageField(
+        'Миниатюра',
+        upload_to='posts/thumbs/',
+        blank=True,
+        editable=False
+    )
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'], name='post_date_idx'),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:settings.AMOUNT_SYMBOLS_STR]
 
 
-class Comment(CreatedModel):
+class Comment(CountedModel):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -60,8 +115,16 @@ class Comment(CreatedModel):
         help_text='Введите текст комментария'
     )
 
+    class Meta:
+        ordering = ['created']
+        indexes = [
+            models.Index(
+                fields=['post', 'created'], name='comment_post_created_idx'
+            ),
+        ]
+
 
-class Follow(CreatedModel):
+class Follow(CountedModel):
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -79,3 +142,77 @@ class Follow(CreatedModel):
                 fields=['author', 'user'], name='unique_following'
             )
         ]
+        indexes = [
+            # Список подписок пользователя по порядку author_id.
+            models.Index(fields=['user', 'author'], name='follow_user_idx'),
+        ]
+
+
+class Rendition(models.Model):
+    """Уменьшенная копия картинки поста для srcset."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='renditions'
+    )
+    format = models.CharField(max_length=10)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    image = models.ImageField(upload_to='posts/renditions/')
+
+    class Meta:
+        ordering = ['format', 'width']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'format', 'width'], name='unique_rendition'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} {self.format} {self.width}w'
+
+
+class UserStats(models.Model):
+    """Счётчики пользователя, которые поддерживаются сигналами."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    # Посты автора подмешиваются в ленты при чтении (posts.timeline)
+    fan_in = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f'Счётчики {self.user}'
+
+
+class TimelineEntry(models.Model):
+    """Запись материализованной ленты подписок пользователя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-pub_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_timeline_entry'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date'], name='timeline_user_date_idx'
+            )
+        ]
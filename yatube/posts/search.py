@@ -0,0 +1,99 @@
+"""Полнотекстовый поиск по постам и комментариям.
+
+На SQLite используется FTS5-таблица posts_search, которую заполняют
+триггеры (см. миграцию 0013_post_search), поэтому индекс не отстаёт
+даже от bulk_create и update(). На других СУБД поиск откатывается
+к icontains.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+
+MATCH_SQL = '''
+    SELECT post_id FROM posts_search
+    WHERE posts_search MATCH %s {extra}
+'''
+# Строки идут по рангу bm25; пост может встретиться несколько раз
+# (сам пост и его комментарии), поэтому дубликаты отбрасываются
+# при чтении, пока не наберётся limit постов.
+SEARCH_SQL = MATCH_SQL + 'ORDER BY rank'
+# Только посты: у их строк в posts_search чётный rowid
+POSTS_ONLY = 'AND rowid %% 2 = 0'
+
+
+class MatchSubquery(RawSQL):
+    """Подзапрос для pk__in без лишних скобок.
+
+    Лукап in сам берёт правую часть в скобки; RawSQL добавил бы
+    вторые, и SQLite прочитал бы ((SELECT ...)) как скаляр —
+    первую строку подзапроса.
+    """
+
+    def as_sql(self, compiler, connection):
+        return self.sql, self.params
+
+
+def match_query(query):
+    """Запрос FTS5 из слов пользователя: все слова, с префиксом."""
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_post_ids(query, with_comments=True, limit=None):
+    """id постов, подходящих под запрос, от более к менее релевантным."""
+    limit = limit or settings.SEARCH_MAX_RESULTS
+    fts_query = match_query(query)
+    if not fts_query:
+        return []
+    if connection.vendor != 'sqlite':
+        return _fallback_post_ids(query, with_comments, limit)
+    extra = '' if with_comments else POSTS_ONLY
+    post_ids = {}
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL.format(extra=extra), [fts_query])
+        rows = cursor.fetchmany(limit)
+        while rows and len(post_ids) < limit:
+            for (post_id,) in rows:
+                post_ids.setdefault(post_id, None)
+            rows = cursor.fetchmany(limit)
+    return list(post_ids)[:limit]
+
+
+def filter_posts(queryset, query, with_comments=True):
+    """Отобрать из queryset посты, подходящие под запрос.
+
+    В отличие от search_post_ids, отбор идёт подзапросом
+    pk IN (SELECT ...) без limit и без сортировки по рангу:
+    пагинация и подсчёт на стороне вызывающего (например, админки)
+    видят все совпадения.
+    """
+    fts_query = match_query(query)
+    if not fts_query:
+        return queryset.none()
+    if connection.vendor != 'sqlite':
+        condition = Q(text__icontains=query)
+        if with_comments:
+            condition |= Q(comments__text__icontains=query)
+        return queryset.filter(
+            pk__in=Post.objects.filter(condition).values('pk')
+        )
+    extra = '' if with_comments else POSTS_ONLY
+    return queryset.filter(
+        pk__in=MatchSubquery(MATCH_SQL.format(extra=extra), [fts_query])
+    )
+
+
+def _fallback_post_ids(query, with_comments, limit):
+    condition = Q(text__icontains=query)
+    if with_comments:
+        condition |= Q(comments__text__icontains=query)
+    return list(
+        Post.objects.filter(condition)
+        .values_list('pk', flat=True)
+        .distinct()[:limit]
+    )
@@ -0,0 +1,75 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import counters, follows, thumbnails, timeline
+from .cache import bump_feed_generation
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_feeds(sender, raw=False, **kwargs):
+    if not raw and not follows.handled_in_bulk():
+        bump_feed_generation()
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_user(instance.author_id, posts_count=1)
+        timeline.fan_out_post(instance)
+
+
+@receiver(post_save, sender=Post)
+def prepare_thumbnail(sender, instance, raw=False, **kwargs):
+    if not raw and thumbnails.needs_thumbnail(instance):
+        thumbnails.schedule_thumbnail(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    counters.change_user(instance.author_id, posts_count=-1)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_post(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    counters.change_post(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    counters.change_user(instance.author_id, followers_count=1)
+    counters.change_user(instance.user_id, following_count=1)
+    timeline.update_fan_in([instance.author_id])
+    if timeline.is_fanout_author(instance.author_id):
+        timeline.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def prune_timeline(sender, instance, **kwargs):
+    if follows.handled_in_bulk():
+        return
+    counters.change_user(instance.author_id, followers_count=-1)
+    counters.change_user(instance.user_id, following_count=-1)
+    timeline.prune(instance.user_id, instance.author_id)
+    timeline.update_fan_in([instance.author_id])
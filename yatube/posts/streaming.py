@@ -0,0 +1,94 @@
+"""Потоковый рендеринг лент.
+
+Обычный render() отдаёт первый байт только после всех запросов
+и всех карточек постов. Для представлений из
+settings.STREAMING_FEED_VIEWS страница отдаётся
+StreamingHttpResponse: сначала каркас до списка постов (head,
+шапка), затем карточки по мере чтения строк из курсора базы
+и в конце — остаток страницы с пагинатором.
+
+Каркас рендерится одним проходом шаблона страницы, в котором
+вместо цикла по постам стоит stream_marker; по маркеру он
+делится на начало и конец. Карточки рендерятся в одном контексте
+с context processors, выполненными один раз. Копии картинок
+подгружаются пачками по settings.STREAMING_FEED_CHUNK постов,
+потому что QuerySet.iterator() не выполняет prefetch_related.
+
+Потоковые ответы не попадают в кеш целых страниц и в фрагментный
+кеш лент, а Server-Timing не учитывает время рендеринга карточек.
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import QuerySet, prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+from django.template import loader
+from django.template.context import make_context
+from django.utils.safestring import mark_safe
+
+STREAM_MARKER = mark_safe('<!--stream:posts-->')
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+
+
+def is_streaming(request):
+    match = getattr(request, 'resolver_match', None)
+    return bool(match) and match.url_name in settings.STREAMING_FEED_VIEWS
+
+
+def render_feed(request, template_name, context, card_template=CARD_TEMPLATE,
+                card_context=None, prefetch=('renditions',)):
+    """render() для лент; при включённой настройке — потоком."""
+    if not is_streaming(request):
+        return render(request, template_name, context)
+    frame = loader.render_to_string(
+        template_name, {**context, 'stream_marker': STREAM_MARKER}, request
+    )
+    head, tail = frame.split(STREAM_MARKER, 1)
+    return StreamingHttpResponse(stream(
+        request, head, tail, context['page_obj'], card_template,
+        card_context or {}, prefetch,
+    ))
+
+
+def _rows(object_list, prefetch):
+    if not isinstance(object_list, QuerySet):
+        yield from object_list
+        return
+    chunk_size = settings.STREAMING_FEED_CHUNK
+    rows = object_list.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        if prefetch:
+            prefetch_related_objects(chunk, *prefetch)
+        yield from chunk
+
+
+def _with_last(rows):
+    """Пары (строка, последняя ли она) с заглядыванием на шаг вперёд."""
+    rows = iter(rows)
+    previous = next(rows, None)
+    if previous is None:
+        return
+    for row in rows:
+        yield previous, False
+        previous = row
+    yield previous, True
+
+
+def stream(request, head, tail, page_obj, card_template, card_context,
+           prefetch):
+    yield head
+    template = loader.get_template(card_template).template
+    context = make_context(card_context, request)
+    with context.bind_template(template):
+        for counter, (post, last) in enumerate(
+            _with_last(_rows(page_obj.object_list, prefetch)), 1
+        ):
+            with context.push(
+                post=post, forloop={'counter': counter, 'last': last}
+            ):
+                yield template.render(context)
+    yield tail
@@ -0,0 +1,55 @@
+"""Фоновые задачи после коммита транзакции.
+
+У каждого вида задач свой пул потоков: миниатюры — из
+settings.THUMBNAIL_WORKERS, раскладка постов по лентам — из
+settings.TIMELINE_WORKERS, поэтому медленные картинки не задерживают
+ленты. При нуле задача выполняется сразу после коммита в том же
+потоке.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+
+def _run_in_worker(func, args):
+    try:
+        func(*args)
+    finally:
+        # У потока пула своё соединение с БД — не оставляем его открытым.
+        connections.close_all()
+
+
+class TaskPool:
+    def __init__(self, setting, name):
+        self.setting = setting
+        self.name = name
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self):
+        return getattr(settings, self.setting)
+
+    def get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix=f'posts-{self.name}',
+                )
+            return self._executor
+
+    def run_after_commit(self, func, *args):
+        """Выполнить func(*args) в пуле после коммита транзакции."""
+        if self.workers:
+            transaction.on_commit(
+                lambda: self.get_executor().submit(_run_in_worker, func, args)
+            )
+        else:
+            transaction.on_commit(lambda: func(*args))
+
+
+thumbnail_tasks = TaskPool('THUMBNAIL_WORKERS', 'thumbnails')
+timeline_tasks = TaskPool('TIMELINE_WORKERS', 'timeline')
@@ -0,0 +1,53 @@
+from django import template
+
+from posts.thumbnails import THUMBNAIL_FORMAT, THUMBNAIL_SIZE
+
+register = template.Library()
+
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+# Порядок <source>: браузер берёт первый поддерживаемый формат
+FORMAT_PRIORITY = ('avif', 'webp', 'jpeg')
+
+
+@register.inclusion_tag('posts/includes/post_picture.html')
+def post_picture(post, sizes='(max-width: 960px) 100vw, 960px'):
+    """Картинка поста с srcset по готовым копиям разной ширины.
+
+    JPEG полной ширины — это сама миниатюра: отдельной копии нет.
+    """
+    by_format = {}
+    renditions = post.renditions.all() if post.image else ()
+    for rendition in renditions:
+        by_format.setdefault(rendition.format, []).append({
+            'url': rendition.image.url,
+            'width': rendition.width,
+            'height': rendition.height,
+        })
+    if by_format and post.thumbnail:
+        width, height = THUMBNAIL_SIZE
+        by_format.setdefault(THUMBNAIL_FORMAT, []).append({
+            'url': post.thumbnail.url, 'width': width, 'height': height,
+        })
+    sources = [
+        {
+            'type': MIME_TYPES[image_format],
+            'srcset': ', '.join(
+                f'{image["url"]} {image["width"]}w'
+                for image in by_format[image_format]
+            ),
+        }
+        for image_format in FORMAT_PRIORITY
+        if image_format in by_format
+    ]
+    fallback = None
+    if sources:
+        fallback = max(
+            by_format.get(THUMBNAIL_FORMAT) or next(iter(by_format.values())),
+            key=lambda image: image['width'],
+        )
+    return {
+        'post': post,
+        'sources': sources,
+        'fallback': fallback,
+        'sizes': sizes,
+    }
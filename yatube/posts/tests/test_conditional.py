@@ -0,0 +1,111 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from posts.cache import FEED_MODIFIED_KEY, feed_modified
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост', author=cls.author, group=cls.group
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[cls.group.slug]),
+            reverse('posts:profile', args=[cls.author.username]),
+            reverse('posts:post_detail', args=[cls.post.pk]),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_not_modified_without_rendering(self):
+        """По совпавшему ETag отдаётся 304 без шаблона."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+                self.assertFalse(response.templates)
+
+    def test_write_changes_etag(self):
+        """Новый комментарий меняет ETag всех страниц."""
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        Comment.objects.create(
+            post=self.post, author=self.author, text='Комментарий'
+        )
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_last_modified(self):
+        """Last-Modified — время смены поколения."""
+        url = reverse('posts:index')
+        cache.set(FEED_MODIFIED_KEY, time.time() - 60, None)
+        response = self.client.get(url)
+        self.assertEqual(
+            response['Last-Modified'], http_date(feed_modified().timestamp())
+        )
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_edit_and_delete_change_last_modified(self):
+        """После правки и удаления If-Modified-Since не даёт 304."""
+        url = reverse('posts:index')
+        changes = {
+            'edit': lambda: Post.objects.get(pk=self.post.pk).save(),
+            'delete': lambda: Post.objects.filter(pk=self.post.pk).delete(),
+        }
+        for name, change in changes.items():
+            with self.subTest(change=name):
+                cache.clear()
+                cache.set(FEED_MODIFIED_KEY, time.time() - 60, None)
+                last_modified = self.client.get(url)['Last-Modified']
+                change()
+                response = self.client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=last_modified
+                )
+                self.assertEqual(response.status_code, 200)
+                # В секунду записи Last-Modified не отдаётся.
+                self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_etag_per_user(self):
+        """У гостя и пользователя разные ETag и Cache-Control."""
+        url = reverse('posts:index')
+        anonymous = self.client.get(url)
+        self.client.force_login(self.author)
+        authorized = self.client.get(url)
+        self.assertNotEqual(anonymous['ETag'], authorized['ETag'])
+        self.assertIn('public', anonymous['Cache-Control'])
+        self.assertIn('s-maxage=10', anonymous['Cache-Control'])
+        self.assertIn('private', authorized['Cache-Control'])
+        self.assertIn('Cookie', authorized['Vary'])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=anonymous['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_page(self):
+        """Для несуществующей группы по-прежнему 404."""
+        response = self.client.get(
+            reverse('posts:group_list', args=['missing'])
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('Cache-Control'))
@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post, UserStats
+
+User = get_user_model()
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_post_counter_follows_create_and_delete(self):
+        """Счётчик постов автора меняется при создании и удалении."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        post.delete()
+        self.assertEqual(self.stats(self.author).posts_count, 0)
+
+    def test_failed_counter_rolls_back_write(self):
+        """Запись и счётчики меняются в одной транзакции."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        writes = {
+            'post': lambda: Post.objects.create(
+                text='Пост', author=self.author
+            ),
+            'comment': lambda: Comment.objects.create(
+                post=post, author=self.reader, text='Комментарий'
+            ),
+            'follow': lambda: Follow.objects.create(
+                user=self.reader, author=self.author
+            ),
+        }
+        for name, write in writes.items():
+            with self.subTest(write=name), mock.patch(
+                'posts.counters.UserStats.objects.filter',
+                side_effect=RuntimeError,
+            ), mock.patch(
+                'posts.counters.Post.objects.filter',
+                side_effect=RuntimeError,
+            ):
+                with self.assertRaises(RuntimeError):
+                    write()
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+
+    def test_comment_counter(self):
+        """Счётчик комментариев поста."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='Комментарий'
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_follow_counters(self):
+        """Счётчики подписчиков и подписок."""
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+        follow.delete()
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+
+    def test_reconcile_counters_fixes_drift(self):
+        """Команда reconcile_counters исправляет расхождения."""
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=self.author)
+            for number in range(3)
+        )
+        UserStats.objects.filter(user=self.reader).delete()
+        call_command('reconcile_counters', stdout=open('/dev/null', 'w'))
+        self.assertEqual(self.stats(self.author).posts_count, 3)
+        self.assertTrue(UserStats.objects.filter(user=self.reader).exists())
+
+    @override_settings(CURSOR_PAGINATION_VIEWS=('profile',))
+    def test_profile_does_not_count_posts(self):
+        """Профиль не выполняет COUNT(*) по постам автора."""
+        Post.objects.create(text='Пост', author=self.author)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('posts:profile', args=[self.author.username])
+            )
+        self.assertEqual(response.context['post_count'], 1)
+        self.assertFalse(
+            any('COUNT(' in query['sql'] for query in queries)
+        )
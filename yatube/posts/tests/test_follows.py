@@ -0,0 +1,240 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import pre_delete
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import counters
+from posts.cache import feed_generation
+from posts.follows import follow_authors, unfollow_authors
+from posts.models import Follow, Post, TimelineEntry, UserStats
+
+User = get_user_model()
+
+
+class FollowAuthorsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author_{number}')
+            for number in range(3)
+        ]
+        cls.posts = [
+            Post.objects.create(text=f'Пост {author}', author=author)
+            for author in cls.authors
+        ]
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_follow_many_in_one_insert(self):
+        """Подписка на нескольких авторов — один INSERT и пакетные счётчики."""
+        ids = [author.pk for author in self.authors]
+        generation = feed_generation()
+        with CaptureQueriesContext(connection) as queries:
+            created = follow_authors(self.reader, ids)
+        self.assertCountEqual(created, ids)
+        inserts = [
+            query for query in queries
+            if query['sql'].startswith('INSERT')
+            and Follow._meta.db_table in query['sql']
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(self.stats(self.reader).following_count, 3)
+        for author in self.authors:
+            self.assertEqual(self.stats(author).followers_count, 1)
+        self.assertCountEqual(
+            TimelineEntry.objects.filter(
+                user=self.reader
+            ).values_list('post_id', flat=True),
+            [post.pk for post in self.posts],
+        )
+        self.assertGreater(feed_generation(), generation)
+
+    def test_skips_self_and_existing(self):
+        """Себя и уже отслеживаемых авторов повторно не добавляем."""
+        Follow.objects.create(user=self.reader, author=self.authors[0])
+        created = follow_authors(
+            self.reader,
+            [self.reader.pk, self.authors[0].pk, self.authors[1].pk],
+        )
+        self.assertEqual(created, [self.authors[1].pk])
+        self.assertEqual(Follow.objects.filter(user=self.reader).count(), 2)
+        self.assertEqual(self.stats(self.reader).following_count, 2)
+        self.assertEqual(self.stats(self.authors[0]).followers_count, 1)
+
+    @override_settings(TIMELINE_FANOUT_MAX_FOLLOWERS=0)
+    def test_popular_authors_not_backfilled(self):
+        """Посты популярных авторов в ленту не копируются."""
+        follow_authors(self.reader, [self.authors[0].pk])
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_unfollow_many_in_one_delete(self):
+        """Отписка — один DELETE по таблице подписок."""
+        follow_authors(self.reader, [author.pk for author in self.authors])
+        ids = [self.authors[0].pk, self.authors[1].pk]
+        with CaptureQueriesContext(connection) as queries:
+            removed = unfollow_authors(self.reader, ids)
+        self.assertCountEqual(removed, ids)
+        deletes = [
+            query for query in queries
+            if 'DELETE' in query['sql']
+            and Follow._meta.db_table in query['sql']
+        ]
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(
+            list(Follow.objects.filter(
+                user=self.reader
+            ).values_list('author_id', flat=True)),
+            [self.authors[2].pk],
+        )
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+        self.assertEqual(self.stats(self.authors[0]).followers_count, 0)
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list('post_id', flat=True)),
+            [self.posts[2].pk],
+        )
+
+    def test_read_after_lock(self):
+        """Выборка подписок идёт после блокировки строки пользователя."""
+        follow_authors(self.reader, [self.authors[0].pk])
+        for helper in (follow_authors, unfollow_authors):
+            with self.subTest(helper=helper.__name__):
+                with CaptureQueriesContext(connection) as queries:
+                    helper(self.reader, [self.authors[1].pk])
+                statements = [
+                    query['sql'] for query in queries
+                    if 'SAVEPOINT' not in query['sql']
+                ]
+                self.assertTrue(statements[0].startswith('SELECT'))
+                self.assertIn(User._meta.db_table, statements[0])
+                if connection.features.has_select_for_update:
+                    self.assertIn('FOR UPDATE', statements[0])
+
+    def test_unfollow_skips_signal_work(self):
+        """Обработчики post_delete не повторяют пакетную работу."""
+        follow_authors(self.reader, [author.pk for author in self.authors])
+        with mock.patch('posts.timeline.prune') as prune:
+            unfollow_authors(self.reader, [self.authors[0].pk])
+        prune.assert_not_called()
+        self.assertEqual(self.stats(self.reader).following_count, 2)
+        self.assertEqual(self.stats(self.authors[0]).followers_count, 0)
+        # Одиночная отписка по-прежнему идёт через сигналы.
+        Follow.objects.filter(author=self.authors[1]).delete()
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+
+    def test_unfollow_counts_deleted_rows(self):
+        """Строку удалили в обход функций — счётчики пересчитываются."""
+        follow_authors(self.reader, [author.pk for author in self.authors])
+        concurrent = Follow.objects.get(
+            user=self.reader, author=self.authors[0]
+        )
+
+        def delete_concurrently(sender, instance, **kwargs):
+            if instance.pk != concurrent.pk:
+                return
+            # Параллельная отписка сама поправила счётчики.
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {Follow._meta.db_table} WHERE id = %s',
+                    [concurrent.pk],
+                )
+            counters.change_user(self.reader.pk, following_count=-1)
+            counters.change_user(self.authors[0].pk, followers_count=-1)
+
+        pre_delete.connect(delete_concurrently, sender=Follow)
+        try:
+            unfollow_authors(
+                self.reader, [self.authors[0].pk, self.authors[1].pk]
+            )
+        finally:
+            pre_delete.disconnect(delete_concurrently, sender=Follow)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+        self.assertEqual(self.stats(self.authors[0]).followers_count, 0)
+        self.assertEqual(self.stats(self.authors[1]).followers_count, 0)
+        self.assertEqual(self.stats(self.authors[2]).followers_count, 1)
+
+    def test_unfollow_unknown_is_noop(self):
+        removed = unfollow_authors(self.reader, [self.authors[0].pk])
+        self.assertEqual(removed, [])
+
+
+class FollowViewsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author_{number}')
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def test_follow_many_view(self):
+        """POST со списком авторов подписывает на всех сразу."""
+        response = self.client.post(reverse('posts:follow_many'), {
+            'username': ['author_0', 'author_1', 'unknown'],
+        })
+        self.assertEqual(
+            response.json(), {'changed': ['author_0', 'author_1']}
+        )
+        self.assertEqual(Follow.objects.filter(user=self.reader).count(), 2)
+        response = self.client.post(reverse('posts:unfollow_many'), {
+            'username': ['author_1'],
+        })
+        self.assertEqual(response.json(), {'changed': ['author_1']})
+        self.assertEqual(Follow.objects.filter(user=self.reader).count(), 1)
+
+    def test_bulk_requires_post(self):
+        response = self.client.get(reverse('posts:follow_many'))
+        self.assertEqual(response.status_code, 405)
+
+    @override_settings(MAX_BULK_FOLLOWS=2)
+    def test_bulk_limit(self):
+        response = self.client.post(reverse('posts:follow_many'), {
+            'username': ['author_0', 'author_1', 'author_2'],
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_profile_following_flag(self):
+        """Флаг подписки на странице профиля."""
+        url = reverse('posts:profile', args=['author_0'])
+        response = self.client.get(url)
+        self.assertFalse(response.context['following'])
+        self.assertContains(response, 'Подписаться')
+        Follow.objects.create(user=self.reader, author=self.authors[0])
+        response = self.client.get(url)
+        self.assertTrue(response.context['following'])
+        self.assertContains(response, 'Отписаться')
+
+    def test_profile_following_flag_anonymous(self):
+        self.client.logout()
+        response = self.client.get(
+            reverse('posts:profile', args=['author_0'])
+        )
+        self.assertFalse(response.context['following'])
+
+    @override_settings(AMOUNT_FOLLOWS=2)
+    def test_followers_and_following_pages(self):
+        """Списки подписчиков и подписок листаются курсором."""
+        follow_authors(self.reader, [author.pk for author in self.authors])
+        url = reverse('posts:following', args=['reader'])
+        response = self.client.get(url)
+        self.assertEqual(response.context['people'], self.authors[:2])
+        response = self.client.get(
+            url, {'cursor': response.context['page_obj'].next_cursor}
+        )
+        self.assertEqual(response.context['people'], self.authors[2:])
+        response = self.client.get(
+            reverse('posts:followers', args=['author_0'])
+        )
+        self.assertEqual(response.context['people'], [self.reader])
+        self.assertContains(response, 'reader')
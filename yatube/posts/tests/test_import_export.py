@@ -0,0 +1,160 @@
+import datetime
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.models import QuerySet
+from django.test import TestCase
+
+from posts.models import Comment, Follow, Group, Post, TimelineEntry, UserStats
+
+User = get_user_model()
+
+
+class ImportExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        for number in range(5):
+            post = Post.objects.create(
+                text=f'Пост {number}', author=cls.author, group=cls.group
+            )
+            Comment.objects.create(
+                post=post, author=cls.reader, text=f'Комментарий {number}'
+            )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def export(self):
+        call_command('export_posts', self.path, stderr=io.StringIO())
+
+    def import_(self, batch_size=2):
+        call_command(
+            'import_posts', self.path, batch_size=batch_size,
+            stdout=io.StringIO(), stderr=io.StringIO()
+        )
+
+    def test_round_trip_into_empty_database(self):
+        """Выгрузка загружается в пустую базу с теми же связями."""
+        posts = list(Post.objects.values_list(
+            'text', 'pub_date', 'author__username', 'group__slug'
+        ).order_by('pk'))
+        self.export()
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        self.import_()
+        self.assertEqual(
+            list(Post.objects.values_list(
+                'text', 'pub_date', 'author__username', 'group__slug'
+            ).order_by('pk')),
+            posts
+        )
+        self.assertEqual(Comment.objects.count(), 5)
+        self.assertTrue(Follow.objects.filter(
+            user__username='reader', author__username='author'
+        ).exists())
+        self.assertEqual(
+            UserStats.objects.get(user__username='author').posts_count, 5
+        )
+        self.assertEqual(
+            TimelineEntry.objects.filter(user__username='reader').count(), 5
+        )
+
+    def test_import_remaps_post_ids(self):
+        """Повторный импорт не конфликтует с существующими постами."""
+        self.export()
+        self.import_()
+        self.assertEqual(Post.objects.count(), 10)
+        self.assertEqual(Comment.objects.count(), 10)
+        for post in Post.objects.all():
+            with self.subTest(post=post.pk):
+                self.assertEqual(post.comments.count(), 1)
+                self.assertEqual(
+                    post.comments.get().text,
+                    post.text.replace('Пост', 'Комментарий')
+                )
+
+    def test_dates_kept_without_changing_fields(self):
+        """Даты всех записей берутся из файла, auto_now_add не трогаем."""
+        moment = datetime.datetime(2020, 5, 1, tzinfo=datetime.timezone.utc)
+        Post.objects.update(pub_date=moment, created=moment)
+        Comment.objects.update(created=moment)
+        Follow.objects.update(created=moment)
+        self.export()
+        User.objects.all().delete()
+        bulk_create = QuerySet.bulk_create
+        flags = []
+
+        def check_fields(queryset, *args, **kwargs):
+            # Параллельный запрос в это время должен получить дату.
+            flags.append(Post._meta.get_field('pub_date').auto_now_add)
+            return bulk_create(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'bulk_create', check_fields):
+            self.import_()
+        self.assertTrue(flags)
+        self.assertTrue(all(flags))
+        for model in (Post, Comment, Follow):
+            with self.subTest(model=model.__name__):
+                self.assertEqual(
+                    set(model.objects.values_list('created', flat=True)),
+                    {moment},
+                )
+        self.assertEqual(
+            set(Post.objects.values_list('pub_date', flat=True)), {moment}
+        )
+
+    def test_new_post_after_import(self):
+        """После импорта с явными id новый пост создаётся без конфликта."""
+        self.export()
+        self.import_()
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertGreater(
+            post.pk,
+            max(Post.objects.exclude(pk=post.pk).values_list('pk', flat=True))
+        )
+
+    def write(self, records):
+        with open(self.path, 'w', encoding='utf-8') as stream:
+            for record in records:
+                stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def post_record(self, number, author='author'):
+        return {
+            'model': 'post', 'id': number, 'text': f'Пост {number}',
+            'pub_date': '2022-01-01T00:00:00+00:00',
+            'created': '2022-01-01T00:00:00+00:00',
+            'author': author, 'group': None,
+        }
+
+    def test_bad_record_reported_by_its_line(self):
+        """Ошибка в пачке указывает строку записи, в том числе в последней."""
+        cases = {
+            # Пачка из двух записей сбрасывается третьей строкой.
+            2: [self.post_record(1), self.post_record(2, 'кто-то'),
+                self.post_record(3)],
+            # Ошибка в последней пачке, которая сбрасывается после цикла.
+            3: [self.post_record(1), self.post_record(2),
+                self.post_record(3, 'кто-то')],
+        }
+        for line, records in cases.items():
+            with self.subTest(line=line):
+                self.write(records)
+                with self.assertRaisesMessage(
+                    CommandError, f'Строка {line}: KeyError(\'кто-то\')'
+                ):
+                    self.import_()
@@ -0,0 +1,128 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+from posts.utils import CursorPaginator
+
+User = get_user_model()
+
+
+def query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@skipUnlessDBFeature('supports_explaining_query_execution')
+class FeedIndexesTest(TestCase):
+    """Планы строятся по SQL, который выполняют сами представления.
+
+    Поменяется сортировка или фильтр в представлении — поменяется
+    и проверяемый запрос.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост', author=cls.author, group=cls.group
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN QUERY PLAN есть только в SQLite')
+        self.client.force_login(self.reader)
+
+    def view_queries(self, url, table, params=None):
+        """Упорядоченные запросы представления к таблице table."""
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        queries = [
+            query['sql'] for query in captured
+            if re.search(rf'\bFROM "{table}"', query['sql'])
+            and 'ORDER BY' in query['sql']
+        ]
+        self.assertTrue(queries, f'{url}: нет запросов к {table}')
+        return queries
+
+    def assertUsesIndex(self, sql):
+        plan = query_plan(sql)
+        self.assertFalse(
+            any('TEMP B-TREE' in step for step in plan),
+            f'Сортировка без индекса: {plan}'
+        )
+        self.assertTrue(
+            any('INDEX' in step for step in plan),
+            f'Запрос не использует индекс: {plan}'
+        )
+
+    def check_views(self, views, params=None):
+        for name, (url, table) in views.items():
+            with self.subTest(name=name):
+                for sql in self.view_queries(url, table, params):
+                    self.assertUsesIndex(sql)
+
+    def feed_views(self):
+        return {
+            'index': (reverse('posts:index'), 'posts_post'),
+            'group_posts': (
+                reverse('posts:group_list', args=[self.group.slug]),
+                'posts_post',
+            ),
+            'profile': (
+                reverse('posts:profile', args=[self.author.username]),
+                'posts_post',
+            ),
+        }
+
+    def test_feed_queries_use_indexes(self):
+        """Запросы лент сортируются по индексу, а не во временном B-дереве."""
+        self.check_views({
+            **self.feed_views(),
+            'follow_index': (reverse('posts:follow_index'), 'posts_post'),
+            'post_detail_comments': (
+                reverse('posts:post_detail', args=[self.post.pk]),
+                'posts_comment',
+            ),
+            'followers': (
+                reverse('posts:followers', args=[self.author.username]),
+                'posts_follow',
+            ),
+            'following': (
+                reverse('posts:following', args=[self.reader.username]),
+                'posts_follow',
+            ),
+        })
+
+    @override_settings(
+        CURSOR_PAGINATION_VIEWS=('index', 'group_list', 'profile')
+    )
+    def test_cursor_pages_use_indexes(self):
+        """Следующая страница по курсору тоже идёт по индексу."""
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        token = paginator.encode_cursor(self.post, 'n')
+        self.check_views(self.feed_views(), {'cursor': token})
+        queries = self.view_queries(
+            reverse('posts:index'), 'posts_post', {'cursor': token}
+        )
+        self.assertTrue(any(
+            '"posts_post"."pub_date" <' in sql for sql in queries
+        ))
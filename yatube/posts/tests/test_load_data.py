@@ -0,0 +1,77 @@
+import datetime
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from posts.counters import reconcile_all
+from posts.models import Comment, Follow, Group, Post, TimelineEntry, User
+
+
+class LoadDataTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'generate_load_data', users=30, groups=3, posts=200,
+            comments=300, follows_per_user=5, batch_size=50,
+            stdout=io.StringIO(), stderr=io.StringIO()
+        )
+
+    def test_generated_dataset(self):
+        """Генератор создаёт связанные данные и согласованные счётчики."""
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 300)
+        self.assertTrue(Follow.objects.exists())
+        self.assertTrue(TimelineEntry.objects.exists())
+        self.assertEqual(reconcile_all(), 0)
+
+    def test_dates_spread_over_days(self):
+        """Даты публикаций распределены по дням, а не равны времени вставки."""
+        week_ago = timezone.now() - datetime.timedelta(days=7)
+        for model, field in (
+            (Post, 'pub_date'), (Comment, 'created'), (Follow, 'created')
+        ):
+            with self.subTest(model=model.__name__):
+                self.assertTrue(model.objects.filter(
+                    **{f'{field}__lt': week_ago}
+                ).exists())
+
+    def test_authors_follow_power_law(self):
+        """Самый активный автор пишет заметно больше медианного."""
+        counts = sorted(
+            User.objects.values_list('stats__posts_count', flat=True),
+            reverse=True,
+        )
+        self.assertGreater(counts[0], 3 * counts[len(counts) // 2])
+
+    def test_benchmark_writes_json(self):
+        """Замер пишет перцентили задержек, запросы и память по лентам."""
+        handle, path = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        call_command(
+            'benchmark_feeds', requests=3, memory_requests=1, warmup=0,
+            output=path, stderr=io.StringIO()
+        )
+        with open(path) as stream:
+            report = json.load(stream)
+        self.assertEqual(report['meta']['dataset']['posts'], 200)
+        self.assertEqual(
+            set(report['views']),
+            {'index', 'group_list', 'profile', 'post_detail',
+             'follow_index'},
+        )
+        for view, result in report['views'].items():
+            with self.subTest(view=view):
+                self.assertEqual(result['status'], {'200': 3})
+                self.assertEqual(
+                    set(result['latency_ms']),
+                    {'p50', 'p95', 'p99', 'mean', 'max'},
+                )
+                self.assertGreater(result['queries']['max'], 0)
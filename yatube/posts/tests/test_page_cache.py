@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост', author=cls.author, group=cls.group
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[cls.group.slug]),
+            reverse('posts:profile', args=[cls.author.username]),
+            reverse('posts:post_detail', args=[cls.post.pk]),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_hit_skips_database(self):
+        """Повторный запрос гостя отдаётся из кеша без SQL."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                with self.assertNumQueries(0):
+                    second = self.client.get(url)
+                self.assertEqual(second.status_code, 200)
+                self.assertEqual(second.content, first.content)
+                self.assertEqual(second['ETag'], first['ETag'])
+                self.assertIn('public', second['Cache-Control'])
+
+    def test_holes_filled(self):
+        """В отданной странице нет маркеров, шапка отрисована."""
+        self.client.get(self.urls[0])
+        content = self.client.get(self.urls[0]).content.decode()
+        self.assertNotIn('<!--hole:', content)
+        self.assertIn(reverse('users:login'), content)
+
+    def test_hit_answers_conditional_get(self):
+        """Страница из кеша тоже отвечает 304 по ETag."""
+        etag = self.client.get(self.urls[0])['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.urls[0], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_write_invalidates(self):
+        """Новый пост сразу виден гостям."""
+        self.client.get(self.urls[0])
+        Post.objects.create(text='Свежий пост', author=self.author)
+        response = self.client.get(self.urls[0])
+        self.assertContains(response, 'Свежий пост')
+
+    def test_logged_in_users_bypass_cache(self):
+        """Пользователь с сессией получает свою шапку и форму."""
+        for url in self.urls:
+            self.client.get(url)
+        self.client.force_login(self.author)
+        response = self.client.get(self.urls[0])
+        self.assertContains(response, reverse('users:logout'))
+        response = self.client.get(self.urls[3])
+        self.assertContains(
+            response, reverse('posts:add_comment', args=[self.post.pk])
+        )
+        self.assertIn('private', response['Cache-Control'])
@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class FeedQueryCountTest(TestCase):
+    """Число запросов страниц не зависит от числа постов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.authors = [
+            User.objects.create_user(username=f'author_{number}')
+            for number in range(3)
+        ]
+        for author in cls.authors:
+            Follow.objects.create(user=cls.reader, author=author)
+        for number in range(12):
+            post = Post.objects.create(
+                text=f'Пост {number}',
+                author=cls.authors[number % 3],
+                group=cls.group,
+            )
+            Comment.objects.create(
+                post=post, author=cls.reader, text='Комментарий'
+            )
+        cls.post = post
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_feed_views_num_queries(self):
+        # Сессия и пользователь — 2 запроса,
+        # копии картинок — 1 запрос prefetch_related на страницу,
+        # дальше запросы самой страницы.
+        pages = {
+            reverse('posts:index'): 5,
+            reverse('posts:group_list', args=[self.group.slug]): 6,
+            reverse('posts:profile', args=[self.authors[0].username]): 6,
+            reverse('posts:follow_index'): 6,
+            reverse('posts:post_detail', args=[self.post.pk]): 5,
+        }
+        for url, num_queries in pages.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(num_queries):
+                    self.client.get(url)
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings, skipUnlessDBFeature
+from django.urls import reverse
+
+from posts.models import Comment, Post
+from posts.search import filter_posts, search_post_ids
+
+User = get_user_model()
+
+
+@skipUnlessDBFeature('supports_explaining_query_execution')
+class SearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='author')
+        cls.cats = Post.objects.create(
+            text='Кошки спят почти весь день', author=cls.user
+        )
+        cls.dogs = Post.objects.create(
+            text='Собаки любят гулять', author=cls.user
+        )
+        Comment.objects.create(
+            post=cls.dogs, author=cls.user, text='А кошки не любят'
+        )
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('FTS5 есть только в SQLite')
+
+    def test_search_posts_and_comments(self):
+        """Находятся посты по тексту поста и комментариев."""
+        self.assertEqual(search_post_ids('собаки'), [self.dogs.pk])
+        self.assertCountEqual(
+            search_post_ids('кошки'), [self.cats.pk, self.dogs.pk]
+        )
+        self.assertEqual(
+            search_post_ids('кошки', with_comments=False), [self.cats.pk]
+        )
+
+    def test_index_follows_updates_and_deletes(self):
+        """Триггеры обновляют индекс при update() и удалении."""
+        Post.objects.filter(pk=self.cats.pk).update(text='Попугаи')
+        self.assertEqual(search_post_ids('попугаи'), [self.cats.pk])
+        self.assertEqual(search_post_ids('спят'), [])
+        Post.objects.filter(pk=self.dogs.pk).delete()
+        self.assertEqual(search_post_ids('кошки'), [])
+
+    def test_prefix_and_special_characters(self):
+        """Запрос ищет по префиксу и не ломается на спецсимволах FTS."""
+        self.assertEqual(search_post_ids('соб'), [self.dogs.pk])
+        self.assertEqual(search_post_ids('гулять*" ('), [self.dogs.pk])
+        self.assertEqual(search_post_ids('!!!'), [])
+
+    def test_search_page(self):
+        """Страница поиска выводит найденные посты."""
+        response = self.client.get(reverse('posts:search'), {'q': 'кошки'})
+        self.assertEqual(
+            {post.pk for post in response.context['page_obj']},
+            {self.cats.pk, self.dogs.pk}
+        )
+
+    @override_settings(SEARCH_MAX_RESULTS=1)
+    def test_admin_search_not_limited(self):
+        """Поиск в админке видит все совпадения, а не SEARCH_MAX_RESULTS."""
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        self.client.force_login(admin)
+        kittens = Post.objects.create(text='Котята и кошки', author=self.user)
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'кошки'}
+        )
+        self.assertEqual(response.context['cl'].result_count, 2)
+        self.assertEqual(len(search_post_ids('кошки')), 1)
+        self.assertCountEqual(
+            filter_posts(Post.objects.all(), 'кошки'),
+            [self.cats, self.dogs, kittens],
+        )
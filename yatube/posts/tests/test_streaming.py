@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+STREAMING = ('index', 'group_list', 'profile', 'follow_index')
+
+
+@override_settings(
+    STREAMING_FEED_VIEWS=STREAMING, STREAMING_FEED_CHUNK=4, AMOUNT_POSTS=10
+)
+class StreamingFeedTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост номер {number}', author=cls.author,
+                group=cls.group,
+            )
+            for number in range(12)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def urls(self):
+        return (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:follow_index'),
+        )
+
+    def test_feeds_are_streamed(self):
+        """Каркас уходит первым, затем карточки и пагинатор."""
+        for url in self.urls():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response.streaming)
+                chunks = [
+                    chunk.decode() for chunk in response.streaming_content
+                ]
+                self.assertIn('<head>', chunks[0])
+                self.assertNotIn('Пост номер', chunks[0])
+                self.assertEqual(len(chunks), 12)
+                self.assertIn('Пост номер 11', chunks[1])
+                self.assertIn('page=2', chunks[-1])
+                self.assertIsInstance(
+                    response.context['page_obj'].paginator.count, int
+                )
+
+    def test_streamed_cards_match_rendered(self):
+        """Поток содержит те же посты в том же порядке, что и render()."""
+        url = reverse('posts:index')
+        streamed = b''.join(self.client.get(url).streaming_content).decode()
+        with override_settings(STREAMING_FEED_VIEWS=()):
+            rendered = self.client.get(url).content.decode()
+        for number in range(2, 12):
+            text = f'Пост номер {number}\n'
+            self.assertIn(text, streamed)
+            self.assertIn(text, rendered)
+        positions = [
+            streamed.index(f'Пост номер {number}\n')
+            for number in range(11, 1, -1)
+        ]
+        self.assertEqual(positions, sorted(positions))
+        # Разделитель только между карточками, как и в цикле шаблона.
+        self.assertEqual(streamed.count('<hr>'), rendered.count('<hr>'))
+
+    def test_rows_fetched_in_constant_queries(self):
+        """Число запросов не растёт с числом карточек."""
+        url = reverse('posts:index')
+        # Сессия, пользователь, COUNT, посты
+        # и по запросу копий картинок на каждую пачку из 4 постов.
+        with self.assertNumQueries(7):
+            response = self.client.get(url)
+            b''.join(response.streaming_content)
+
+    def test_anonymous_header_hole_filled(self):
+        """У гостя шапка дорисовывается, а поток не кешируется."""
+        self.client.logout()
+        url = reverse('posts:index')
+        for _ in range(2):
+            response = self.client.get(url)
+            self.assertTrue(response.streaming)
+            content = b''.join(response.streaming_content).decode()
+            self.assertNotIn('<!--hole:', content)
+            self.assertIn(reverse('login'), content)
+
+    @override_settings(STREAMING_FEED_VIEWS=())
+    def test_disabled_by_default(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertFalse(response.streaming)
+
+    def test_profile_card_links_to_profile(self):
+        """Карточка профиля ссылается на профиль автора в обоих режимах."""
+        url = reverse('posts:profile', args=[self.author.username])
+        link = f'<a href="{url}">все посты пользователя</a>'
+        streamed = b''.join(self.client.get(url).streaming_content).decode()
+        self.assertIn(link, streamed)
+        cache.clear()
+        with override_settings(STREAMING_FEED_VIEWS=()):
+            self.assertContains(self.client.get(url), link, count=10)
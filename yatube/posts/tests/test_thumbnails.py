@@ -0,0 +1,149 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from PIL import Image
+
+from posts.checks import rendition_formats as rendition_format_check
+from posts.management.commands import regenerate_thumbnails
+from posts.models import Post
+from posts.thumbnails import (
+    THUMBNAIL_SIZE, generate_thumbnail, rendition_formats, thumbnail_name,
+)
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(name='small.png', size=(40, 30)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'PNG')
+    return SimpleUploadedFile(
+        name=name, content=buffer.getvalue(), content_type='image/png'
+    )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='author')
+
+    def test_thumbnail_generated_with_known_url(self):
+        """Миниатюра строится и сохраняется в записи поста."""
+        post = Post.objects.create(
+            text='Пост', author=self.user, image=make_image()
+        )
+        self.assertFalse(post.thumbnail)
+        generate_thumbnail(post.pk)
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnail.name.startswith('posts/thumbs/'))
+        with Image.open(post.thumbnail.path) as image:
+            self.assertEqual(image.size, THUMBNAIL_SIZE)
+
+    def test_renditions_generated_for_each_width(self):
+        """Копии строятся для каждой ширины и выводятся через srcset."""
+        post = Post.objects.create(
+            text='Пост', author=self.user, image=make_image()
+        )
+        generate_thumbnail(post.pk)
+        post.refresh_from_db()
+        formats = rendition_formats()
+        # JPEG полной ширины не строится: это сама миниатюра.
+        self.assertEqual(
+            post.renditions.count(),
+            len(settings.IMAGE_RENDITION_WIDTHS) * len(formats) - 1
+        )
+        self.assertFalse(post.renditions.filter(
+            format='jpeg', width=THUMBNAIL_SIZE[0]
+        ).exists())
+        for rendition in post.renditions.all():
+            with self.subTest(rendition=str(rendition)):
+                with Image.open(rendition.image.path) as image:
+                    self.assertEqual(
+                        image.size, (rendition.width, rendition.height)
+                    )
+        response = self.client.get(f'/posts/{post.pk}/')
+        self.assertContains(response, 'srcset=')
+        self.assertContains(response, '320w')
+        self.assertContains(response, f'{post.thumbnail.url} 960w')
+        self.assertContains(response, f'src="{post.thumbnail.url}"')
+
+    def test_missing_format_reported(self):
+        """Недоступный в Pillow формат виден в manage.py check."""
+        with override_settings(IMAGE_RENDITION_FORMATS=('nope', 'jpeg')):
+            errors = rendition_format_check()
+        self.assertEqual([error.id for error in errors], ['posts.W001'])
+        self.assertIn('nope', errors[0].msg)
+
+    def test_placeholder_until_ready(self):
+        """Пока миниатюры нет, в карточке выводится заглушка."""
+        post = Post.objects.create(
+            text='Пост', author=self.user, image=make_image()
+        )
+        response = self.client.get(f'/posts/{post.pk}/')
+        self.assertContains(response, 'aspect-ratio')
+        generate_thumbnail(post.pk)
+        response = self.client.get(f'/posts/{post.pk}/')
+        self.assertContains(response, 'posts/renditions/')
+
+    def test_regenerate_command(self):
+        """Команда строит недостающие миниатюры."""
+        post = Post.objects.create(
+            text='Пост', author=self.user, image=make_image()
+        )
+        call_command(
+            'regenerate_thumbnails', workers=1, stdout=io.StringIO()
+        )
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnail)
+
+    def test_regenerate_stale_thumbnail(self):
+        """Миниатюра от прежней картинки перестраивается; пачки по ключу."""
+        posts = [
+            Post.objects.create(
+                text=f'Пост {number}', author=self.user, image=make_image()
+            )
+            for number in range(3)
+        ]
+        for post in posts:
+            generate_thumbnail(post.pk)
+        replaced = Post.objects.create(
+            text='Другая картинка', author=self.user, image=make_image()
+        )
+        Post.objects.filter(pk=posts[0].pk).update(image=replaced.image.name)
+        stdout = io.StringIO()
+        with mock.patch.object(regenerate_thumbnails, 'CHUNK_SIZE', 1):
+            call_command('regenerate_thumbnails', workers=1, stdout=stdout)
+        self.assertIn('Обработано постов: 2', stdout.getvalue())
+        for post in (posts[0], replaced):
+            post.refresh_from_db()
+            self.assertEqual(post.thumbnail.name, thumbnail_name(post))
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailOnCommitTest(TransactionTestCase):
+    def tearDown(self):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_built_synchronously_under_tests(self):
+        """Под тестами миниатюра строится до выхода из create()."""
+        self.assertEqual(settings.THUMBNAIL_WORKERS, 0)
+        user = User.objects.create_user(username='author')
+        post = Post.objects.create(
+            text='Пост', author=user, image=make_image()
+        )
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnail.name.startswith('posts/thumbs/'))
+        self.assertTrue(post.renditions.exists())
@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from posts.models import Follow, Post, TimelineEntry, UserStats
+from posts.timeline import timeline_posts
+
+User = get_user_model()
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.other_reader = User.objects.create_user(username='other')
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        """Новый пост попадает в ленты подписчиков."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.other_reader).exists()
+        )
+        self.assertEqual(list(timeline_posts(self.reader)), [post])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        """Подписка переносит старые посты, отписка их убирает."""
+        old_post = Post.objects.create(text='Старый пост', author=self.author)
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(list(timeline_posts(self.reader)), [old_post])
+        follow.delete()
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(list(timeline_posts(self.reader)), [])
+
+    @override_settings(TIMELINE_FANOUT_MAX_FOLLOWERS=1)
+    def test_popular_author_is_read_on_demand(self):
+        """Посты популярного автора подмешиваются при чтении."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.other_reader, author=self.author)
+        post = Post.objects.create(text='Популярный пост', author=self.author)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(list(timeline_posts(self.reader)), [post])
+        self.assertEqual(list(timeline_posts(self.other_reader)), [post])
+
+
+@override_settings(
+    TIMELINE_FANOUT_MAX_FOLLOWERS=2,
+    TIMELINE_FANOUT_RESUME_FOLLOWERS=1,
+    TIMELINE_WORKERS=0,
+)
+class FanInHysteresisTest(TransactionTestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.readers = [
+            User.objects.create_user(username=f'reader_{number}')
+            for number in range(3)
+        ]
+        self.follows = [
+            Follow.objects.create(user=reader, author=self.author)
+            for reader in self.readers
+        ]
+        self.post = Post.objects.create(text='Пост', author=self.author)
+
+    def fan_in(self):
+        return UserStats.objects.get(user=self.author).fan_in
+
+    def test_threshold_crossing_does_not_refan_out(self):
+        """Колебания у границы не раскладывают посты заново."""
+        self.assertTrue(self.fan_in())
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.follows[2].delete()
+        Follow.objects.create(user=self.readers[2], author=self.author)
+        self.follows[2] = Follow.objects.get(user=self.readers[2])
+        self.follows[2].delete()
+        self.assertTrue(self.fan_in())
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(list(timeline_posts(self.readers[0])), [self.post])
+
+    def test_author_drops_below_resume_is_backfilled(self):
+        """Автор стал обычным: посты возвращаются в ленты после коммита."""
+        self.follows[2].delete()
+        with transaction.atomic():
+            self.follows[1].delete()
+            self.assertFalse(TimelineEntry.objects.exists())
+        self.assertFalse(self.fan_in())
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list('user_id', 'post_id')),
+            [(self.readers[0].pk, self.post.pk)],
+        )
+        self.assertEqual(list(timeline_posts(self.readers[0])), [self.post])
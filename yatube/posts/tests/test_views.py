@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django import forms
 from django.conf import settings
@@ -228,13 +230,37 @@ class TaskPagesTests(TestCase):
         first_try = self.authorized_client.get(reverse('posts:index'))
         hold = first_try.context['page_obj'][0]
         self.assertEqual(post, hold)
-        post.delete()
+        Post.objects.filter(pk=post.pk).update(text='changed')
         second_try = self.authorized_client.get(reverse('posts:index'))
         self.assertEqual(first_try.content, second_try.content)
         cache.clear()
         third_try = self.authorized_client.get(reverse('posts:index'))
         self.assertNotEqual(first_try.content, third_try.content)
 
+    def test_cache_invalidated_on_write(self):
+        """Новые и удалённые посты сразу видны во всех лентах."""
+        pages = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+        )
+        for page in pages:
+            self.authorized_client.get(page)
+        post = Post.objects.create(
+            text='Свежий пост для кеша',
+            author=self.user,
+            group=self.group
+        )
+        for page in pages:
+            with self.subTest(page=page):
+                response = self.authorized_client.get(page)
+                self.assertContains(response, post.text)
+        post.delete()
+        for page in pages:
+            with self.subTest(page=page):
+                response = self.authorized_client.get(page)
+                self.assertNotContains(response, post.text)
+
     def test_follow(self):
         """Зарегистрированный может подписываться."""
         follower_count = Follow.objects.count()
@@ -349,3 +375,139 @@ class PaginatorViewsTest(TestCase):
                     len(response.context['page_obj']),
                     self.second_page_posts
                 )
+
+
+@override_settings(
+    CURSOR_PAGINATION_VIEWS=('index', 'group_list', 'profile')
+)
+class CursorPaginatorViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='CursorUser')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.amount_all_posts = settings.AMOUNT_POSTS * 2 + 3
+        Post.objects.bulk_create(
+            Post(
+                author=cls.user,
+                text=f'Тестовый пост {number}',
+                group=cls.group
+            ) for number in range(cls.amount_all_posts)
+        )
+        cls.pages = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', args=[cls.user]),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor_pages_walk_all_posts(self):
+        """Курсоры «вперёд» обходят все посты без повторов."""
+        expected = list(
+            Post.objects.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+        for value in self.pages:
+            with self.subTest(value=value):
+                seen = []
+                response = self.client.get(value)
+                page_obj = response.context['page_obj']
+                self.assertFalse(page_obj.has_previous())
+                seen += [post.id for post in page_obj]
+                while page_obj.has_next():
+                    response = self.client.get(
+                        value, {'cursor': page_obj.next_cursor}
+                    )
+                    page_obj = response.context['page_obj']
+                    seen += [post.id for post in page_obj]
+                self.assertEqual(seen, expected)
+
+    def test_cursor_previous_returns_same_page(self):
+        """Курсор «назад» возвращает предыдущую страницу."""
+        first = self.client.get(self.pages[0]).context['page_obj']
+        second = self.client.get(
+            self.pages[0], {'cursor': first.next_cursor}
+        ).context['page_obj']
+        back = self.client.get(
+            self.pages[0], {'cursor': second.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_invalid_cursor_shows_first_page(self):
+        """Битый курсор открывает первую страницу."""
+        response = self.client.get(self.pages[0], {'cursor': 'broken!'})
+        self.assertEqual(
+            len(response.context['page_obj']), settings.AMOUNT_POSTS
+        )
+
+    def test_cursor_page_has_no_count_query(self):
+        """Курсорная страница не выполняет COUNT(*)."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.pages[0])
+        self.assertFalse(
+            any('COUNT(' in query['sql'] for query in queries)
+        )
+
+
+@override_settings(AMOUNT_COMMENTS=3)
+class CommentPaginationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Commentator')
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.user)
+        cls.comments = [
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=f'Комментарий {number}'
+            ) for number in range(7)
+        ]
+        cls.detail_url = reverse(
+            'posts:post_detail', kwargs={'post_id': cls.post.pk}
+        )
+        cls.json_url = reverse(
+            'posts:post_comments', kwargs={'post_id': cls.post.pk}
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_detail_shows_first_page_of_comments(self):
+        """На странице поста выводится только первая страница."""
+        response = self.client.get(self.detail_url)
+        comments = response.context['comments']
+        self.assertEqual(list(comments), self.comments[:3])
+        self.assertTrue(comments.has_next())
+
+    def test_newest_order(self):
+        """Параметр order=newest выводит сначала новые комментарии."""
+        response = self.client.get(self.detail_url, {'order': 'newest'})
+        self.assertEqual(
+            list(response.context['comments']),
+            self.comments[::-1][:3]
+        )
+
+    def test_load_more_json_walks_all_comments(self):
+        """JSON-эндпоинт отдаёт оставшиеся комментарии по курсору."""
+        first = self.client.get(self.detail_url).context['comments']
+        seen = [comment.pk for comment in first]
+        cursor = first.next_cursor
+        while cursor:
+            data = self.client.get(
+                self.json_url, {'comments': cursor}
+            ).json()
+            seen += [comment['id'] for comment in data['comments']]
+            cursor = data['next_cursor']
+        self.assertEqual(seen, [comment.pk for comment in self.comments])
+
+    def test_comment_pages_num_queries(self):
+        """Авторы комментариев загружаются тем же запросом."""
+        with self.assertNumQueries(2):
+            self.client.get(self.json_url)
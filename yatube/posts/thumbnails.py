@@ -0,0 +1,160 @@
+"""Фоновая подготовка миниатюр для Post.image.
+
+Миниатюра строится один раз после сохранения поста в пуле потоков
+и записывается в Post.thumbnail, поэтому шаблоны только выводят
+готовый URL. Пока миниатюры нет, показывается заглушка.
+
+Вместе с миниатюрой строятся копии нескольких ширин
+(settings.IMAGE_RENDITION_WIDTHS) в форматах из
+settings.IMAGE_RENDITION_FORMATS, которые поддерживает установленный
+Pillow (недоступные форматы показывает manage.py check, см.
+posts.checks): их выводит тег {% post_picture %} через srcset.
+JPEG ширины самой миниатюры не строится — в srcset идёт миниатюра.
+"""
+import hashlib
+import io
+import logging
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import router
+from PIL import Image, ImageOps
+
+from .cache import bump_feed_generation
+from .models import Post, Rendition
+from .tasks import thumbnail_tasks
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (960, 339)
+THUMBNAIL_FORMAT = 'jpeg'
+THUMBNAIL_DIR = 'posts/thumbs/'
+RENDITION_DIR = 'posts/renditions/'
+FORMAT_EXTENSIONS = {'jpeg': 'jpg', 'webp': 'webp', 'avif': 'avif'}
+SAVE_OPTIONS = {
+    'jpeg': {'quality': 85, 'optimize': True, 'progressive': True},
+    'webp': {'quality': 80, 'method': 4},
+    'avif': {'quality': 60},
+}
+
+
+def _image_digest(post):
+    return hashlib.md5(post.image.name.encode()).hexdigest()[:8]
+
+
+def thumbnail_name(post):
+    """Имя файла миниатюры меняется вместе с исходной картинкой."""
+    return f'{THUMBNAIL_DIR}{post.pk}-{_image_digest(post)}.jpg'
+
+
+def needs_thumbnail(post):
+    if not post.image:
+        return bool(post.thumbnail)
+    return post.thumbnail.name != thumbnail_name(post)
+
+
+def can_save(image_format):
+    Image.init()
+    return image_format.upper() in Image.SAVE
+
+
+def rendition_formats():
+    """Форматы из настроек, которые умеет сохранять Pillow."""
+    return [
+        image_format for image_format in settings.IMAGE_RENDITION_FORMATS
+        if can_save(image_format)
+    ]
+
+
+def _encode(image, image_format):
+    buffer = io.BytesIO()
+    image.save(buffer, image_format.upper(), **SAVE_OPTIONS[image_format])
+    return ContentFile(buffer.getvalue())
+
+
+def _crop(image_file, size):
+    """Обрезать по центру и масштабировать (в т.ч. увеличить) до size."""
+    with Image.open(image_file) as image:
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        return ImageOps.fit(image, size, Image.LANCZOS)
+
+
+def render_renditions(image):
+    """Копии обрезанной картинки для каждой ширины и формата.
+
+    JPEG исходной ширины совпал бы с миниатюрой байт в байт.
+    """
+    width, height = image.size
+    for target_width in settings.IMAGE_RENDITION_WIDTHS:
+        target_height = round(height * target_width / width)
+        resized = image.resize((target_width, target_height), Image.LANCZOS)
+        for image_format in rendition_formats():
+            if image_format == THUMBNAIL_FORMAT and target_width == width:
+                continue
+            yield (
+                image_format, target_width, target_height,
+                _encode(resized, image_format),
+            )
+
+
+def _replace_renditions(post, image):
+    old_renditions = list(Rendition.objects.filter(post_id=post.pk))
+    digest = _image_digest(post)
+    renditions = []
+    for image_format, width, height, content in render_renditions(image):
+        extension = FORMAT_EXTENSIONS[image_format]
+        name = default_storage.save(
+            f'{RENDITION_DIR}{post.pk}-{digest}-{width}.{extension}',
+            content,
+        )
+        renditions.append(Rendition(
+            post_id=post.pk, format=image_format,
+            width=width, height=height, image=name,
+        ))
+    Rendition.objects.filter(post_id=post.pk).delete()
+    Rendition.objects.bulk_create(renditions)
+    for rendition in old_renditions:
+        default_storage.delete(rendition.image.name)
+
+
+def generate_thumbnail(post_id):
+    """Построить миниатюру поста и сохранить её URL в записи."""
+    # Пост только что записан: реплика может его ещё не видеть.
+    post = (
+        Post.objects.using(router.db_for_write(Post))
+        .only('image', 'thumbnail').filter(pk=post_id).first()
+    )
+    if post is None or not needs_thumbnail(post):
+        return
+    old_name = post.thumbnail.name
+    name = ''
+    if post.image:
+        try:
+            with post.image.open('rb') as image_file:
+                image = _crop(image_file, THUMBNAIL_SIZE)
+        except (OSError, ValueError, SuspiciousFileOperation):
+            # Путь вне хранилища тоже не должен ронять запись поста.
+            logger.exception(
+                'Не удалось построить миниатюру поста %s', post_id
+            )
+            return
+        name = thumbnail_name(post)
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        name = default_storage.save(name, _encode(image, THUMBNAIL_FORMAT))
+        _replace_renditions(post, image)
+    else:
+        for rendition in Rendition.objects.filter(post_id=post_id):
+            default_storage.delete(rendition.image.name)
+            rendition.delete()
+    Post.objects.filter(pk=post_id).update(thumbnail=name)
+    if old_name and old_name != name:
+        default_storage.delete(old_name)
+    bump_feed_generation()
+
+
+def schedule_thumbnail(post_id):
+    """Поставить построение миниатюры в очередь после коммита."""
+    thumbnail_tasks.run_after_commit(generate_thumbnail, post_id)
@@ -0,0 +1,167 @@
+"""Лента подписок: fan-out при записи и чтение для популярных авторов.
+
+Новый пост копируется в ленты подписчиков автора (TimelineEntry),
+поэтому лента пользователя читается одним запросом по индексу
+(user, pub_date). Когда подписчиков у автора становится больше
+settings.TIMELINE_FANOUT_MAX_FOLLOWERS, он помечается UserStats.fan_in:
+его посты не раскладываются по лентам, а подмешиваются при чтении.
+Обратно автор раскладывается по лентам, только когда подписчиков
+станет не больше TIMELINE_FANOUT_RESUME_FOLLOWERS, и делает это
+фоновая задача одним INSERT ... SELECT: отписка не ждёт раскладки,
+а колебания у границы не повторяют её на каждой подписке.
+"""
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Q
+
+from .cache import bump_feed_generation
+from .models import Follow, Post, TimelineEntry, UserStats
+from .tasks import timeline_tasks
+
+BATCH_SIZE = 500
+
+
+def _bulk_add(entries):
+    TimelineEntry.objects.bulk_create(
+        entries, batch_size=BATCH_SIZE, ignore_conflicts=True
+    )
+
+
+def is_fanout_author(author_id):
+    """Раскладываются ли посты автора по лентам подписчиков."""
+    return not UserStats.objects.filter(
+        user_id=author_id, fan_in=True
+    ).exists()
+
+
+def update_fan_in(author_ids):
+    """Переключить режим авторов после изменения числа подписчиков."""
+    UserStats.objects.filter(
+        user_id__in=author_ids, fan_in=False,
+        followers_count__gt=settings.TIMELINE_FANOUT_MAX_FOLLOWERS,
+    ).update(fan_in=True)
+    for author_id in UserStats.objects.filter(
+        user_id__in=author_ids, fan_in=True,
+        followers_count__lte=settings.TIMELINE_FANOUT_RESUME_FOLLOWERS,
+    ).values_list('user_id', flat=True):
+        timeline_tasks.run_after_commit(resume_fan_out, author_id)
+
+
+def fan_out_post(post):
+    """Добавить новый пост в ленты подписчиков автора."""
+    if not is_fanout_author(post.author_id):
+        return
+    follower_ids = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    _bulk_add(
+        TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in follower_ids.iterator()
+    )
+
+
+def backfill(user_id, author_id):
+    """Скопировать посты автора в ленту нового подписчика."""
+    backfill_authors(user_id, [author_id])
+
+
+def backfill_authors(user_id, author_ids):
+    """Скопировать посты нескольких авторов в ленту подписчика."""
+    posts = (
+        Post.objects.filter(author_id__in=author_ids)
+        .values_list('pk', 'pub_date')
+        .order_by()
+    )
+    _bulk_add(
+        TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+        for pk, pub_date in posts.iterator()
+    )
+
+
+FAN_OUT_SQL = """
+    {insert} {timeline} (user_id, post_id, pub_date)
+    SELECT follow.user_id, post.id, post.pub_date
+    FROM {follow} follow
+    JOIN {post} post ON post.author_id = follow.author_id
+    LEFT JOIN {stats} stats ON stats.user_id = follow.author_id
+    WHERE {where}
+    {suffix}
+"""
+
+
+def _fan_out_sql(connection, where, params):
+    """Скопировать посты в ленты подписчиков одним INSERT ... SELECT.
+
+    На миллионах записей это на порядки быстрее, чем bulk_create
+    из Python.
+    """
+    sql = FAN_OUT_SQL.format(
+        insert=connection.ops.insert_statement(ignore_conflicts=True),
+        timeline=TimelineEntry._meta.db_table,
+        follow=Follow._meta.db_table,
+        post=Post._meta.db_table,
+        stats=UserStats._meta.db_table,
+        where=where,
+        suffix=connection.ops.ignore_conflicts_suffix_sql(
+            ignore_conflicts=True
+        ),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def rebuild_timelines():
+    """Заполнить ленты по всем подпискам (после импорта или bulk_create)."""
+    connection = connections[router.db_for_write(TimelineEntry)]
+    _fan_out_sql(connection, 'NOT COALESCE(stats.fan_in, %s)', [False])
+
+
+def resume_fan_out(author_id):
+    """Разложить посты автора по лентам и снять с него fan_in.
+
+    Флаг снимается в одной транзакции с раскладкой, поэтому до неё
+    посты по-прежнему подмешиваются при чтении. Если автор снова
+    стал популярным, ничего не делаем.
+    """
+    alias = router.db_for_write(UserStats)
+    with transaction.atomic(using=alias):
+        # UPDATE с условием блокирует строку и перепроверяет число
+        # подписчиков атомарно.
+        resumed = UserStats.objects.using(alias).filter(
+            user_id=author_id, fan_in=True,
+            followers_count__lte=settings.TIMELINE_FANOUT_RESUME_FOLLOWERS,
+        ).update(fan_in=False)
+        if not resumed:
+            return
+        _fan_out_sql(
+            connections[alias], 'follow.author_id = %s', [author_id]
+        )
+    bump_feed_generation()
+
+
+def prune(user_id, author_id):
+    """Убрать посты автора из ленты отписавшегося пользователя."""
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+def timeline_posts(user):
+    """Посты ленты подписок пользователя.
+
+    Если среди подписок нет популярных авторов, лента читается
+    диапазоном по индексу (user, pub_date) таблицы TimelineEntry.
+    """
+    fan_in_authors = list(
+        Follow.objects.filter(
+            user=user, author__stats__fan_in=True
+        ).values_list('author_id', flat=True)
+    )
+    if not fan_in_authors:
+        return Post.objects.filter(
+            timeline_entries__user=user
+        ).order_by('-timeline_entries__pub_date')
+    entries = TimelineEntry.objects.filter(user=user).values('post')
+    return Post.objects.filter(
+        Q(pk__in=entries) | Q(author__in=fan_in_authors)
+    )
@@ -16,9 +16,27 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path('follow/many/', views.follow_many, name='follow_many'),
+    path('unfollow/many/', views.unfollow_many, name='unfollow_many'),
+    path(
+        'profile/<str:username>/followers/',
+        views.followers,
+        name='followers'
+    ),
+    path(
+        'profile/<str:username>/following/',
+        views.following,
+        name='following'
+    ),
+    path('search/', views.search, name='search'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path(
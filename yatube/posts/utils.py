@@ -1,9 +1,207 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
 from django.core.paginator import Paginator
 from django.conf import settings
+from django.db.models import Q
+
 
+def show_pages(post_list, request, cursor=None):
+    """Постраничный вывод записей.
 
-def show_pages(post_list, request):
+    По умолчанию используется Paginator с номерами страниц.
+    Если для представления включена курсорная пагинация
+    (settings.CURSOR_PAGINATION_VIEWS) или передан cursor=True,
+    страница строится по ключу (pub_date, id) без COUNT(*) и OFFSET.
+    """
+    if cursor is None:
+        match = getattr(request, 'resolver_match', None)
+        cursor = bool(match) and (
+            match.url_name in settings.CURSOR_PAGINATION_VIEWS
+        )
+    if cursor:
+        return show_cursor_pages(post_list, request)
     paginator = Paginator(post_list, settings.AMOUNT_POSTS)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
+
+
+def show_cursor_pages(object_list, request, ordering=('-pub_date', '-id'),
+                      per_page=None, param='cursor'):
+    paginator = CursorPaginator(
+        object_list, per_page or settings.AMOUNT_POSTS, ordering
+    )
+    return paginator.get_page(request.GET.get(param))
+
+
+COMMENT_ORDERINGS = {
+    'oldest': ('created', 'id'),
+    'newest': ('-created', '-id'),
+}
+
+
+def show_comments(post, request):
+    """Страница комментариев поста по курсору ?comments=.
+
+    Порядок задаётся параметром ?order=oldest|newest.
+    """
+    order = request.GET.get('order')
+    if order not in COMMENT_ORDERINGS:
+        order = 'oldest'
+    page_obj = show_cursor_pages(
+        post.comments.select_related('author'),
+        request,
+        ordering=COMMENT_ORDERINGS[order],
+        per_page=settings.AMOUNT_COMMENTS,
+        param='comments',
+    )
+    page_obj.order = order
+    return page_obj
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPaginator:
+    """Keyset-пагинация по набору полей ordering.
+
+    Все поля сортируются в одном направлении, последнее поле
+    должно быть уникальным (обычно id), чтобы ключ однозначно
+    определял позицию в выборке.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.fields = tuple(name.lstrip('-') for name in self.ordering)
+        opts = object_list.model._meta
+        self.model_fields = [opts.get_field(name) for name in self.fields]
+
+    def encode_cursor(self, obj, direction):
+        values = [
+            field.value_to_string(obj) for field in self.model_fields
+        ]
+        payload = json.dumps({'d': direction, 'v': values})
+        token = base64.urlsafe_b64encode(payload.encode())
+        return token.decode().rstrip('=')
+
+    def decode_cursor(self, token):
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction = payload['d']
+            raw_values = payload['v']
+            if direction not in ('n', 'p'):
+                raise ValueError(direction)
+            if len(raw_values) != len(self.model_fields):
+                raise ValueError(raw_values)
+            values = [
+                field.to_python(value)
+                for field, value in zip(self.model_fields, raw_values)
+            ]
+        except (TypeError, KeyError, ValueError,
+                binascii.Error, UnicodeDecodeError) as error:
+            raise InvalidCursor(token) from error
+        return direction, values
+
+    def _keyset_filter(self, values, forward):
+        """Условие «строго после ключа» в порядке ordering.
+
+        Для ключа (a, b) это a <= x AND (a < x OR (a = x AND b < y)):
+        первое условие даёт SQLite диапазон по индексу на a,
+        а OR лишь отсеивает строки внутри этого диапазона.
+        """
+        lookup = 'lt' if self.descending == forward else 'gt'
+        condition = Q()
+        equal = {}
+        for name, value in zip(self.fields, values):
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        bound = Q(**{f'{self.fields[0]}__{lookup}e': values[0]})
+        return bound & condition
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        ]
+
+    def page(self, token=None):
+        direction, values = ('n', None)
+        if token:
+            direction, values = self.decode_cursor(token)
+        forward = direction == 'n'
+        queryset = self.object_list
+        if values is not None:
+            queryset = queryset.filter(self._keyset_filter(values, forward))
+        if forward:
+            queryset = queryset.order_by(*self.ordering)
+        else:
+            queryset = queryset.order_by(*self._reversed_ordering())
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+        if forward:
+            has_next, has_previous = has_more, values is not None
+        else:
+            has_next, has_previous = True, has_more
+        return CursorPage(rows, self, has_next, has_previous)
+
+    def get_page(self, token=None):
+        """Как Paginator.get_page: битый курсор ведёт на первую страницу."""
+        try:
+            return self.page(token)
+        except InvalidCursor:
+            return self.page()
+
+
+class CursorPage(Sequence):
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        if not self.object_list:
+            return '<Cursor page (empty)>'
+        return '<Cursor page %s..%s>' % (
+            self.object_list[0].pk, self.object_list[-1].pk
+        )
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], 'n')
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], 'p')
@@ -1,50 +1,141 @@
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.urls import reverse
+from django.views.decorators.http import require_POST
 
 from .models import Post, Group, User, Follow
+from .counters import get_stats
+from .decorators import anonymous_page_cache, feed_condition
+from .follows import follow_authors, unfollow_authors, with_following_flag
 from .forms import PostForm, CommentForm
-from .utils import show_pages
+from .search import search_post_ids
+from .streaming import render_feed
+from .timeline import timeline_posts
+from .utils import show_comments, show_cursor_pages, show_pages
 
 
+@anonymous_page_cache
+@feed_condition
 def index(request):
-    post_list = Post.objects.select_related('author')
+    post_list = Post.objects.for_feed()
     page_obj = show_pages(post_list, request)
     context = {
         'page_obj': page_obj,
     }
-    return render(request, 'posts/index.html', context)
+    return render_feed(
+        request, 'posts/index.html', context,
+        card_context={'show_group_link': True},
+    )
 
 
+@anonymous_page_cache
+@feed_condition
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts_list = group.posts.all()
+    posts_list = group.posts.for_feed()
     page_obj = show_pages(posts_list, request)
     context = {
         'group': group,
         'page_obj': page_obj
     }
-    return render(request, 'posts/group_list.html', context)
+    return render_feed(request, 'posts/group_list.html', context)
+
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = show_pages(search_post_ids(query), request)
+    posts = Post.objects.for_feed().in_bulk(page_obj.object_list)
+    page_obj.object_list = [
+        posts[pk] for pk in page_obj.object_list if pk in posts
+    ]
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
 
+
+@anonymous_page_cache
+@feed_condition
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    post_count = author.posts.count()
+    author = get_object_or_404(
+        with_following_flag(
+            User.objects.select_related('stats'), request.user
+        ),
+        username=username
+    )
+    posts = author.posts.for_feed()
+    stats = get_stats(author)
     page_obj = show_pages(posts, request)
     context = {
         'author': author,
         'page_obj': page_obj,
-        'post_count': post_count,
+        'post_count': stats.posts_count,
+        'stats': stats,
+        'following': getattr(author, 'is_following', False),
+    }
+    return render_feed(
+        request, 'posts/profile.html', context,
+        card_template='posts/includes/profile_card.html',
+        card_context={'author': author},
+    )
+
+
+# Списки упорядочены по второму полю уникального индекса подписок:
+# (author, user) для подписчиков и (user, author) для подписок.
+FOLLOW_LISTS = {
+    'followers': ('author', 'user', 'Подписчики'),
+    'following': ('user', 'author', 'Подписки'),
+}
+
+
+def follow_list(request, username, kind):
+    owner_field, other_field, title = FOLLOW_LISTS[kind]
+    author = get_object_or_404(User.objects.only('username'),
+                               username=username)
+    follows = Follow.objects.filter(
+        **{owner_field: author}
+    ).select_related(other_field).only(
+        f'{other_field}__username',
+        f'{other_field}__first_name',
+        f'{other_field}__last_name',
+        other_field,
+    )
+    page_obj = show_cursor_pages(
+        follows, request, ordering=(f'{other_field}_id',),
+        per_page=settings.AMOUNT_FOLLOWS,
+    )
+    context = {
+        'author': author,
+        'title': title,
+        'page_obj': page_obj,
+        'people': [getattr(follow, other_field) for follow in page_obj],
     }
-    return render(request, 'posts/profile.html', context)
+    return render(request, 'posts/follow_list.html', context)
+
+
+def followers(request, username):
+    return follow_list(request, username, 'followers')
+
+
+def following(request, username):
+    return follow_list(request, username, 'following')
 
 
+@anonymous_page_cache
+@feed_condition
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    post_amount = Post.objects.filter(author=post.author).count()
+    post = get_object_or_404(
+        Post.objects.select_related(
+            'author__stats', 'group'
+        ).prefetch_related('renditions'),
+        pk=post_id
+    )
+    post_amount = get_stats(post.author).posts_count
     form = CommentForm()
-    comments = post.comments.all()
+    comments = show_comments(post, request)
     context = {
         'post': post,
         'post_amount': post_amount,
@@ -54,6 +145,28 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+def post_comments(request, post_id):
+    """Следующая страница комментариев в JSON для «Показать ещё»."""
+    post = get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    page_obj = show_comments(post, request)
+    return JsonResponse({
+        'comments': [
+            {
+                'id': comment.pk,
+                'author': comment.author.username,
+                'author_url': reverse(
+                    'posts:profile', args=[comment.author.username]
+                ),
+                'text': comment.text,
+                'created': comment.created.isoformat(),
+            }
+            for comment in page_obj
+        ],
+        'next_cursor': page_obj.next_cursor,
+        'order': page_obj.order,
+    })
+
+
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None)
@@ -100,28 +213,55 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    post = Post.objects.filter(author__following__user=request.user)
+    post = timeline_posts(request.user).for_feed()
     page_obj = show_pages(post, request)
     context = {
         'page_obj': page_obj
     }
-    return render(request, 'posts/follow.html', context)
+    return render_feed(request, 'posts/follow.html', context)
 
 
 @login_required
 def profile_follow(request, username):
     user = request.user
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(User.objects.only('pk'), username=username)
     if author != user:
-        Follow.objects.get_or_create(user=user, author=author)
+        follow_authors(user, [author.pk])
         return redirect(reverse('posts:profile', args=[username]))
     return redirect('posts:index')
 
 
 @login_required
 def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
-    is_follower = Follow.objects.filter(user=request.user, author=author)
-    if is_follower.exists():
-        is_follower.delete()
-    return redirect('posts:profile', username=author)
+    author = get_object_or_404(User.objects.only('pk'), username=username)
+    unfollow_authors(request.user, [author.pk])
+    return redirect('posts:profile', username=username)
+
+
+def _bulk_follow(request, action):
+    usernames = request.POST.getlist('username')
+    if len(usernames) > settings.MAX_BULK_FOLLOWS:
+        return JsonResponse(
+            {'error': f'Не больше {settings.MAX_BULK_FOLLOWS} авторов'},
+            status=400,
+        )
+    names = dict(User.objects.filter(
+        username__in=usernames
+    ).values_list('pk', 'username'))
+    changed = action(request.user, list(names))
+    return JsonResponse({
+        'changed': sorted(names[pk] for pk in changed),
+    })
+
+
+@require_POST
+@login_required
+def follow_many(request):
+    """Подписка на несколько авторов: POST username=...&username=..."""
+    return _bulk_follow(request, follow_authors)
+
+
+@require_POST
+@login_required
+def unfollow_many(request):
+    return _bulk_follow(request, unfollow_authors)
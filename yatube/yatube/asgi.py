@@ -0,0 +1,19 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named ``application``,
+e.g. ``uvicorn yatube.asgi:application``. Django 2.2 has no ASGI handler of
+its own, so the WSGI handler runs behind core.asgi.WsgiToAsgi in a bounded
+thread pool (settings.ASGI_THREADS).
+"""
+
+import os
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+from core.asgi import WsgiToAsgi
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+application = WsgiToAsgi(get_wsgi_application(), settings.ASGI_THREADS)
@@ -0,0 +1,20 @@
+"""Настройки проекта: base — общие, dev и prod — для окружений.
+
+Окружение выбирается переменной YATUBE_ENV (dev по умолчанию).
+Модуль можно указать и напрямую:
+DJANGO_SETTINGS_MODULE=yatube.settings.prod.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+YATUBE_ENV = os.getenv('YATUBE_ENV', 'dev')
+
+if YATUBE_ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+elif YATUBE_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(
+        f'Неизвестное окружение YATUBE_ENV={YATUBE_ENV!r}: ждём dev или prod'
+    )
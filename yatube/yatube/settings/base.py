@@ -0,0 +1,353 @@
+"""
+Django settings for yatube project: общие для всех окружений.
+
+Generated by 'django-admin startproject' using Django 2.2.19.
+Всё, что зависит от развёртывания, читается из переменных окружения
+YATUBE_*; значения по умолчанию годятся только для разработки,
+dev и prod уточняют их.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+
+from .env import env, env_bool, env_float, env_int, env_list
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = env('YATUBE_SECRET_KEY', '')
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = env_bool('YATUBE_DEBUG', False)
+
+# Включается в prod: core.checks не даёт запуститься с настройками,
+# годными только для разработки
+PRODUCTION = False
+
+ALLOWED_HOSTS = env_list('YATUBE_ALLOWED_HOSTS', [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+])
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'posts.apps.PostsConfig',
+    'users.apps.UsersConfig',
+    'core.apps.CoreConfig',
+    'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
+    'core.middleware.QueryLogMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+
+
+def template_loaders(debug):
+    """Загрузчики core.loaders замеряют каждый шаблон и {% include %}.
+
+    Без DEBUG скомпилированные шаблоны кешируются в памяти процесса
+    и при TEMPLATES_PRECOMPILE компилируются все сразу при старте.
+    """
+    if debug:
+        return [
+            'core.loaders.FilesystemLoader',
+            'core.loaders.AppDirectoriesLoader',
+        ]
+    return [
+        ('core.loaders.CachedLoader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
+
+TEMPLATE_LOADERS = template_loaders(DEBUG)
+TEMPLATES_PRECOMPILE = not DEBUG
+
+TEMPLATES = [
+    {
+        'BACKEND': 'core.backends.InstrumentedDjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+                'posts.context_processors.feed_cache',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+# Потоки, в которых yatube.asgi выполняет синхронные представления
+ASGI_THREADS = env_int('YATUBE_ASGI_THREADS', 8)
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+# Соединения живут между запросами; раз в интервал они проверяются
+# в начале запроса (core.db.check_connections)
+CONN_MAX_AGE = env_int('YATUBE_CONN_MAX_AGE', 60)
+CONN_HEALTH_CHECK_INTERVAL = env_int('YATUBE_CONN_HEALTH_CHECK_INTERVAL', 30)
+
+# Пул соединений Django 2.2 не умеет: его держит внешний пулер
+# (pgbouncer). В режиме транзакций пулера серверные курсоры
+# QuerySet.iterator() не переживают транзакцию, поэтому их отключаем.
+DATABASE_POOLER = env('YATUBE_DB_POOLER', '')
+
+DATABASES = {
+    'default': {
+        'ENGINE': env('YATUBE_DB_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': env('YATUBE_DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+        'USER': env('YATUBE_DB_USER', ''),
+        'PASSWORD': env('YATUBE_DB_PASSWORD', ''),
+        'HOST': env('YATUBE_DB_HOST', ''),
+        'PORT': env('YATUBE_DB_PORT', ''),
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'DISABLE_SERVER_SIDE_CURSORS': DATABASE_POOLER == 'transaction',
+    }
+}
+
+# Реплики только для чтения: пути к файлам SQLite через запятую
+# (для разработки их обновляет manage.py sync_replicas). Тестовой
+# базы для реплик не создаётся: они зеркалят default.
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+    env_list('YATUBE_DB_REPLICAS'), 1
+):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+# PRAGMA для каждого нового соединения SQLite (core.db). busy_timeout
+# идёт первым, чтобы переключение журнала тоже ждало блокировку.
+SQLITE_PRAGMAS = {
+    'busy_timeout': env_int('YATUBE_SQLITE_BUSY_TIMEOUT', 5000),
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер в КиБ
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# После запроса, меняющего данные, чтение несколько секунд идёт
+# из основной базы, чтобы пользователь видел свои изменения
+REPLICA_PIN_COOKIE = 'pin_primary'
+REPLICA_PIN_SECONDS = 5
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = env('YATUBE_STATIC_URL', '/static/')
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+# Куда collectstatic собирает файлы для веб-сервера
+STATIC_ROOT = env(
+    'YATUBE_STATIC_ROOT', os.path.join(BASE_DIR, 'static_collected')
+)
+# ManifestStaticFilesStorage добавляет хеш содержимого к именам файлов,
+# и их можно кешировать в браузере без срока
+STATICFILES_STORAGE = env(
+    'YATUBE_STATICFILES_STORAGE',
+    'django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+AMOUNT_POSTS = env_int('YATUBE_AMOUNT_POSTS', 10)
+AMOUNT_COMMENTS = 20
+AMOUNT_FOLLOWS = 50
+# Сколько авторов можно подписать или отписать одним запросом
+MAX_BULK_FOLLOWS = 100
+# Сколько лучших совпадений поиска можно пролистать
+SEARCH_MAX_RESULTS = 1000
+# Представления (url_name), где вместо номеров страниц используется курсор
+CURSOR_PAGINATION_VIEWS = ()
+# Представления (url_name), которые отдают ленту потоком (posts.streaming)
+STREAMING_FEED_VIEWS = ()
+# По сколько постов подгружаются копии картинок при потоковой отдаче
+STREAMING_FEED_CHUNK = 5
+AMOUNT_SYMBOLS_STR = 15
+# Посты авторов с большим числом подписчиков не раскладываются по лентам
+TIMELINE_FANOUT_MAX_FOLLOWERS = 1000
+# Обратно по лентам автор раскладывается, когда подписчиков станет
+# не больше этого числа: колебания у границы не повторяют раскладку
+TIMELINE_FANOUT_RESUME_FOLLOWERS = 900
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+MEDIA_URL = env('YATUBE_MEDIA_URL', '/media/')
+MEDIA_ROOT = env('YATUBE_MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+DEFAULT_FILE_STORAGE = env(
+    'YATUBE_FILE_STORAGE', 'django.core.files.storage.FileSystemStorage'
+)
+
+# Потоков для фоновой подготовки миниатюр и для раскладки постов
+# по лентам (0 — сразу после коммита; под тестами 0 по умолчанию,
+# см. dev.py)
+THUMBNAIL_WORKERS = env_int('YATUBE_THUMBNAIL_WORKERS', 2)
+TIMELINE_WORKERS = env_int('YATUBE_TIMELINE_WORKERS', 2)
+# Ширины и форматы копий картинок для srcset; форматы, которые
+# не поддерживает установленный Pillow, пропускаются.
+IMAGE_RENDITION_WIDTHS = (320, 640, 960)
+IMAGE_RENDITION_FORMATS = ('avif', 'webp', 'jpeg')
+
+# Границы гистограммы времени ответа для /metrics/, в секундах
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+# Доля запросов под журналом медленного SQL и поиском N+1
+QUERY_LOG_SAMPLE_RATE = env_float('YATUBE_QUERY_LOG_SAMPLE_RATE', 0.05)
+SLOW_QUERY_THRESHOLD_MS = 100
+# Сколько одинаковых по форме запросов за один HTTP-запрос считать N+1
+N_PLUS_ONE_THRESHOLD = 5
+
+# Строки с замерами запросов (core.middleware) пишутся на уровне INFO,
+# медленные запросы и N+1 (core.querylog) — на уровне WARNING
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yatube.requests': {
+            'handlers': ['console'],
+            'level': env('YATUBE_REQUEST_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+        'yatube.sql': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# Фрагменты лент сбрасываются по поколению, поэтому TTL может быть большим
+FEED_CACHE_TIMEOUT = env_int('YATUBE_FEED_CACHE_TIMEOUT', 60 * 60)
+# Сколько секунд обратный прокси может отдавать гостям ленту без
+# перепроверки (Cache-Control: s-maxage)
+FEED_PROXY_MAX_AGE = 10
+
+# Общий кеш для всех процессов: locmem (по умолчанию, только для
+# разработки), file, db (нужен manage.py createcachetable) или redis.
+CACHE_BACKEND = env('YATUBE_CACHE_BACKEND', 'locmem')
+
+SHARED_CACHES = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': env(
+            'YATUBE_CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')
+        ),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'yatube_cache',
+    },
+    'redis': {
+        'BACKEND': 'core.cache.RedisCache',
+        'LOCATION': env('YATUBE_REDIS_URL', 'redis://127.0.0.1:6379/0'),
+    },
+}
+
+CACHES = {
+    'default': SHARED_CACHES[CACHE_BACKEND],
+    # Горячие фрагменты лент: LRU в памяти процесса перед общим кешем
+    'feed': {
+        'BACKEND': 'core.cache.TieredCache',
+        'TIMEOUT': FEED_CACHE_TIMEOUT,
+        'OPTIONS': {
+            'SHARED_ALIAS': 'default',
+            'LOCAL_MAX_ENTRIES': 500,
+            'LOCAL_TIMEOUT': 5,
+        },
+    },
+}
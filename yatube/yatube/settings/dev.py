@@ -0,0 +1,40 @@
+"""Настройки для разработки и тестов."""
+import os
+import sys
+import tempfile
+
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, MIDDLEWARE, TEMPLATES, template_loaders
+from .env import env, env_bool, env_int
+
+# Ключ из репозитория годится только для локального запуска
+SECRET_KEY = env(
+    'YATUBE_SECRET_KEY', '%9xwj*dn_(3*mk6%z57mxj#ea3r(i2t69ckj0+v519j!y9h426'
+)
+
+DEBUG = env_bool('YATUBE_DEBUG', True)
+
+TEMPLATE_LOADERS = template_loaders(DEBUG)
+TEMPLATES[0]['OPTIONS']['loaders'] = TEMPLATE_LOADERS
+TEMPLATES_PRECOMPILE = not DEBUG
+
+# Панель отладки пишет каждый SQL-запрос в память и искажает замеры,
+# поэтому включается только явно
+if DEBUG and env_bool('YATUBE_DEBUG_TOOLBAR'):
+    INSTALLED_APPS = INSTALLED_APPS + ['debug_toolbar']
+    MIDDLEWARE = [
+        'debug_toolbar.middleware.DebugToolbarMiddleware'
+    ] + MIDDLEWARE
+    INTERNAL_IPS = ['127.0.0.1']
+
+# Под тестами фоновые задачи выполняются сразу после коммита: поток
+# пула пережил бы тест и его переопределённый MEDIA_ROOT. Загрузки
+# и миниатюры тестов не попадают в media/ проекта.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+if TESTING:
+    THUMBNAIL_WORKERS = env_int('YATUBE_THUMBNAIL_WORKERS', 0)
+    TIMELINE_WORKERS = env_int('YATUBE_TIMELINE_WORKERS', 0)
+    MEDIA_ROOT = env(
+        'YATUBE_MEDIA_ROOT',
+        os.path.join(tempfile.gettempdir(), 'yatube-test-media'),
+    )
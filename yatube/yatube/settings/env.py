@@ -0,0 +1,40 @@
+"""Чтение настроек из переменных окружения."""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+
+def env(name, default=None):
+    return os.getenv(name, default)
+
+
+def env_required(name):
+    value = os.getenv(name)
+    if not value:
+        raise ImproperlyConfigured(f'Не задана переменная окружения {name}')
+    return value
+
+
+def env_bool(name, default=False):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in TRUE_VALUES
+
+
+def env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def env_float(name, default):
+    return float(os.getenv(name, default))
+
+
+def env_list(name, default=()):
+    """Список значений через запятую; пустые элементы отбрасываются."""
+    value = os.getenv(name)
+    if value is None:
+        return list(default)
+    return [item.strip() for item in value.split(',') if item.strip()]
@@ -0,0 +1,20 @@
+"""Настройки для развёртывания.
+
+Ключ и хосты обязательны. Настройки, годные только для разработки
+(DEBUG, кеш в памяти процесса, перечитывание шаблонов с диска,
+новое соединение с базой на каждый запрос), core.checks
+не пропускает: приложение не запустится.
+"""
+from .base import *  # noqa: F401,F403
+from .env import env, env_list, env_required
+
+SECRET_KEY = env_required('YATUBE_SECRET_KEY')
+env_required('YATUBE_ALLOWED_HOSTS')
+ALLOWED_HOSTS = env_list('YATUBE_ALLOWED_HOSTS')
+
+PRODUCTION = True
+
+STATICFILES_STORAGE = env(
+    'YATUBE_STATICFILES_STORAGE',
+    'django.contrib.staticfiles.storage.ManifestStaticFilesStorage',
+)